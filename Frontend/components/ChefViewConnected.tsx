@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { apiService } from '../services/api.service';
 import { API_CONFIG } from '../config/api.config';
 import { useAuth } from '../context/AuthContext';
+import { useCommandeStream } from '../hooks/useApi';
 import { Order, OrderStatus } from '../types';
 import { Badge, Button, Card } from './UI';
 import { ChefHat, Timer, Play, Check, Box, Loader, RefreshCcw, LogOut, Eye, EyeOff } from 'lucide-react';
@@ -11,24 +12,28 @@ export const ChefViewConnected: React.FC = () => {
   const { token, user, logout } = useAuth();
   const [orders, setOrders] = useState<Order[]>([]);
   const [plats, setPlats] = useState<any[]>([]);
+  const [production, setProduction] = useState<any[]>([]);
   const [activeTab, setActiveTab] = useState<'COMMANDES' | 'STOCK'>('COMMANDES');
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
     loadData();
-    const interval = setInterval(loadData, 30000); // Refresh every 30 seconds
-    return () => clearInterval(interval);
   }, [token]);
 
+  // Reload only when the kitchen stream reports a change
+  useCommandeStream(token, () => loadData(), { role: 'cuisinier' });
+
   const loadData = async () => {
     if (!token) return;
 
     try {
-      const [commandesData, platsData] = await Promise.all([
-        apiService.getCommandes(token),
-        apiService.getPlats(token)
+      const [commandesData, platsData, productionData] = await Promise.all([
+        apiService.getCommandes(token, { status: [OrderStatus.EN_ATTENTE_VALIDATION, OrderStatus.VALIDEE, OrderStatus.EN_COURS] }),
+        apiService.getPlats(token),
+        apiService.getProductionCuisine(token).catch(() => [])
       ]);
+      setProduction(productionData);
 
       setOrders(commandesData);
       setPlats(platsData);
@@ -143,6 +148,22 @@ export const ChefViewConnected: React.FC = () => {
         </div>
       )}
 
+      {activeTab === 'COMMANDES' && production.length > 0 && (
+        <div className="mb-8 bg-white rounded-[2rem] p-6 shadow-sm border border-gray-100">
+          <h2 className="text-xs font-black text-gray-400 uppercase tracking-widest mb-4">À produire (commandes en cuisson)</h2>
+          <div className="flex flex-wrap gap-3">
+            {production.map(p => (
+              <div key={`${p.plat_id}-${p.menu_id}`} className="px-4 py-3 bg-orange-50 rounded-2xl border border-orange-100">
+                <p className="font-black text-[#03081F]"><span className="text-[#FC8A06]">{p.quantite}×</span> {p.nom}</p>
+                {p.notes.map((n: any) => (
+                  <p key={n.notes_speciales} className="text-[10px] font-bold text-gray-500">{n.quantite}× {n.notes_speciales}</p>
+                ))}
+              </div>
+            ))}
+          </div>
+        </div>
+      )}
+
       {activeTab === 'COMMANDES' ? (
         <div className="grid grid-cols-1 lg:grid-cols-2 gap-10">
           {/* Column: À Préparer */}
@@ -189,22 +189,18 @@ export const ClientView: React.FC = () => {
         table_id: selectedTable,
         type_commande: TypeCommande.SUR_PLACE,
         montant_total: totalInCentimes,
-        notes: orderNote || (clientToken ? 'Commande client authentifié' : 'Commande client sans authentification')
-      };
-
-      const newOrder = await apiService.createCommande(orderData, clientToken || undefined);
-      console.log('? Commande créée:', newOrder);
-
-      // Add each item as a line
-      for (const item of basket) {
-        await apiService.addLigneCommande(newOrder.id, {
-          commande_id: newOrder.id,
+        notes: orderNote || (clientToken ? 'Commande client authentifié' : 'Commande client sans authentification'),
+        // Lines are persisted with the order in a single round trip
+        lignes: basket.map(item => ({
           plat_id: item.plat_id,
           quantite: item.quantite,
           prix_unitaire: item.prix_unitaire,
           notes_speciales: item.notes_speciales || ''
-        }, clientToken || undefined);
-      }
+        }))
+      };
+
+      const newOrder = await apiService.createCommande(orderData, clientToken || undefined);
+      console.log('? Commande créée:', newOrder);
 
       console.log('? Commande envoyée aux cuisiniers!');
       setCurrentOrder(newOrder);
@@ -348,6 +344,30 @@ export const ClientView: React.FC = () => {
     // Initial load
     previousOrderStatusRef.current = currentOrder.status;
 
+    // Authenticated clients get pushed updates; anonymous orders keep polling
+    if (clientToken) {
+      const source = apiService.subscribeCommandes(clientToken, (event) => {
+        if (event.commande_id === currentOrder.id) refreshOrderStatus();
+      });
+      // Filet de sécurité : vérification conditionnelle du statut (304 tant qu'il ne change pas)
+      let etag: string | null = null;
+      const fallback = setInterval(async () => {
+        try {
+          const result = await apiService.getCommandeStatus(currentOrder.id, clientToken, etag);
+          if (result) {
+            if (etag) refreshOrderStatus();
+            etag = result.etag;
+          }
+        } catch (err) {
+          console.error('Error checking order status:', err);
+        }
+      }, 60000);
+      return () => {
+        source.close();
+        clearInterval(fallback);
+      };
+    }
+
     const interval = setInterval(refreshOrderStatus, 10000); // Refresh every 10s
     return () => clearInterval(interval);
   }, [step, currentOrder?.id, clientToken]);
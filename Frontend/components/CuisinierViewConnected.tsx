@@ -6,11 +6,13 @@ import { apiService } from '../services/api.service';
 import { Order, OrderStatus, MenuItem } from '../types';
 import { formatPrice } from '../mockData';
 import { useAuth } from '../context/AuthContext';
+import { useCommandeStream } from '../hooks/useApi';
 
 export const CuisinierViewConnected: React.FC = () => {
   const { logout, user, token } = useAuth();
   const [orders, setOrders] = useState<Order[]>([]);
   const [menu, setMenu] = useState<MenuItem[]>([]);
+  const [queueRank, setQueueRank] = useState<Record<number, number>>({});
   const [activeTab, setActiveTab] = useState<'COMMANDES' | 'STOCK'>('COMMANDES');
   const [selectedDish, setSelectedDish] = useState<MenuItem | null>(null);
   const [selectedOrder, setSelectedOrder] = useState<Order | null>(null);
@@ -38,21 +40,24 @@ export const CuisinierViewConnected: React.FC = () => {
 
     if (user) {
       loadData();
-      const interval = setInterval(loadData, 30000); // Refresh every 30s for kitchen
-      return () => clearInterval(interval);
     }
   }, [user]);
 
+  // Reload only when the kitchen stream reports a change
+  useCommandeStream(user ? token : null, () => loadData(), { role: 'cuisinier' });
+
   const loadData = async () => {
     try {
       if (isFirstLoad.current) setLoading(true);
       setError(null);
-      const [commandesData, platsData] = await Promise.all([
-        apiService.getCommandes(token),
-        apiService.getPlats(token)
+      const [commandesData, platsData, queueData] = await Promise.all([
+        apiService.getCommandes(token, { status: [OrderStatus.VALIDEE, OrderStatus.EN_COURS] }),
+        apiService.getPlats(token),
+        apiService.getCuisineQueue(token).catch(() => [])
       ]);
       setOrders(commandesData);
       setMenu(platsData);
+      setQueueRank(Object.fromEntries(queueData.map((e: any, index: number) => [e.commande_id, index])));
 
       // Check for new orders to play sound
       const newOrdersCount = commandesData.filter(o => o.status === OrderStatus.VALIDEE).length;
@@ -113,6 +118,24 @@ export const CuisinierViewConnected: React.FC = () => {
     }
   };
 
+  const markAllReady = async (orderIds: number[]) => {
+    if (!token || orderIds.length === 0) return;
+    const originalOrders = [...orders];
+    setOrders(prev => prev.map(o => orderIds.includes(o.id) ? { ...o, status: OrderStatus.PRETE } : o));
+
+    try {
+      // Une seule requête pour tout le lot ; les commandes refusées reviennent à leur état
+      const resultats = await apiService.transitionCommandes(orderIds, OrderStatus.PRETE, token);
+      const echecs = resultats.filter((r: any) => !r.succes).map((r: any) => r.commande_id);
+      if (echecs.length > 0) {
+        setOrders(prev => prev.map(o => echecs.includes(o.id) ? originalOrders.find(p => p.id === o.id) || o : o));
+      }
+    } catch (err: any) {
+      setOrders(originalOrders);
+      alert('Erreur: ' + err.message);
+    }
+  };
+
   const toggleAvailability = async (platId: number, currentStatus: boolean) => {
     try {
       setActionLoading(true);
@@ -132,9 +155,10 @@ export const CuisinierViewConnected: React.FC = () => {
     o.status === OrderStatus.VALIDEE
   );
 
+  // Ordre de priorité calculé par le serveur (attente, taille, plat le plus long)
   const enPreparation = orders.filter(o =>
     o.status === OrderStatus.EN_COURS
-  );
+  ).sort((a, b) => (queueRank[a.id] ?? Infinity) - (queueRank[b.id] ?? Infinity));
 
   if (loading) {
     return (
@@ -334,10 +358,20 @@ export const CuisinierViewConnected: React.FC = () => {
                   <p className="text-[10px] font-black text-orange-500 uppercase tracking-widest">{enPreparation.length} PLATS EN CUISSON</p>
                 </div>
               </div>
-              <div className="flex gap-2">
-                <div className="w-2 h-2 rounded-full bg-orange-500 animate-ping"></div>
-                <div className="w-2 h-2 rounded-full bg-orange-500"></div>
-              </div>
+              {enPreparation.length > 1 ? (
+                <Button
+                  onClick={() => markAllReady(enPreparation.map(o => o.id))}
+                  size="sm"
+                  className="bg-orange-500 hover:bg-orange-600 text-white rounded-xl font-black text-[10px] uppercase tracking-widest"
+                >
+                  <Check size={14} className="mr-1" /> TOUT PRÊT
+                </Button>
+              ) : (
+                <div className="flex gap-2">
+                  <div className="w-2 h-2 rounded-full bg-orange-500 animate-ping"></div>
+                  <div className="w-2 h-2 rounded-full bg-orange-500"></div>
+                </div>
+              )}
             </div>
 
             <div className="flex-1 overflow-y-auto space-y-6 px-1 md:px-2 pr-2 md:pr-4 custom-scrollbar-dark">
@@ -14,6 +14,7 @@ import { apiService } from '../services/api.service';
 import { API_CONFIG } from '../config/api.config';
 import { MenuItem, Stats, TopPlat, Table, Reservation, Categorie, TableStatus } from '../types';
 import { useAuth } from '../context/AuthContext';
+import { useCommandeStream } from '../hooks/useApi';
 import { ReservationManagerView } from './ReservationManagerView';
 
 // --- Types ---
@@ -272,10 +273,11 @@ export const GerantViewConnected: React.FC = () => {
         audioReservationRef.current = new Audio('https://assets.mixkit.co/active_storage/sfx/2866/2866-preview.mp3'); // Soft chime
 
         loadData();
-        const interval = setInterval(loadData, 30000); // Auto refresh every 30s
-        return () => clearInterval(interval);
     }, [activeTab]);
 
+    // Reload only when an order changes (pushed by the server)
+    useCommandeStream(token, () => loadData());
+
     useEffect(() => {
         loadCategories();
     }, []);
@@ -2,6 +2,7 @@ import React, { useState, useEffect, useRef } from 'react';
 import { API_CONFIG } from '../config/api.config';
 import { apiService } from '../services/api.service';
 import { useAuth } from '../context/AuthContext';
+import { useCommandeStream } from '../hooks/useApi';
 import { Order, OrderStatus, Table, TableStatus } from '../types';
 import { Card, Button, Badge, Modal } from './UI';
 import { LayoutGrid, ClipboardList, UserPlus, CheckCircle2, ChevronRight, Plus, Minus, Loader, RefreshCcw, LogOut, ChefHat, Bell, BellRing, Timer, XCircle, Users, Search } from 'lucide-react';
@@ -57,10 +58,11 @@ export const ServerViewConnected: React.FC = () => {
 
   useEffect(() => {
     loadData();
-    const interval = setInterval(loadData, 30000); // Refresh every 30 seconds
-    return () => clearInterval(interval);
   }, [token]);
 
+  // Reload only when an order changes (pushed by the server)
+  useCommandeStream(token, () => loadData());
+
   const loadData = async () => {
     if (!token) {
       setLoading(false);
@@ -168,6 +170,19 @@ export const ServerViewConnected: React.FC = () => {
     }
   };
 
+  const markAllServed = async (commandeIds: number[]) => {
+    if (!token || commandeIds.length === 0) return;
+
+    try {
+      const resultats = await apiService.transitionCommandes(commandeIds, OrderStatus.SERVIE, token);
+      const echec = resultats.find((r: any) => !r.succes);
+      if (echec) setError(`Commande #${echec.commande_id} : ${echec.erreur}`);
+      loadData();
+    } catch (err: any) {
+      setError(err.message);
+    }
+  };
+
   const openRefuseModal = (order: Order) => {
     setOrderToRefuse(order);
     setRefuseReason('');
@@ -221,18 +236,14 @@ export const ServerViewConnected: React.FC = () => {
         table_id: selectedTable.id,
         type_commande: 'SUR_PLACE',
         montant_total: montantTotal,
-        notes: `Commande serveur - Table ${selectedTable.numero_table}`
-      }, token);
-
-      // Add items to order
-      for (const item of manualBasket) {
-        await apiService.addLigneCommande(newOrder.id, {
-          commande_id: newOrder.id,
+        notes: `Commande serveur - Table ${selectedTable.numero_table}`,
+        // Lines are persisted with the order in a single request
+        lignes: manualBasket.map(item => ({
           plat_id: item.id,
           quantite: item.quantite,
           prix_unitaire: item.prix
-        }, token);
-      }
+        }))
+      }, token);
 
       // Validate immediately
       await apiService.validerCommande(newOrder.id, user.id, token);
@@ -560,6 +571,15 @@ export const ServerViewConnected: React.FC = () => {
                     <span className="bg-emerald-200 text-emerald-800 text-xs font-black px-3 py-1 rounded-full">
                       {orders.filter(o => o.status === OrderStatus.PRETE).length}
                     </span>
+                    {orders.filter(o => o.status === OrderStatus.PRETE).length > 1 && (
+                      <Button
+                        onClick={() => markAllServed(orders.filter(o => o.status === OrderStatus.PRETE).map(o => o.id))}
+                        size="sm"
+                        className="ml-auto bg-emerald-600 hover:bg-emerald-700 text-white rounded-xl font-black text-[10px] uppercase tracking-widest"
+                      >
+                        TOUT SERVIR <ChevronRight size={14} className="ml-1" />
+                      </Button>
+                    )}
                   </div>
 
                   <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
@@ -46,7 +46,13 @@ export const API_CONFIG = {
     COMMANDES: {
       BASE: '/commandes/',
       BY_ID: (id: number) => `/commandes/${id}`,
+      STATUS: (id: number) => `/commandes/${id}/status`,
+      FLUX: '/commandes/flux',
+      TRANSITION: '/commandes/transition',
+      CUISINE_QUEUE: '/commandes/cuisine/queue',
+      CUISINE_PRODUCTION: '/commandes/cuisine/production',
       LIGNES: (id: number) => `/commandes/${id}/lignes`,
+      LIGNES_BATCH: (id: number) => `/commandes/${id}/lignes/batch`,
       VALIDER: (id: number) => `/commandes/${id}/valider`,
       REFUSER: (id: number) => `/commandes/${id}/refuser`,
       PREPARER: (id: number) => `/commandes/${id}/preparer`,
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { apiService } from '../services/api.service';
 import { MenuItem, Categorie, Order, Table, Reservation } from '../types';
 import { useAuth } from '../context/AuthContext';
@@ -113,6 +113,29 @@ export const useCommandes = () => {
   return { commandes, loading, error, refreshCommandes };
 };
 
+// Abonnement au flux SSE des commandes : appelle onEvent a chaque changement.
+// Un rafraichissement lent reste actif en filet de securite si le flux est coupe.
+export const useCommandeStream = (
+  token: string | null | undefined,
+  onEvent: (event: any) => void,
+  filters: Record<string, string | number> = {},
+  fallbackMs: number = 120000
+) => {
+  const onEventRef = useRef(onEvent);
+  onEventRef.current = onEvent;
+  const filtersKey = JSON.stringify(filters);
+
+  useEffect(() => {
+    if (!token) return;
+    const source = apiService.subscribeCommandes(token, (event) => onEventRef.current(event), filters);
+    const interval = setInterval(() => onEventRef.current(null), fallbackMs);
+    return () => {
+      source.close();
+      clearInterval(interval);
+    };
+  }, [token, filtersKey, fallbackMs]);
+};
+
 export const useReservations = () => {
   const [reservations, setReservations] = useState<Reservation[]>([]);
   const [loading, setLoading] = useState(true);
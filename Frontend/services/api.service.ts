@@ -236,14 +236,48 @@ class ApiService {
     return this.get(API_CONFIG.ENDPOINTS.COMMANDES.BY_ID(id), { token });
   }
 
-  async getCommandes(token?: string): Promise<any[]> {
-    return this.get(API_CONFIG.ENDPOINTS.COMMANDES.BASE, { token });
+  // Filtres côté serveur : status (plusieurs valeurs), table_id, serveur_id, date_debut, date_fin, limit
+  // Statut seul d'une commande ; renvoie null (304) si l'ETag fourni est toujours valable.
+  // Avec waitSeconds, le serveur retient la requête jusqu'au prochain changement de statut.
+  async getCommandeStatus(id: number, token: string, etag?: string | null, waitSeconds = 0): Promise<{ status: string; etag: string | null } | null> {
+    const headers: Record<string, string> = { Authorization: `Bearer ${token}` };
+    if (etag) headers['If-None-Match'] = etag;
+    const query = waitSeconds > 0 ? `?wait=${waitSeconds}` : '';
+    const response = await fetch(`${this.baseUrl}${API_CONFIG.ENDPOINTS.COMMANDES.STATUS(id)}${query}`, { headers });
+    if (response.status === 304) return null;
+    const data = await this.handleResponse<any>(response);
+    return { status: data.status, etag: response.headers.get('ETag') };
+  }
+
+  async getCommandes(token?: string, filters: Record<string, string | number | string[]> = {}): Promise<any[]> {
+    const params = new URLSearchParams();
+    Object.entries(filters).forEach(([key, value]) =>
+      (Array.isArray(value) ? value : [value]).forEach(v => params.append(key, String(v)))
+    );
+    const query = params.toString();
+    return this.get(`${API_CONFIG.ENDPOINTS.COMMANDES.BASE}${query ? `?${query}` : ''}`, { token });
+  }
+
+  // Flux SSE des changements de commandes (EventSource ne supporte pas les en-têtes)
+  subscribeCommandes(token: string, onEvent: (event: any) => void, filters: Record<string, string | number> = {}): EventSource {
+    const params = new URLSearchParams({ token });
+    Object.entries(filters).forEach(([key, value]) => params.append(key, String(value)));
+    const source = new EventSource(`${this.baseUrl}${API_CONFIG.ENDPOINTS.COMMANDES.FLUX}?${params.toString()}`);
+    const handler = (message: MessageEvent) => onEvent(JSON.parse(message.data));
+    ['creee', 'validee', 'refusee', 'en_cuisine', 'prete', 'servie', 'receptionnee', 'payee'].forEach(type =>
+      source.addEventListener(type, handler as EventListener)
+    );
+    return source;
   }
 
   async addLigneCommande(commandeId: number, data: any, token?: string): Promise<any> {
     return this.post(API_CONFIG.ENDPOINTS.COMMANDES.LIGNES(commandeId), data, { token });
   }
 
+  async addLignesCommande(commandeId: number, lignes: any[], token?: string): Promise<any[]> {
+    return this.post(API_CONFIG.ENDPOINTS.COMMANDES.LIGNES_BATCH(commandeId), lignes, { token });
+  }
+
   async validerCommande(commandeId: number, serveurId: number, token: string): Promise<any> {
     return this.post(`${API_CONFIG.ENDPOINTS.COMMANDES.VALIDER(commandeId)}?serveur_id=${serveurId}`, {}, { token });
   }
@@ -260,6 +294,21 @@ class ApiService {
     return this.post(`${API_CONFIG.ENDPOINTS.COMMANDES.PRETE(commandeId)}?cuisinier_id=${cuisinierId}`, {}, { token });
   }
 
+  // File de la cuisine, déjà triée par priorité côté serveur
+  async getCuisineQueue(token: string): Promise<any[]> {
+    return this.get(API_CONFIG.ENDPOINTS.COMMANDES.CUISINE_QUEUE, { token });
+  }
+
+  // Quantités à produire par plat sur les commandes en cours (notes spéciales regroupées)
+  async getProductionCuisine(token: string): Promise<any[]> {
+    return this.get(API_CONFIG.ENDPOINTS.COMMANDES.CUISINE_PRODUCTION, { token });
+  }
+
+  // Transition groupée : renvoie un résultat par commande ({ commande_id, succes, status, erreur })
+  async transitionCommandes(commandeIds: number[], status: string, token: string, options: { raison?: string; methode?: string } = {}): Promise<any[]> {
+    return this.post(API_CONFIG.ENDPOINTS.COMMANDES.TRANSITION, { commande_ids: commandeIds, status, ...options }, { token });
+  }
+
   async servirCommande(commandeId: number, token: string): Promise<any> {
     return this.post(API_CONFIG.ENDPOINTS.COMMANDES.SERVIR(commandeId), {}, { token });
   }
@@ -0,0 +1,146 @@
+"""
+Cache des réponses du catalogue (plats, catégories, menus, tables).
+
+Les corps JSON sont stockés déjà sérialisés, avec un ETag fort (empreinte du
+contenu) : une requête portant `If-None-Match` reçoit un 304 sans corps.
+Chaque entrée est étiquetée par type d'entité ; les services qui modifient
+ces entités invalident l'étiquette après leur commit. Le TTL borne le délai de
+prise en compte d'une modification faite par un autre processus.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+
+# Le client revalide à chaque affichage : 304 tant que le catalogue n'a pas changé
+CACHE_CONTROL = "no-cache"
+
+
+def serialiser(type_reponse: Any, donnees: Any) -> bytes:
+    """JSON de `donnees` tel que FastAPI l'aurait produit via `response_model`."""
+    adaptateur = TypeAdapter(type_reponse)
+    return adaptateur.dump_json(adaptateur.validate_python(donnees, from_attributes=True))
+
+
+def _etag(corps: bytes) -> str:
+    return '"' + hashlib.sha256(corps).hexdigest()[:32] + '"'
+
+
+def _etag_correspond(request: Request, etag: str) -> bool:
+    entete = request.headers.get("if-none-match")
+    if not entete:
+        return False
+    return entete.strip() == "*" or etag in {valeur.strip() for valeur in entete.split(",")}
+
+
+def _reponse(request: Request, etag: str, corps: bytes) -> Response:
+    entetes = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _etag_correspond(request, etag):
+        return Response(status_code=304, headers=entetes)
+    return Response(content=corps, media_type="application/json", headers=entetes)
+
+
+class Consultation:
+    """Résultat d'une lecture du cache : la réponse si présente, sinon de quoi
+    mémoriser le corps calculé (ignoré si une invalidation est survenue entre-temps)."""
+
+    def __init__(self, cache: "CacheReponses", request: Request, cle: str,
+                 tags: Tuple[str, ...], generation: Tuple[int, ...], reponse: Response | None):
+        self._cache = cache
+        self._request = request
+        self._cle = cle
+        self._tags = tags
+        self._generation = generation
+        self.reponse = reponse
+
+    def enregistrer(self, corps: bytes) -> Response:
+        etag = _etag(corps)
+        self._cache._stocker(self._cle, self._tags, self._generation, etag, corps)
+        return _reponse(self._request, etag, corps)
+
+
+class CacheReponses:
+    """Réponses indexées par chemin + query string, bornées en nombre (LRU) et en durée."""
+
+    def __init__(self, taille_max: int, ttl: float, horloge: Callable[[], float] = time.monotonic):
+        self.taille_max = taille_max
+        self.ttl = ttl
+        self._horloge = horloge
+        self._entrees: "OrderedDict[str, Tuple[float, Tuple[str, ...], str, bytes]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.succes = 0
+        self.echecs = 0
+        self.reponses_304 = 0
+        self.invalidations = 0
+
+    def consulter(self, request: Request, tags: Iterable[str]) -> Consultation:
+        tags = tuple(tags)
+        cle = request.url.path + ("?" + request.url.query if request.url.query else "")
+        with self._lock:
+            generation = tuple(self._generations.get(tag, 0) for tag in tags)
+            entree = self._entrees.get(cle)
+            if entree is not None and entree[0] <= self._horloge():
+                del self._entrees[cle]
+                entree = None
+            if entree is None:
+                self.echecs += 1
+                return Consultation(self, request, cle, tags, generation, None)
+            self._entrees.move_to_end(cle)
+            self.succes += 1
+            _, _, etag, corps = entree
+            reponse = _reponse(request, etag, corps)
+            if reponse.status_code == 304:
+                self.reponses_304 += 1
+        return Consultation(self, request, cle, tags, generation, reponse)
+
+    def _stocker(self, cle: str, tags: Tuple[str, ...], generation: Tuple[int, ...], etag: str, corps: bytes):
+        with self._lock:
+            if generation != tuple(self._generations.get(tag, 0) for tag in tags):
+                return  # données lues avant une écriture : ne pas les mémoriser
+            self._entrees[cle] = (self._horloge() + self.ttl, tags, etag, corps)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+
+    def invalider(self, *tags: str):
+        """Supprimer les réponses qui dépendent d'au moins une des étiquettes."""
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            perimees = [cle for cle, (_, etiquettes, _, _) in self._entrees.items()
+                        if not set(etiquettes).isdisjoint(tags)]
+            for cle in perimees:
+                del self._entrees[cle]
+            self.invalidations += len(perimees)
+
+    def vider(self):
+        with self._lock:
+            self._entrees.clear()
+
+    def statistiques(self) -> Dict[str, Any]:
+        with self._lock:
+            lectures = self.succes + self.echecs
+            return {
+                "taille": len(self._entrees),
+                "taille_max": self.taille_max,
+                "ttl_secondes": self.ttl,
+                "octets": sum(len(corps) for _, _, _, corps in self._entrees.values()),
+                "succes": self.succes,
+                "echecs": self.echecs,
+                "taux_succes": round(self.succes / lectures, 4) if lectures else 0.0,
+                "reponses_304": self.reponses_304,
+                "invalidations": self.invalidations,
+            }
+
+
+cache_catalogue = CacheReponses(
+    taille_max=settings.CATALOGUE_CACHE_TAILLE,
+    ttl=settings.CATALOGUE_CACHE_TTL_SECONDES,
+)
@@ -23,10 +23,52 @@ class Settings(BaseSettings):
     MAIL_SSL_TLS: bool | None = None
     USE_CREDENTIALS: bool = True
     VALIDATE_CERTS: bool = True
+
+    # File d'envoi des emails (app/services/email_worker.py)
+    EMAIL_LOT_TAILLE: int = 50
+    EMAIL_INTERVALLE_SECONDES: float = 5
+    EMAIL_TENTATIVES_MAX: int = 8
+    EMAIL_BACKOFF_BASE_SECONDES: float = 30
+    EMAIL_BACKOFF_MAX_SECONDES: float = 3600
+    EMAIL_CONNEXION_INACTIVITE_SECONDES: float = 60
+    # Exécuter le worker dans le processus web (déploiement à un seul processus)
+    EMAIL_WORKER_INTEGRE: bool = False
     
     # Frontend URL for email verification links
     FRONTEND_URL: str
 
+    # Nombre maximal de calculs Argon2 simultanés (app/security/hashing.py)
+    HASH_CONCURRENCE_MAX: int = 4
+    # Coût Argon2 calibré pour la machine (scripts/calibrer_argon2.py) ; vide = défaut passlib
+    ARGON2_TIME_COST: int | None = None
+    ARGON2_MEMORY_COST: int | None = None  # Kio
+    ARGON2_PARALLELISM: int | None = None
+
+    # Cache des utilisateurs authentifiés (app/security/principal_cache.py)
+    PRINCIPAL_CACHE_TAILLE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDES: int = 60
+
+    # Cache HTTP des listes du catalogue (app/core/cache_http.py)
+    CATALOGUE_CACHE_TAILLE: int = 1000
+    CATALOGUE_CACHE_TTL_SECONDES: int = 300
+    # Index de recherche des plats (app/services/recherche_service.py)
+    RECHERCHE_INDEX_TTL_SECONDES: int = 300
+    # File de la cuisine (app/services/cuisine_service.py), reconstruite depuis la base
+    CUISINE_FILE_TTL_SECONDES: int = 30
+
+    # Images des plats (app/services/storage_service.py, app/services/image_service.py)
+    IMAGE_TAILLE_MAX_OCTETS: int = 5 * 1024 * 1024
+    IMAGE_PROCESSUS_MAX: int = 2
+
+    # Limitation des tentatives de connexion (app/security/limiteur.py)
+    LOGIN_LIMITE_IP_CAPACITE: int = 60
+    LOGIN_LIMITE_IP_PAR_MINUTE: float = 30
+    LOGIN_LIMITE_EMAIL_CAPACITE: int = 10
+    LOGIN_LIMITE_EMAIL_PAR_MINUTE: float = 5
+    LOGIN_LIMITE_TAILLE: int = 100000
+    # Seaux partagés entre workers (ex. redis://localhost:6379/0) ; en mémoire si vide
+    LOGIN_LIMITE_REDIS_URL: str | None = None
+
     model_config = SettingsConfigDict(
         env_file=os.path.join(BASE_DIR, ".env"),
         #env_file=".env",
@@ -1,10 +1,56 @@
+from datetime import datetime, timezone
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import create_engine, SQLModel, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
 
 
 # creation du moteur de connection a la base de donnees
 engine = create_engine(settings.DATABASE_URL, echo=settings.DEBUG, pool_pre_ping=True)
 
+
+# Pilote asynchrone correspondant au pilote synchrone configuré
+PILOTES_ASYNC = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def _url_async(url: str):
+    url = make_url(url)
+    url = url.set(drivername=PILOTES_ASYNC.get(url.get_backend_name(), url.drivername))
+    if url.drivername == "postgresql+asyncpg" and "sslmode" in url.query:
+        # asyncpg attend `ssl` là où libpq attend `sslmode`
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": url.query["sslmode"]})
+    return url
+
+
+def _creer_moteur_async():
+    url = _url_async(settings.DATABASE_URL)
+    if url.get_backend_name() == "sqlite":
+        # Une connexion SQLite ne coûte qu'une ouverture de fichier ; sans pool,
+        # aucune connexion n'est partagée entre deux boucles d'événements
+        return create_async_engine(url, echo=settings.DEBUG, poolclass=NullPool)
+    return create_async_engine(url, echo=settings.DEBUG, pool_pre_ping=True)
+
+
+# moteur asynchrone pour les routes qui ne doivent pas bloquer la boucle
+async_engine = _creer_moteur_async()
+
+def utc(date: datetime) -> datetime:
+    """Date à comparer aux colonnes datetime, ramenée en UTC avec fuseau.
+
+    Les colonnes de dates sont des TIMESTAMP WITH TIME ZONE (migration
+    d9a4c7e1b5f2) : SQLModel refuse d'y lier une date sans fuseau et asyncpg
+    de mélanger les deux. Les dates reçues sans fuseau sont supposées en UTC.
+    """
+    if date.tzinfo is None:
+        return date.replace(tzinfo=timezone.utc)
+    return date.astimezone(timezone.utc)
+
 def create_db_and_tables():
     # creation des tables dans la base de donnnes au denmarrage de l'application
     SQLModel.metadata.create_all(engine)
@@ -13,4 +59,11 @@ def create_db_and_tables():
 def get_session():
     # creation d'une session de connection a la base de donnees
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+async def get_async_session():
+    # session asynchrone : les objets restent lisibles après commit, sans
+    # rechargement implicite (impossible hors d'un `await`)
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
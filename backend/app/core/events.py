@@ -0,0 +1,160 @@
+"""
+Bus d'événements en mémoire pour diffuser les changements de commandes.
+
+Les services publient un événement après chaque commit ; les abonnés (flux SSE
+des écrans du personnel et des clients) reçoivent uniquement les événements
+qui correspondent à leurs filtres.
+"""
+import asyncio
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+import logging
+
+from app.models.commande import Commande, CommandeStatus
+
+
+# Statuts qui intéressent chaque rôle (None = tous les statuts)
+STATUTS_PAR_ROLE: Dict[str, Optional[Set[CommandeStatus]]] = {
+    "gerant": None,
+    "serveur": None,
+    "cuisinier": {
+        CommandeStatus.APPROUVEE,
+        CommandeStatus.EN_COURS,
+        CommandeStatus.PRETE,
+        CommandeStatus.ANNULEE,
+    },
+    "client": None,
+}
+
+TAILLE_MAX_FILE = 100
+
+logger = logging.getLogger("app.events")
+
+
+@dataclass(eq=False)
+class Abonnement:
+    """Un abonné au bus avec ses filtres et sa file d'attente."""
+    loop: asyncio.AbstractEventLoop
+    statuts: Optional[Set[CommandeStatus]] = None
+    table_id: int | None = None
+    client_id: int | None = None
+    commande_id: int | None = None
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=TAILLE_MAX_FILE))
+
+    def accepte(self, evenement: Dict[str, Any]) -> bool:
+        if self.statuts is not None and evenement["status"] not in self.statuts:
+            return False
+        if self.table_id is not None and evenement["table_id"] != self.table_id:
+            return False
+        if self.client_id is not None and evenement["client_id"] != self.client_id:
+            return False
+        if self.commande_id is not None and evenement["commande_id"] != self.commande_id:
+            return False
+        return True
+
+    def deposer(self, evenement: Dict[str, Any]):
+        # Un abonné trop lent perd les événements les plus anciens, pas les nouveaux
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(evenement)
+
+
+class EventBus:
+    """Diffuseur publish/subscribe utilisable depuis du code synchrone."""
+
+    def __init__(self):
+        self._abonnements: Set[Abonnement] = set()
+        self._ecouteurs: List[Callable[[List[Dict[str, Any]]], None]] = []
+        self._lock = threading.Lock()
+
+    def ecouter(self, ecouteur: Callable[[List[Dict[str, Any]]], None]):
+        """Enregistrer un écouteur synchrone, appelé une fois par lot d'événements publiés.
+
+        Sert aux structures en mémoire (file de la cuisine…) qui doivent suivre
+        les changements de commandes. L'écouteur s'exécute dans la requête qui
+        publie : il s'en tient à la charge utile des événements, sans lire la base.
+        """
+        with self._lock:
+            self._ecouteurs.append(ecouteur)
+
+    def ne_plus_ecouter(self, ecouteur: Callable[[List[Dict[str, Any]]], None]):
+        with self._lock:
+            if ecouteur in self._ecouteurs:
+                self._ecouteurs.remove(ecouteur)
+
+    @contextmanager
+    def abonner(
+        self,
+        role: str | None = None,
+        table_id: int | None = None,
+        client_id: int | None = None,
+        commande_id: int | None = None,
+    ) -> Iterator[Abonnement]:
+        """Enregistrer un abonné le temps d'un bloc `with`."""
+        abonnement = Abonnement(
+            loop=asyncio.get_running_loop(),
+            statuts=STATUTS_PAR_ROLE.get(role.lower()) if role else None,
+            table_id=table_id,
+            client_id=client_id,
+            commande_id=commande_id,
+        )
+        with self._lock:
+            self._abonnements.add(abonnement)
+        try:
+            yield abonnement
+        finally:
+            with self._lock:
+                self._abonnements.discard(abonnement)
+
+    def publier(self, evenement: Dict[str, Any]):
+        """Envoyer un événement à tous les abonnés concernés (thread-safe)."""
+        self.publier_lot([evenement])
+
+    def publier_lot(self, evenements: List[Dict[str, Any]]):
+        """Publier les événements d'une même transaction, dans l'ordre."""
+        if not evenements:
+            return
+        with self._lock:
+            ecouteurs = list(self._ecouteurs)
+            abonnements = list(self._abonnements)
+        for ecouteur in ecouteurs:
+            try:
+                ecouteur(evenements)
+            except Exception:
+                # Un écouteur défaillant ne doit pas faire échouer la transition déjà validée
+                logger.exception(f"Écouteur d'événements en échec pour {evenements[0].get('event')}")
+        for evenement in evenements:
+            for abonnement in abonnements:
+                if not abonnement.accepte(evenement):
+                    continue
+                try:
+                    abonnement.loop.call_soon_threadsafe(abonnement.deposer, evenement)
+                except RuntimeError:
+                    # La boucle de l'abonné est fermée : il sera retiré à la sortie du `with`
+                    pass
+
+    @property
+    def nombre_abonnes(self) -> int:
+        return len(self._abonnements)
+
+
+def evenement_commande(commande: Commande, action: str) -> Dict[str, Any]:
+    """Construire la charge utile d'un événement à partir d'une commande."""
+    return {
+        "event": action,
+        "commande_id": commande.id,
+        "status": CommandeStatus(commande.status),
+        "table_id": commande.table_id,
+        "client_id": commande.client_id,
+        "serveur_id": commande.serveur_id,
+        "cuisinier_id": commande.cuisinier_id,
+        "montant_total": commande.montant_total,
+        "date_commande": commande.date_commande.isoformat() if commande.date_commande else None,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+bus = EventBus()
@@ -0,0 +1,29 @@
+"""
+Fichiers statiques (/static) avec cache HTTP adapté aux images adressées par contenu.
+"""
+import os
+import re
+
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+# Nom d'un fichier adressé par son contenu : empreinte SHA-256 (32 caractères hex),
+# suffixe de variante éventuel (abc…_miniature.webp)
+NOM_ADRESSE = re.compile(r"^[0-9a-f]{32}(_[a-z_]+)?\.[a-z0-9]+$")
+
+# Un an : le contenu d'une URL adressée ne change jamais
+CACHE_IMMUABLE = "public, max-age=31536000, immutable"
+
+
+class FichiersStatiques(StaticFiles):
+    """
+    StaticFiles qui marque les fichiers adressés par contenu comme immuables :
+    navigateurs et CDN les gardent un an sans revalidation. Les autres fichiers
+    gardent la revalidation par ETag / Last-Modified.
+    """
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if NOM_ADRESSE.match(os.path.basename(full_path)):
+            response.headers["Cache-Control"] = CACHE_IMMUABLE
+        return response
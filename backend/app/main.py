@@ -14,13 +14,17 @@ from app.routers import (
     paiements,
     plats,
     categories,
+    catalogue,
     stats,
     admin,
     chat
 )
-from app.core.database import create_db_and_tables
-from fastapi.staticfiles import StaticFiles
+from app.core.config import settings
+from app.core.database import create_db_and_tables, async_engine
+from app.core.statique import FichiersStatiques
+from app.services import email_worker, image_service
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import os
 
 
@@ -36,6 +40,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Monter le dossier static pour servir les images
@@ -43,12 +48,29 @@ app.add_middleware(
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 STATIC_DIR = os.path.join(BASE_DIR, "static")
 os.makedirs(os.path.join(STATIC_DIR, "uploads"), exist_ok=True)
-app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+# Images nommées par leur contenu : servies avec Cache-Control immutable
+app.mount("/static", FichiersStatiques(directory=STATIC_DIR), name="static")
 
 @app.on_event("startup")
 def on_startup():
     create_db_and_tables()
 
+@app.on_event("startup")
+async def demarrer_worker_email():
+    # Sans worker séparé (scripts/email_worker.py), la file est vidée par le processus web
+    if settings.EMAIL_WORKER_INTEGRE:
+        app.state.arret_email = asyncio.Event()
+        app.state.worker_email = asyncio.create_task(email_worker.executer(app.state.arret_email))
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    if settings.EMAIL_WORKER_INTEGRE:
+        app.state.arret_email.set()
+        await app.state.worker_email
+    image_service.arreter_pool()
+    # Fermer proprement les connexions du pool asynchrone
+    await async_engine.dispose()
+
 # Enregistrement des routers
 app.include_router(utilisateurs.router)
 app.include_router(auth.router)
@@ -62,6 +84,7 @@ app.include_router(avis.router)
 app.include_router(paiements.router)
 app.include_router(plats.router)
 app.include_router(categories.router)
+app.include_router(catalogue.router)
 app.include_router(stats.router)
 app.include_router(admin.router)
 app.include_router(chat.router)
@@ -13,4 +13,5 @@ from app.models.ligne_commande import LigneCommande
 from app.models.menu import Menu
 from app.models.plat import Plat
 from app.models.categorie import Categorie
-from app.models.paiement import Paiement
\ No newline at end of file
+from app.models.paiement import Paiement
+from app.models.email_sortant import EmailSortant
@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 from datetime import datetime, timezone
 from enum import Enum
@@ -37,6 +38,15 @@ class CommandeBase(SQLModel):
 
 
 class Commande(CommandeBase, table=True):
+    # Index composites alignés sur les filtres de la liste et sur son ordre de pagination
+    __table_args__ = (
+        Index("ix_commande_date_id", "date_commande", "id"),
+        Index("ix_commande_status_date_id", "status", "date_commande", "id"),
+        Index("ix_commande_table_date_id", "table_id", "date_commande", "id"),
+        Index("ix_commande_serveur_date_id", "serveur_id", "date_commande", "id"),
+        Index("ix_commande_client_date_id", "client_id", "date_commande", "id"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     date_commande: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
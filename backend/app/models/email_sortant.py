@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Index, Text
+from sqlmodel import SQLModel, Field
+from datetime import datetime, timezone
+from enum import Enum
+
+
+class EmailStatut(str, Enum):
+    EN_ATTENTE: str = "en_attente"
+    ENVOYE: str = "envoye"
+    ECHEC: str = "echec"  # abandonné après EMAIL_TENTATIVES_MAX essais
+
+
+class EmailSortant(SQLModel, table=True):
+    """Email en file d'envoi (outbox), écrit dans la même transaction que
+    l'action qui le déclenche et expédié par le worker SMTP."""
+    __tablename__ = "email_sortant"
+    # Le worker lit les emails dus dans l'ordre de leur échéance
+    __table_args__ = (
+        Index("ix_email_sortant_statut_prochain_essai", "statut", "prochain_essai", "id"),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    destinataire: str
+    sujet: str
+    corps_html: str = Field(sa_column=Column(Text, nullable=False))
+    statut: EmailStatut = Field(default=EmailStatut.EN_ATTENTE)
+    tentatives: int = Field(default=0)
+    prochain_essai: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    derniere_erreur: str | None = None
+    date_creation: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    date_envoi: datetime | None = None
@@ -11,7 +11,7 @@ if TYPE_CHECKING:
 
 class LigneCommande(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
-    commande_id: int = Field(foreign_key="commande.id")
+    commande_id: int = Field(foreign_key="commande.id", index=True)
     plat_id: int | None = Field(default=None, foreign_key="plat.id")
     menu_id: int | None = Field(default=None, foreign_key="menu.id")
     quantite: int
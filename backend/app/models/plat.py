@@ -1,5 +1,6 @@
+from sqlalchemy import Column, Index, JSON
 from sqlmodel import SQLModel, Field, Relationship
-from typing import List, TYPE_CHECKING
+from typing import Dict, List, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from app.models.ligne_commande import LigneCommande
@@ -9,12 +10,21 @@ if TYPE_CHECKING:
 
 
 class Plat(SQLModel, table=True):
+    # Index alignés sur les filtres de la liste (onglet de catégorie, plats disponibles, prix)
+    __table_args__ = (
+        Index("ix_plat_categorie_disponible_prix", "categorie_id", "disponible", "prix", "id"),
+        Index("ix_plat_disponible_prix", "disponible", "prix", "id"),
+        Index("ix_plat_prix", "prix", "id"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     nom: str
     description: str | None = None
     prix: int
     categorie_id: int = Field(foreign_key="categorie.id")
     image_url: str | None = None
+    # URLs des versions réduites et WebP, renseignées après l'upload
+    image_variantes: Dict[str, str] | None = Field(default=None, sa_column=Column(JSON(none_as_null=True)))
     disponible: bool = True
     temps_preparation: int | None = None # en minutes
 
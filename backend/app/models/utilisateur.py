@@ -23,6 +23,8 @@ class Utilisateur(UtilisateurBase, table=True):
     is_verified: bool = False
     verification_token: str | None = Field(default=None, index=True)
     verification_token_expires: datetime | None = None
+    # Incrémentée pour invalider les jetons déjà émis (rôle, mot de passe, désactivation…)
+    token_version: int = Field(default=0)
     date_creation: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc)
     )
@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile
 from sqlmodel import Session
-from typing import Dict, Any
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Dict, Any, List
 
-from app.core.database import get_session
+from app.core.database import get_session, get_async_session
 from app.security.rbac import allow_gerant
-from app.services import admin_service
+from app.security.limiteur import limiteur_connexions
+from app.security.principal_cache import cache_principaux
+from app.core.cache_http import cache_catalogue
+from app.services import admin_service, import_service
+from app.services.email_service import etat_file
 from app.schemas.utilisateur import UtilisateurRead
+from app.schemas.import_utilisateurs import ImportResultat
 
 router = APIRouter(
     prefix="/admin",
@@ -33,6 +39,61 @@ def get_system_summary(session: Session = Depends(get_session)):
     """Obtenir une vue d'ensemble du système (Statistiques globales)."""
     return admin_service.get_system_summary(session)
 
+@router.get("/cache/principaux", response_model=Dict[str, Any])
+def get_principal_cache_stats():
+    """Compteurs du cache d'authentification (taux de succès, évictions, invalidations)."""
+    return cache_principaux.statistiques()
+
+@router.get("/cache/catalogue", response_model=Dict[str, Any])
+def get_catalogue_cache_stats():
+    """Compteurs du cache HTTP du catalogue (succès, réponses 304, invalidations)."""
+    return cache_catalogue.statistiques()
+
+@router.get("/emails/file", response_model=Dict[str, Any])
+def get_email_queue_stats(session: Session = Depends(get_session)):
+    """Profondeur de la file d'emails (en attente, dus, échecs, attente du plus ancien)."""
+    return etat_file(session)
+
+@router.get("/securite/connexions", response_model=Dict[str, Any])
+def get_login_throttle_stats():
+    """Compteurs de la limitation des connexions (refus, vérifications Argon2 évitées)."""
+    return limiteur_connexions.statistiques()
+
+async def _importer(session: AsyncSession, lignes: List[Dict[str, Any]], ignorer_erreurs: bool) -> ImportResultat:
+    try:
+        resultat = await import_service.importer_utilisateurs(session, lignes, ignorer_erreurs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if resultat.erreurs and not resultat.crees:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=resultat.model_dump())
+    return resultat
+
+@router.post("/import/utilisateurs", response_model=ImportResultat)
+async def import_users(
+    lignes: List[Dict[str, Any]],
+    ignorer_erreurs: bool = False,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Créer des comptes en masse (nom, prenom, email, telephone, role, password).
+
+    Toutes les lignes sont validées avant la moindre écriture : par défaut une
+    seule ligne invalide annule l'import (422 avec les erreurs par ligne).
+    """
+    return await _importer(session, lignes, ignorer_erreurs)
+
+@router.post("/import/utilisateurs/csv", response_model=ImportResultat)
+async def import_users_csv(
+    fichier: UploadFile = File(...),
+    ignorer_erreurs: bool = False,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Import en masse depuis un CSV avec en-tête (séparateur `,` ou `;`)."""
+    try:
+        lignes = import_service.lire_csv(await fichier.read())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await _importer(session, lignes, ignorer_erreurs)
+
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_user(user_id: int, session: Session = Depends(get_session)):
     """Supprimer définitivement un utilisateur."""
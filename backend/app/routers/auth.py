@@ -1,11 +1,14 @@
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 
-from app.core.database import get_session
-from app.security.auth import authentificate_user, create_access_token
+from app.core.database import get_session, get_async_session
+from app.security.auth import authentificate_user, create_access_token, construire_principal
+from app.security.limiteur import limiteur_connexions, delai_retry_after
+from app.security.principal_cache import cache_principaux
 from app.services.utilisateur_service import verify_email_token
 from app.core.config import settings
 
@@ -19,11 +22,23 @@ router = APIRouter(
 
 @router.post("/token")
 async def login_for_access_token(
-    session: Session = Depends(get_session),
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """Genérer un token d'accès JWT pour l'utilisateur."""
-    utilisateur = authentificate_user(session, form_data.username, form_data.password)
+    # Refus avant toute requête et tout calcul Argon2
+    ip = request.client.host if request.client else "inconnue"
+    attente = await limiteur_connexions.verifier(ip, form_data.username)
+    if attente:
+        retry_after = delai_retry_after(attente)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Trop de tentatives de connexion. Réessayez dans {retry_after} secondes.",
+            headers={"Retry-After": retry_after},
+        )
+
+    utilisateur = await authentificate_user(session, form_data.username, form_data.password)
 
     if not utilisateur:
         raise HTTPException(
@@ -40,8 +55,14 @@ async def login_for_access_token(
         )
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    # Les profils sont résolus une fois ici et voyagent dans le jeton ;
+    # le cache est amorcé pour que la première requête authentifiée n'y retourne pas
+    principal = await construire_principal(session, utilisateur)
+    await session.close()
+    cache_principaux.enregistrer(principal.email, principal)
     access_token = create_access_token(data={"sub": utilisateur.email},
-                                       expires_delta=access_token_expires)
+                                       expires_delta=access_token_expires,
+                                       principal=principal)
 
     return {"access_token": access_token, "token_type": "bearer"}
 
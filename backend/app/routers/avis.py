@@ -23,7 +23,7 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=AvisRead)
-async def create_avis_endpoint(
+def create_avis_endpoint(
     session: Session = Depends(get_session),
     avis_in: AvisCreate = Body(...)
 ):
@@ -34,7 +34,7 @@ async def create_avis_endpoint(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{avis_id}", response_model=AvisRead)
-async def read_avis_endpoint(
+def read_avis_endpoint(
     session: Session = Depends(get_session),
     avis_id: int = Path(...)
 ):
@@ -44,13 +44,13 @@ async def read_avis_endpoint(
     return avis
 
 @router.get("/", response_model=List[AvisRead])
-async def list_avis_endpoint(
+def list_avis_endpoint(
     session: Session = Depends(get_session)
 ):
     return list_avis(session)
 
 @router.put("/{avis_id}", response_model=AvisRead)
-async def update_avis_endpoint(
+def update_avis_endpoint(
     session: Session = Depends(get_session),
     avis_id: int = Path(...),
     avis_in: AvisUpdate = Body(...)
@@ -61,7 +61,7 @@ async def update_avis_endpoint(
     return avis
 
 @router.delete("/{avis_id}", response_model=AvisRead)
-async def delete_avis_endpoint(
+def delete_avis_endpoint(
     session: Session = Depends(get_session),
     avis_id: int = Path(...)
 ):
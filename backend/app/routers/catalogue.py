@@ -0,0 +1,33 @@
+import threading
+
+from fastapi import APIRouter, Depends, Request
+from sqlmodel import Session
+
+from app.core.cache_http import cache_catalogue, serialiser
+from app.core.database import get_session
+from app.schemas.catalogue import Catalogue
+from app.services.catalogue_service import TAGS_CATALOGUE, construire_catalogue
+
+router = APIRouter(
+    prefix="/catalogue",
+    tags=["Catalogue"]
+)
+
+# Une seule reconstruction à la fois : les requêtes concurrentes attendent le document
+_reconstruction = threading.Lock()
+
+
+@router.get("", response_model=Catalogue)
+def read_catalogue_endpoint(
+    request: Request,
+    session: Session = Depends(get_session)
+):
+    """Carte complète (catégories → plats, menus → plats) en une réponse, avec ETag."""
+    consultation = cache_catalogue.consulter(request, tags=TAGS_CATALOGUE)
+    if consultation.reponse:
+        return consultation.reponse
+    with _reconstruction:
+        consultation = cache_catalogue.consulter(request, tags=TAGS_CATALOGUE)
+        if consultation.reponse:
+            return consultation.reponse
+        return consultation.enregistrer(serialiser(Catalogue, construire_catalogue(session)))
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, Body, Path, HTTPException
+from fastapi import APIRouter, Depends, Body, Path, HTTPException, Request
 from sqlmodel import Session
 from app.core.database import get_session
+from app.core.cache_http import cache_catalogue, serialiser
 from typing import List
 
 from app.services.categorie_service import (
@@ -25,7 +26,7 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=CategorieRead, dependencies=[Depends(allow_gerant)])
-async def create_categorie_endpoint(
+def create_categorie_endpoint(
     session: Session = Depends(get_session),
     categorie_in: CategorieCreate = Body(...)
 ):
@@ -33,7 +34,7 @@ async def create_categorie_endpoint(
     return create_categorie(session, categorie_in)
 
 @router.get("/{categorie_id}", response_model=CategorieRead)
-async def read_categorie_endpoint(
+def read_categorie_endpoint(
     session: Session = Depends(get_session),
     categorie_id: int = Path(...)
 ):
@@ -44,14 +45,18 @@ async def read_categorie_endpoint(
     return categorie
 
 @router.get("/", response_model=List[CategorieRead])
-async def list_categories_endpoint(
+def list_categories_endpoint(
+    request: Request,
     session: Session = Depends(get_session)
 ):
-    """Lister toutes les catégories."""
-    return list_categories(session)
+    """Lister toutes les catégories (réponse mise en cache, avec ETag)."""
+    consultation = cache_catalogue.consulter(request, tags=("categorie",))
+    if consultation.reponse:
+        return consultation.reponse
+    return consultation.enregistrer(serialiser(List[CategorieRead], list_categories(session)))
 
 @router.put("/{categorie_id}", response_model=CategorieRead, dependencies=[Depends(allow_gerant)])
-async def update_categorie_endpoint(
+def update_categorie_endpoint(
     session: Session = Depends(get_session),
     categorie_id: int = Path(...),
     categorie_in: CategorieUpdate = Body(...)
@@ -63,7 +68,7 @@ async def update_categorie_endpoint(
     return categorie
 
 @router.delete("/{categorie_id}", response_model=CategorieRead, dependencies=[Depends(allow_gerant)])
-async def delete_categorie_endpoint(
+def delete_categorie_endpoint(
     session: Session = Depends(get_session),
     categorie_id: int = Path(...)
 ):
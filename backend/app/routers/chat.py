@@ -2,11 +2,13 @@
 Router pour le Chat IA - Questions sur les plats
 """
 from fastapi import APIRouter, Depends, Body
-from sqlmodel import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session, select
 from pydantic import BaseModel
 from typing import Optional, List
 
 from app.core.database import get_session
+from app.models.categorie import Categorie
 from app.services.plat_service import list_plats
 from app.services.chat_service import get_ai_response, get_fallback_response
 
@@ -34,6 +36,24 @@ class ChatResponse(BaseModel):
     error: Optional[str] = None
 
 
+def _contexte_plats(session: Session) -> List[dict]:
+    """Plats (et catégorie) convertis en dictionnaires pour le service."""
+    # Noms des catégories en une requête, plutôt qu'une jointure dans list_plats
+    categories = dict(session.exec(select(Categorie.id, Categorie.nom)).all())
+    plats_context = []
+    for plat in list_plats(session):
+        plat_dict = {
+            "id": plat.id,
+            "nom": plat.nom,
+            "description": plat.description,
+            "prix": plat.prix,
+            "disponible": plat.disponible,
+            "categorie": categories.get(plat.categorie_id)
+        }
+        plats_context.append(plat_dict)
+    return plats_context
+
+
 @router.post("/", response_model=ChatResponse)
 async def chat_endpoint(
     request: ChatRequest = Body(...),
@@ -45,21 +65,10 @@ async def chat_endpoint(
     Envoie une question et reçoit une réponse de l'assistant IA
     basée sur le menu du restaurant
     """
-    # Récupérer tous les plats pour le contexte
-    plats_db = list_plats(session)
-    
-    # Convertir en dictionnaires pour le service
-    plats_context = []
-    for plat in plats_db:
-        plat_dict = {
-            "id": plat.id,
-            "nom": plat.nom,
-            "description": plat.description,
-            "prix": plat.prix,
-            "disponible": plat.disponible,
-            "categorie": plat.categorie.nom if hasattr(plat, 'categorie') and plat.categorie else None
-        }
-        plats_context.append(plat_dict)
+    # Récupérer tous les plats pour le contexte (requêtes synchrones : hors de la boucle)
+    plats_context = await run_in_threadpool(_contexte_plats, session)
+    # L'appel au modèle peut durer : la connexion retourne au pool
+    session.close()
     
     # Convertir l'historique de conversation si présent
     history = None
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, Body, Path, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, Body, Path, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
 from app.core.database import get_session
 from typing import List
@@ -23,7 +24,7 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=ClientRead)
-async def create_client_endpoint(
+def create_client_endpoint(
     session: Session = Depends(get_session),
     client_in: ClientCreate = Body(...)
 ):
@@ -31,18 +32,18 @@ async def create_client_endpoint(
 
 @router.post("/register", response_model=ClientRead)
 async def register_client_endpoint(
-    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
     client_in: ClientCreateFull = Body(...)
 ):
     """Créer un utilisateur et son profil client en une seule fois."""
     try:
-        return create_client_full(session, client_in, background_tasks)
+        # Le hachage du mot de passe ne doit pas bloquer la boucle d'événements
+        return await run_in_threadpool(create_client_full, session, client_in)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{client_id}", response_model=ClientRead)
-async def read_client_endpoint(
+def read_client_endpoint(
     session: Session = Depends(get_session),
     client_id: int = Path(...)
 ):
@@ -52,13 +53,13 @@ async def read_client_endpoint(
     return client
 
 @router.get("/", response_model=List[ClientRead])
-async def list_clients_endpoint(
+def list_clients_endpoint(
     session: Session = Depends(get_session)
 ):
     return list_clients(session)
 
 @router.delete("/{client_id}", response_model=ClientRead)
-async def delete_client_endpoint(
+def delete_client_endpoint(
     session: Session = Depends(get_session),
     client_id: int = Path(...)
 ):
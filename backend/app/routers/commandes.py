@@ -1,104 +1,310 @@
-from fastapi import APIRouter, Depends, Body, Path, HTTPException
+from fastapi import APIRouter, Depends, Body, Path, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlmodel import Session
-from app.core.database import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.database import get_session, get_async_session
+from app.core.events import bus
+from datetime import datetime, timezone
 from typing import List, Optional
+import asyncio
+import json
 
 from app.services.commande_service import (
     create_commande,
     read_commande,
-    list_commandes,
-    list_commandes_by_client,
+    read_commande_async,
+    list_commandes_async,
+    list_commandes_by_client_async,
+    encoder_curseur,
+    decoder_curseur,
+    lire_statut_commande_async,
     update_commande,
     delete_commande,
     add_ligne_commande,
+    add_lignes_commande,
+    update_ligne_commande,
+    delete_ligne_commande,
     valider_commande,
     refuser_commande,
     transmettre_cuisine,
     marquer_prete,
     marquer_servie,
     valider_reception,
-    marquer_payee
+    marquer_payee,
+    transitionner_lot,
+    TRANSITIONS
 )
-from app.services.personnel_service import (
-    get_serveur_by_utilisateur_id,
-    get_cuisinier_by_utilisateur_id
-)
-from app.services.client_service import get_client_by_utilisateur_id
-from app.security.auth import get_current_user
-from app.models.utilisateur import Utilisateur
-from app.security.rbac import allow_staff
+from app.services.cuisine_service import lister_file_cuisine, tableau_production
+from app.security.auth import get_current_principal, get_current_principal_flux
+from app.models.commande import CommandeStatus
+from app.schemas.token import Principal
+from app.security.rbac import allow_staff, allow_gerant_or_cuisinier
 
 from app.schemas.commande import (
     CommandeCreate,
     CommandeRead,
-    CommandeUpdate
+    CommandeUpdate,
+    CommandeTransitionRequest,
+    CommandeTransitionResultat,
+    FileCuisineItem,
+    ProductionPlat,
+    CommandeStatutRead
 )
-from app.schemas.ligne_commande import LigneCommandeCreate, LigneCommandeRead
+from app.schemas.ligne_commande import LigneCommandeCreate, LigneCommandeItem, LigneCommandeRead, LigneCommandeUpdate
 
 router = APIRouter(
     prefix="/commandes",
     tags=["Commandes"]
 )
 
+# Intervalle des commentaires keep-alive envoyés sur les flux SSE inactifs
+INTERVALLE_PING_SECONDES = 15
+# Durée maximale pendant laquelle GET /commandes/{id}/status peut retenir la requête
+ATTENTE_MAX_SECONDES = 30
+
+
+def _etag_statut(commande_id: int, status: CommandeStatus) -> str:
+    # Toute écriture du statut (PUT compris) suit TRANSITIONS, qui n'a pas de
+    # cycle : les statuts ne font qu'avancer et le couple (id, statut) suffit comme version
+    return f'"{commande_id}-{CommandeStatus(status).value}"'
+
 @router.post("/", response_model=CommandeRead)
-async def create_commande_endpoint(
+def create_commande_endpoint(
     session: Session = Depends(get_session),
     commande_in: CommandeCreate = Body(...),
-    current_user: Utilisateur = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Créer une commande (lie automatiquement au client si connecté)."""
     if current_user.role.upper() == "CLIENT":
-        client = get_client_by_utilisateur_id(session, current_user.id)
-        if not client:
+        if not current_user.client_id:
             raise HTTPException(status_code=400, detail="Profil client manquant.")
-        commande_in.client_id = client.id
+        commande_in.client_id = current_user.client_id
         
     return create_commande(session, commande_in)
 
+@router.get("/flux")
+async def flux_commandes_endpoint(
+    request: Request,
+    current_user: Principal = Depends(get_current_principal_flux),
+    role: Optional[str] = None,
+    table_id: Optional[int] = None,
+    client_id: Optional[int] = None
+):
+    """Flux SSE des changements de commandes (remplace le polling des écrans).
+
+    Le personnel peut filtrer par rôle, table ou client ; un client ne reçoit
+    que les événements de ses propres commandes.
+    """
+    role_filtre = role or current_user.role
+    if current_user.role.upper() == "CLIENT":
+        if not current_user.client_id:
+            raise HTTPException(status_code=400, detail="Profil client manquant.")
+        role_filtre, client_id = "client", current_user.client_id
+
+    async def generer():
+        with bus.abonner(role=role_filtre, table_id=table_id, client_id=client_id) as abonnement:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    evenement = await asyncio.wait_for(abonnement.queue.get(), timeout=INTERVALLE_PING_SECONDES)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {evenement['event']}\ndata: {json.dumps(evenement)}\n\n"
+
+    return StreamingResponse(
+        generer(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/cuisine/production", response_model=List[ProductionPlat])
+def production_cuisine_endpoint(
+    session: Session = Depends(get_session),
+    current_user = Depends(allow_gerant_or_cuisinier),
+    status: List[CommandeStatus] = Query(default=[CommandeStatus.EN_COURS])
+):
+    """Tableau de production : quantité totale par plat sur les commandes actives, notes regroupées."""
+    return tableau_production(session, status)
+
+@router.post("/transition", response_model=List[CommandeTransitionResultat])
+def transition_commandes_endpoint(
+    transition_in: CommandeTransitionRequest = Body(...),
+    session: Session = Depends(get_session),
+    current_user = Depends(allow_staff)
+):
+    """Faire passer plusieurs commandes au même statut en une seule transaction.
+
+    Exemple : un cuisinier termine plusieurs commandes, un serveur sert toute
+    une table. Le résultat est détaillé commande par commande.
+    """
+    if not transition_in.commande_ids:
+        raise HTTPException(status_code=400, detail="Aucune commande à traiter")
+    transition = TRANSITIONS.get(transition_in.status)
+    if transition is None:
+        raise HTTPException(status_code=400, detail=f"Aucune transition vers le statut: {transition_in.status.value}")
+
+    # Le serveur ou le cuisinier est déduit de l'utilisateur connecté
+    acteur_id = None
+    if transition.acteur == "serveur_id":
+        if not current_user.serveur_id:
+            raise HTTPException(status_code=403, detail="L'utilisateur actuel n'a pas de profil serveur")
+        acteur_id = current_user.serveur_id
+    elif transition.acteur == "cuisinier_id":
+        if not current_user.cuisinier_id:
+            raise HTTPException(status_code=403, detail="L'utilisateur actuel n'a pas de profil cuisinier")
+        acteur_id = current_user.cuisinier_id
+
+    try:
+        _, echecs = transitionner_lot(
+            session, transition_in.commande_ids, transition_in.status,
+            acteur_id=acteur_id, raison=transition_in.raison, methode=transition_in.methode
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return [
+        CommandeTransitionResultat(commande_id=i, succes=False, erreur=echecs[i]) if i in echecs
+        else CommandeTransitionResultat(commande_id=i, succes=True, status=transition_in.status)
+        for i in dict.fromkeys(transition_in.commande_ids)
+    ]
+
+@router.get("/cuisine/queue", response_model=List[FileCuisineItem])
+def file_cuisine_endpoint(
+    session: Session = Depends(get_session),
+    current_user = Depends(allow_staff),
+    limit: Optional[int] = Query(default=None, ge=1)
+):
+    """File de la cuisine : commandes EN_COURS par priorité (attente, taille, plat le plus long).
+
+    Servie depuis une structure en mémoire tenue à jour par les transitions.
+    """
+    maintenant = datetime.now(timezone.utc)
+    return [
+        FileCuisineItem(
+            commande_id=e.commande_id,
+            table_id=e.table_id,
+            date_commande=e.date_commande,
+            nombre_articles=e.nombre_articles,
+            temps_preparation_max=e.temps_preparation_max,
+            attente_secondes=int((maintenant - e.date_commande).total_seconds()),
+        )
+        for e in lister_file_cuisine(session, limit)
+    ]
+
 @router.get("/{commande_id}", response_model=CommandeRead)
 async def read_commande_endpoint(
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     commande_id: int = Path(...),
-    current_user: Utilisateur = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Récupérer une commande par son ID (avec vérification de propriété)."""
-    commande = read_commande(session, commande_id)
+    commande = await read_commande_async(session, commande_id)
     if not commande:
         raise HTTPException(status_code=404, detail="Commande non trouvée")
         
     # Vérification de propriété pour les clients
     if current_user.role.upper() == "CLIENT":
-        client = get_client_by_utilisateur_id(session, current_user.id)
-        if not client or commande.client_id != client.id:
+        if not current_user.client_id or commande.client_id != current_user.client_id:
             raise HTTPException(status_code=403, detail="Accès non autorisé à cette commande.")
             
     return commande
 
 @router.get("/", response_model=List[CommandeRead])
 async def list_commandes_endpoint(
-    session: Session = Depends(get_session),
-    current_user: Utilisateur = Depends(get_current_user),
-    client_id: Optional[int] = None
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_principal),
+    client_id: Optional[int] = None,
+    status: List[CommandeStatus] = Query(default=[]),
+    table_id: Optional[int] = None,
+    serveur_id: Optional[int] = None,
+    date_debut: Optional[datetime] = None,
+    date_fin: Optional[datetime] = None,
+    curseur: Optional[str] = None,
+    limit: int = Query(default=100, ge=1, le=500)
 ):
-    """Lister les commandes (filtrées pour les clients, toutes pour le staff)."""
+    """Lister les commandes (filtrées pour les clients, toutes pour le staff).
+
+    Les commandes sont triées par (date_commande, id). Lorsqu'une page est
+    pleine, l'en-tête `X-Next-Cursor` contient le curseur de la page suivante.
+    """
+    try:
+        apres = decoder_curseur(curseur) if curseur else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    filtres = dict(
+        statuts=status, table_id=table_id, serveur_id=serveur_id,
+        date_debut=date_debut, date_fin=date_fin, apres=apres, limit=limit
+    )
     if current_user.role.upper() == "CLIENT":
-        client = get_client_by_utilisateur_id(session, current_user.id)
-        if not client:
+        if not current_user.client_id:
             return []
-        return list_commandes_by_client(session, client.id)
-    
+        commandes = await list_commandes_by_client_async(session, current_user.client_id, **filtres)
     # Pour le staff, si client_id est spécifié, on filtre
-    if client_id:
-        return list_commandes_by_client(session, client_id)
-        
-    return list_commandes(session)
+    elif client_id:
+        commandes = await list_commandes_by_client_async(session, client_id, **filtres)
+    else:
+        commandes = await list_commandes_async(session, **filtres)
+
+    if len(commandes) == limit:
+        response.headers["X-Next-Cursor"] = encoder_curseur(commandes[-1])
+    return commandes
+
+@router.get("/{commande_id}/status", response_model=CommandeStatutRead)
+async def statut_commande_endpoint(
+    request: Request,
+    commande_id: int = Path(...),
+    wait: float = Query(default=0, ge=0, le=ATTENTE_MAX_SECONDES),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Statut seul d'une commande, avec ETag.
+
+    `If-None-Match` identique au statut courant -> 304. Avec `wait=N`, la
+    requête est retenue jusqu'à ce que le statut change ou que N secondes
+    s'écoulent, ce qui remplace le polling du suivi de commande.
+    """
+    etag_client = request.headers.get("if-none-match")
+    # Abonnement avant la lecture : aucun changement ne peut passer entre les deux
+    with bus.abonner(commande_id=commande_id) as abonnement:
+        statut = await lire_statut_commande_async(session, commande_id)
+        if not statut:
+            raise HTTPException(status_code=404, detail="Commande non trouvée")
+        status, client_id = statut
+        if current_user.role.upper() == "CLIENT":
+            if not current_user.client_id or client_id != current_user.client_id:
+                raise HTTPException(status_code=403, detail="Accès non autorisé à cette commande.")
+        # L'attente ne doit pas immobiliser une connexion du pool
+        await session.close()
+
+        etag = _etag_statut(commande_id, status)
+        echeance = asyncio.get_running_loop().time() + wait
+        while etag == etag_client:
+            reste = echeance - asyncio.get_running_loop().time()
+            if reste <= 0:
+                break
+            try:
+                evenement = await asyncio.wait_for(abonnement.queue.get(), timeout=reste)
+            except asyncio.TimeoutError:
+                break
+            status = evenement["status"]
+            etag = _etag_statut(commande_id, status)
+
+    if etag == etag_client:
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(
+        {"commande_id": commande_id, "status": CommandeStatus(status).value},
+        headers={"ETag": etag, "Cache-Control": "no-cache"}
+    )
 
 @router.put("/{commande_id}", response_model=CommandeRead)
-async def update_commande_endpoint(
+def update_commande_endpoint(
     session: Session = Depends(get_session),
     commande_id: int = Path(...),
     commande_in: CommandeUpdate = Body(...),
-    current_user: Utilisateur = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Mettre à jour une commande (avec vérification de propriété)."""
     db_commande = read_commande(session, commande_id)
@@ -106,18 +312,19 @@ async def update_commande_endpoint(
         raise HTTPException(status_code=404, detail="Commande non trouvée")
         
     if current_user.role.upper() == "CLIENT":
-        client = get_client_by_utilisateur_id(session, current_user.id)
-        if not client or db_commande.client_id != client.id:
+        if not current_user.client_id or db_commande.client_id != current_user.client_id:
             raise HTTPException(status_code=403, detail="Action non autorisée sur cette commande.")
 
-    commande = update_commande(session, commande_id, commande_in)
-    return commande
+    try:
+        return update_commande(session, commande_id, commande_in)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/{commande_id}", response_model=CommandeRead)
-async def delete_commande_endpoint(
+def delete_commande_endpoint(
     session: Session = Depends(get_session),
     commande_id: int = Path(...),
-    current_user: Utilisateur = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Supprimer une commande (avec vérification de propriété)."""
     db_commande = read_commande(session, commande_id)
@@ -125,15 +332,14 @@ async def delete_commande_endpoint(
         raise HTTPException(status_code=404, detail="Commande non trouvée")
         
     if current_user.role.upper() == "CLIENT":
-        client = get_client_by_utilisateur_id(session, current_user.id)
-        if not client or db_commande.client_id != client.id:
+        if not current_user.client_id or db_commande.client_id != current_user.client_id:
             raise HTTPException(status_code=403, detail="Action non autorisée sur cette commande.")
 
     commande = delete_commande(session, commande_id)
     return commande
 
 @router.post("/{commande_id}/lignes", response_model=LigneCommandeRead)
-async def add_ligne_commande_endpoint(
+def add_ligne_commande_endpoint(
     commande_id: int,
     ligne_in: LigneCommandeCreate,
     session: Session = Depends(get_session)
@@ -142,8 +348,47 @@ async def add_ligne_commande_endpoint(
         raise HTTPException(status_code=400, detail="ID commande incohérent")
     return add_ligne_commande(session, ligne_in)
 
+@router.post("/{commande_id}/lignes/batch", response_model=List[LigneCommandeRead])
+def add_lignes_commande_endpoint(
+    commande_id: int,
+    lignes_in: List[LigneCommandeItem] = Body(...),
+    session: Session = Depends(get_session)
+):
+    """Ajouter toutes les lignes d'un panier en une seule requête et une seule transaction."""
+    if not lignes_in:
+        raise HTTPException(status_code=400, detail="Aucune ligne à ajouter")
+    lignes = add_lignes_commande(session, commande_id, lignes_in)
+    if lignes is None:
+        raise HTTPException(status_code=404, detail="Commande non trouvée")
+    return lignes
+
+@router.put("/{commande_id}/lignes/{ligne_id}", response_model=LigneCommandeRead)
+def update_ligne_commande_endpoint(
+    commande_id: int,
+    ligne_id: int,
+    ligne_in: LigneCommandeUpdate = Body(...),
+    session: Session = Depends(get_session)
+):
+    """Modifier une ligne (quantité, notes, statut) ; le total suit la variation."""
+    ligne = update_ligne_commande(session, commande_id, ligne_id, ligne_in)
+    if not ligne:
+        raise HTTPException(status_code=404, detail="Ligne de commande non trouvée")
+    return ligne
+
+@router.delete("/{commande_id}/lignes/{ligne_id}", response_model=LigneCommandeRead)
+def delete_ligne_commande_endpoint(
+    commande_id: int,
+    ligne_id: int,
+    session: Session = Depends(get_session)
+):
+    """Retirer une ligne d'une commande ; son montant est retranché du total."""
+    ligne = delete_ligne_commande(session, commande_id, ligne_id)
+    if not ligne:
+        raise HTTPException(status_code=404, detail="Ligne de commande non trouvée")
+    return ligne
+
 @router.post("/{commande_id}/valider", response_model=CommandeRead)
-async def valider_commande_endpoint(
+def valider_commande_endpoint(
     commande_id: int,
     serveur_id: int | None = None,
     session: Session = Depends(get_session),
@@ -156,10 +401,9 @@ async def valider_commande_endpoint(
         # Si aucun serveur_id n'est passé, on prend celui de l'utilisateur actuel
         # Ou si le serveur_id passé correspond à un utilisateur_id (cas du frontend actuel)
         if final_serveur_id is None or final_serveur_id == current_user.id:
-            serveur = get_serveur_by_utilisateur_id(session, current_user.id)
-            if not serveur:
+            if not current_user.serveur_id:
                  raise HTTPException(status_code=403, detail="L'utilisateur actuel n'a pas de profil serveur")
-            final_serveur_id = serveur.id
+            final_serveur_id = current_user.serveur_id
 
         commande = valider_commande(session, commande_id, final_serveur_id)
         if not commande:
@@ -169,7 +413,7 @@ async def valider_commande_endpoint(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/{commande_id}/refuser", response_model=CommandeRead)
-async def refuser_commande_endpoint(
+def refuser_commande_endpoint(
     commande_id: int,
     raison: str = Body(..., embed=True),
     serveur_id: int | None = None,
@@ -180,10 +424,9 @@ async def refuser_commande_endpoint(
     try:
         final_serveur_id = serveur_id
         if final_serveur_id is None or final_serveur_id == current_user.id:
-            serveur = get_serveur_by_utilisateur_id(session, current_user.id)
-            if not serveur:
+            if not current_user.serveur_id:
                  raise HTTPException(status_code=403, detail="L'utilisateur actuel n'a pas de profil serveur")
-            final_serveur_id = serveur.id
+            final_serveur_id = current_user.serveur_id
 
         commande = refuser_commande(session, commande_id, final_serveur_id, raison)
         if not commande:
@@ -193,7 +436,7 @@ async def refuser_commande_endpoint(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/{commande_id}/preparer", response_model=CommandeRead)
-async def transmettre_cuisine_endpoint(
+def transmettre_cuisine_endpoint(
     commande_id: int,
     session: Session = Depends(get_session)
 ):
@@ -207,7 +450,7 @@ async def transmettre_cuisine_endpoint(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/{commande_id}/prete", response_model=CommandeRead)
-async def marquer_prete_endpoint(
+def marquer_prete_endpoint(
     commande_id: int,
     cuisinier_id: int | None = None,
     session: Session = Depends(get_session),
@@ -219,10 +462,9 @@ async def marquer_prete_endpoint(
         
         # Résolution automatique du cuisinier_id
         if final_cuisinier_id is None or final_cuisinier_id == current_user.id or final_cuisinier_id == 1: # 1 est souvent un mock
-            cuisinier = get_cuisinier_by_utilisateur_id(session, current_user.id)
-            if not cuisinier:
+            if not current_user.cuisinier_id:
                  raise HTTPException(status_code=403, detail="L'utilisateur actuel n'a pas de profil cuisinier")
-            final_cuisinier_id = cuisinier.id
+            final_cuisinier_id = current_user.cuisinier_id
 
         commande = marquer_prete(session, commande_id, final_cuisinier_id)
         if not commande:
@@ -232,7 +474,7 @@ async def marquer_prete_endpoint(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/{commande_id}/servir", response_model=CommandeRead)
-async def marquer_servie_endpoint(
+def marquer_servie_endpoint(
     commande_id: int,
     session: Session = Depends(get_session)
 ):
@@ -246,7 +488,7 @@ async def marquer_servie_endpoint(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/{commande_id}/receptionner", response_model=CommandeRead)
-async def valider_reception_endpoint(
+def valider_reception_endpoint(
     commande_id: int,
     session: Session = Depends(get_session)
 ):
@@ -260,13 +502,16 @@ async def valider_reception_endpoint(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/{commande_id}/payee", response_model=CommandeRead)
-async def marquer_payee_endpoint(
+def marquer_payee_endpoint(
     commande_id: int = Path(...),
     methode: str = "especes",
     session: Session = Depends(get_session)
 ):
     """Marquer une commande comme payée (action serveur)."""
-    commande = marquer_payee(session, commande_id, methode)
-    if not commande:
-        raise HTTPException(status_code=404, detail="Commande non trouvée")
-    return commande
+    try:
+        commande = marquer_payee(session, commande_id, methode)
+        if not commande:
+            raise HTTPException(status_code=404, detail="Commande non trouvée")
+        return commande
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
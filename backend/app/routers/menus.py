@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, Body, Path, HTTPException
+from fastapi import APIRouter, Depends, Body, Path, HTTPException, Request
 from sqlmodel import Session
 from app.core.database import get_session
+from app.core.cache_http import cache_catalogue, serialiser
 
 from app.services.menu_service import (
     delete_menu,
@@ -24,14 +25,14 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=MenuRead)
-async def create_menu_endpoint(
+def create_menu_endpoint(
     session: Session = Depends(get_session),
     menu_in: MenuCreate = Body(...)
 ):
     return create_menu(session, menu_in)
 
 @router.get("/{menu_id}", response_model=MenuRead)
-async def read_menu_endpoint(
+def read_menu_endpoint(
     session: Session = Depends(get_session),
     menu_id: int = Path(...)
 ):
@@ -41,13 +42,17 @@ async def read_menu_endpoint(
     return menu
 
 @router.get("/", response_model=list[MenuRead])
-async def list_menus_endpoint(
+def list_menus_endpoint(
+    request: Request,
     session: Session = Depends(get_session)
 ):
-    return list_menus(session)
+    consultation = cache_catalogue.consulter(request, tags=("menu",))
+    if consultation.reponse:
+        return consultation.reponse
+    return consultation.enregistrer(serialiser(list[MenuRead], list_menus(session)))
 
 @router.put("/{menu_id}", response_model=MenuRead)
-async def update_menu_endpoint(
+def update_menu_endpoint(
     session: Session = Depends(get_session),
     menu_id: int = Path(...),
     menu_in: MenuUpdate = Body(...)
@@ -58,7 +63,7 @@ async def update_menu_endpoint(
     return menu
 
 @router.delete("/{menu_id}", response_model=MenuRead)
-async def delete_menu_endpoint(
+def delete_menu_endpoint(
     session: Session = Depends(get_session),
     menu_id: int = Path(...)
 ):
@@ -68,7 +73,7 @@ async def delete_menu_endpoint(
     return menu
 
 @router.post("/{menu_id}/plats/{plat_id}")
-async def add_plat_to_menu_endpoint(
+def add_plat_to_menu_endpoint(
     menu_id: int,
     plat_id: int,
     session: Session = Depends(get_session)
@@ -76,7 +81,7 @@ async def add_plat_to_menu_endpoint(
     return add_plat_to_menu(session, menu_id, plat_id)
 
 @router.delete("/{menu_id}/plats/{plat_id}")
-async def remove_plat_from_menu_endpoint(
+def remove_plat_from_menu_endpoint(
     menu_id: int,
     plat_id: int,
     session: Session = Depends(get_session)
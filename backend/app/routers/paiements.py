@@ -14,7 +14,7 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=PaiementRead)
-async def create_payment_endpoint(
+def create_payment_endpoint(
     session: Session = Depends(get_session),
     paiement_in: PaiementCreate = Body(...)
 ):
@@ -22,7 +22,7 @@ async def create_payment_endpoint(
     return process_payment(session, paiement_in)
 
 @router.get("/addition/{commande_id}")
-async def get_addition_endpoint(
+def get_addition_endpoint(
     commande_id: int = Path(...),
     session: Session = Depends(get_session)
 ):
@@ -31,7 +31,7 @@ async def get_addition_endpoint(
     return {"commande_id": commande_id, "total": total}
 
 @router.get("/commande/{commande_id}", response_model=PaiementRead)
-async def get_payment_by_commande_endpoint(
+def get_payment_by_commande_endpoint(
     commande_id: int = Path(...),
     session: Session = Depends(get_session)
 ):
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, Body, Path, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, Body, Path, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
 from app.core.database import get_session
 from typing import List
@@ -34,7 +35,7 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=PersonnelRead)
-async def create_personnel_endpoint(
+def create_personnel_endpoint(
     session: Session = Depends(get_session),
     personnel_in: PersonnelCreate = Body(...)
 ):
@@ -42,75 +43,71 @@ async def create_personnel_endpoint(
 
 @router.post("/register", response_model=PersonnelRead)
 async def register_personnel_endpoint(
-    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
     personnel_in: PersonnelCreateFull = Body(...)
 ):
     """Créer un utilisateur et un profil personnel."""
     try:
-        return create_personnel_full(session, personnel_in, background_tasks)
+        return await run_in_threadpool(create_personnel_full, session, personnel_in)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/register/gerants", response_model=GerantRead)
 async def register_gerant_endpoint(
-    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
     gerant_in: GerantCreateFull = Body(...)
 ):
     """Créer un utilisateur et un profil gérant."""
     try:
-        return create_gerant_full(session, gerant_in, background_tasks)
+        return await run_in_threadpool(create_gerant_full, session, gerant_in)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/register/serveurs", response_model=ServeurRead)
 async def register_serveur_endpoint(
-    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
     serveur_in: ServeurCreateFull = Body(...)
 ):
     """Créer un utilisateur et un profil serveur."""
     try:
-        return create_serveur_full(session, serveur_in, background_tasks)
+        return await run_in_threadpool(create_serveur_full, session, serveur_in)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/register/cuisiniers", response_model=PersonnelRead)
 async def register_cuisinier_endpoint(
-    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
     cuisinier_in: CuisinierCreateFull = Body(...)
 ):
     """Créer un utilisateur et un profil cuisinier."""
     try:
-        return create_cuisinier_full(session, cuisinier_in, background_tasks)
+        return await run_in_threadpool(create_cuisinier_full, session, cuisinier_in)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/gerants", response_model=GerantRead)
-async def create_gerant_endpoint(
+def create_gerant_endpoint(
     session: Session = Depends(get_session),
     gerant_in: GerantCreate = Body(...)
 ):
     return create_gerant(session, gerant_in)
 
 @router.post("/serveurs", response_model=ServeurRead)
-async def create_serveur_endpoint(
+def create_serveur_endpoint(
     session: Session = Depends(get_session),
     serveur_in: ServeurCreate = Body(...)
 ):
     return create_serveur(session, serveur_in)
 
 @router.post("/cuisiniers", response_model=cuisinierRead)
-async def create_cuisinier_endpoint(
+def create_cuisinier_endpoint(
     session: Session = Depends(get_session),
     cuisinier_in: cuisinierCreate = Body(...)
 ):
     return create_cuisinier(session, cuisinier_in)
 
 @router.get("/{personnel_id}", response_model=PersonnelRead)
-async def read_personnel_endpoint(
+def read_personnel_endpoint(
     session: Session = Depends(get_session),
     personnel_id: int = Path(...)
 ):
@@ -120,13 +117,13 @@ async def read_personnel_endpoint(
     return personnel
 
 @router.get("/", response_model=List[PersonnelRead])
-async def list_personnel_endpoint(
+def list_personnel_endpoint(
     session: Session = Depends(get_session)
 ):
     return list_personnel(session)
 
 @router.delete("/{personnel_id}", response_model=PersonnelRead)
-async def delete_personnel_endpoint(
+def delete_personnel_endpoint(
     session: Session = Depends(get_session),
     personnel_id: int = Path(...)
 ):
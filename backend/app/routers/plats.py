@@ -1,23 +1,29 @@
-from fastapi import APIRouter, Depends, Body, Path, HTTPException, File, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, Body, Path, Query, HTTPException, File, UploadFile, Request
 from sqlmodel import Session
-from app.core.database import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.database import get_session, get_async_session
+from app.core.cache_http import cache_catalogue, serialiser
 
 from app.services.plat_service import (
     delete_plat,
     update_plat,
-    list_plats,
-    read_plat,
+    list_plats_async,
+    read_plat_async,
     create_plat,
-    get_plat_by_nom,
-    update_plat_image
+    get_plat_by_nom_async,
+    update_plat_image,
+    generer_variantes_plat
 )       
 
 from app.schemas.plat import (
     PlatCreate,
     PlatRead,
-    PlatUpdate
+    PlatUpdate,
+    TriPlats
 )
 
+from app.services.recherche_service import rechercher_plats
+from app.services.storage_service import ImageTropVolumineuse
 from app.security.rbac import allow_gerant, allow_gerant_or_cuisinier
 
 router = APIRouter(
@@ -26,7 +32,7 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=PlatRead, dependencies=[Depends(allow_gerant)])
-async def create_plat_endpoint(
+def create_plat_endpoint(
     session: Session = Depends(get_session),
     plat_in: PlatCreate = Body(...)
 ) -> any:
@@ -36,15 +42,29 @@ async def create_plat_endpoint(
     return create_plat(session, plat_in)
 
 
+@router.get("/recherche", response_model=list[PlatRead])
+def search_plats_endpoint(
+    session: Session = Depends(get_session),
+    q: str = Query(..., min_length=1, max_length=100),
+    limite: int = Query(20, ge=1, le=100),
+    disponible: bool | None = Query(None)
+) -> any:
+    """
+    Rechercher des plats par nom, description ou catégorie
+    (sans accents, préfixes et fautes de frappe tolérés), par pertinence
+    """
+    return rechercher_plats(session, q, limite, disponible)
+
+
 @router.get("/{plat_id}", response_model=PlatRead)
 async def read_plat_endpoint(
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     plat_id: int = Path(...)
 ) -> any:
     """
     Récupérer un plat par son ID
     """
-    plat = read_plat(session, plat_id)
+    plat = await read_plat_async(session, plat_id)
     if not plat:
         raise HTTPException(status_code=404, detail="Plat non trouvé")
     return plat
@@ -52,20 +72,20 @@ async def read_plat_endpoint(
 
 @router.get("/nom/{nom}", response_model=PlatRead)
 async def read_plat_by_nom_endpoint(
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     nom: str = Path(...)
 ) -> any:
     """
     Récupérer un plat par son nom
     """
-    plat = get_plat_by_nom(session, nom)
+    plat = await get_plat_by_nom_async(session, nom)
     if not plat:
         raise HTTPException(status_code=404, detail="Plat non trouvé")
     return plat
 
 
 @router.delete("/{plat_id}", response_model=PlatRead, dependencies=[Depends(allow_gerant)])
-async def delete_plat_endpoint(
+def delete_plat_endpoint(
     session: Session = Depends(get_session),
     plat_id: int = Path(...)
 ) -> any:
@@ -79,7 +99,7 @@ async def delete_plat_endpoint(
 
 
 @router.put("/{plat_id}", response_model=PlatRead, dependencies=[Depends(allow_gerant_or_cuisinier)])
-async def update_plat_endpoint(
+def update_plat_endpoint(
     session: Session = Depends(get_session),
     plat_id: int = Path(...),
     plat_in: PlatUpdate = Body(...)
@@ -91,25 +111,53 @@ async def update_plat_endpoint(
 
 
 @router.get("/", response_model=list[PlatRead])
-def list_plats_endpoint(
-    session: Session = Depends(get_session)
+async def list_plats_endpoint(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+    categorie_id: int | None = None,
+    disponible: bool | None = None,
+    prix_min: int | None = Query(None, ge=0),
+    prix_max: int | None = Query(None, ge=0),
+    tri: TriPlats = TriPlats.ID,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500)
 ) -> any:
     """
-    Lire tous les plats
+    Lire les plats, filtrés par catégorie, disponibilité et prix, triés par `tri`
+    (`id`, `nom`, `prix` ou `-prix`) ; mis en cache, 304 si `If-None-Match` correspond
     """
-    return list_plats(session)
+    consultation = cache_catalogue.consulter(request, tags=("plat",))
+    if consultation.reponse:
+        return consultation.reponse
+    try:
+        plats = await list_plats_async(
+            session, categorie_id=categorie_id, disponible=disponible,
+            prix_min=prix_min, prix_max=prix_max, tri=tri, skip=skip, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return consultation.enregistrer(serialiser(list[PlatRead], plats))
 
 
 @router.post("/{plat_id}/image", response_model=PlatRead, dependencies=[Depends(allow_gerant)])
 async def upload_plat_image_endpoint(
+    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
     plat_id: int = Path(...),
     file: UploadFile = File(...)
 ) -> any:
     """
-    Télécharger une image pour un plat
+    Télécharger une image pour un plat (JPEG, PNG, WebP ou GIF, taille bornée).
+    Les variantes réduites et WebP sont générées après la réponse.
     """
-    plat = update_plat_image(session, plat_id, file)
+    try:
+        plat = await update_plat_image(session, plat_id, file)
+    except ImageTropVolumineuse as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not plat:
         raise HTTPException(status_code=404, detail="Plat non trouvé")
+    if not plat.image_variantes:
+        background_tasks.add_task(generer_variantes_plat, plat.image_url)
     return plat
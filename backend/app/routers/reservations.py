@@ -1,24 +1,25 @@
 from fastapi import APIRouter, Depends, Body, Path, HTTPException
 from sqlmodel import Session
-from app.core.database import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.database import get_session, get_async_session
 from typing import List
 from datetime import datetime
 
 from app.services.reservation_service import (
     create_reservation,
     read_reservation,
-    list_reservations,
-    list_reservations_by_client,
+    read_reservation_async,
+    list_reservations_async,
+    list_reservations_by_client_async,
     update_reservation,
     delete_reservation,
     confirmer_reservation,
     annuler_reservation,
-    is_table_available
+    is_table_available_async
 )       
 
-from app.services.client_service import get_client_by_utilisateur_id
-from app.security.auth import get_current_user
-from app.models.utilisateur import Utilisateur
+from app.security.auth import get_current_principal
+from app.schemas.token import Principal
 
 from app.schemas.reservation import (
     ReservationCreate,
@@ -32,18 +33,17 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=ReservationRead)
-async def create_reservation_endpoint(
+def create_reservation_endpoint(
     session: Session = Depends(get_session),
     reservation_in: ReservationCreate = Body(...),
-    current_user: Utilisateur = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Créer une réservation (lien automatique au profil du client si connecté)."""
     # Si c'est un client, on force son ID de client
     if current_user.role.upper() == "CLIENT":
-        client = get_client_by_utilisateur_id(session, current_user.id)
-        if not client:
+        if not current_user.client_id:
              raise HTTPException(status_code=400, detail="Profil client manquant.")
-        reservation_in.client_id = client.id
+        reservation_in.client_id = current_user.client_id
 
     try:
         return create_reservation(session, reservation_in)
@@ -52,44 +52,42 @@ async def create_reservation_endpoint(
 
 @router.get("/{reservation_id}", response_model=ReservationRead)
 async def read_reservation_endpoint(
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     reservation_id: int = Path(...),
-    current_user: Utilisateur = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Récupérer une réservation par son ID (avec vérification de propriété)."""
-    reservation = read_reservation(session, reservation_id)
+    reservation = await read_reservation_async(session, reservation_id)
     if not reservation:
         raise HTTPException(status_code=404, detail="Réservation non trouvée")
     
     # Vérification de propriété pour les clients
     if current_user.role.upper() == "CLIENT":
-        client = get_client_by_utilisateur_id(session, current_user.id)
-        if not client or reservation.client_id != client.id:
+        if not current_user.client_id or reservation.client_id != current_user.client_id:
             raise HTTPException(status_code=403, detail="Accès non autorisé à cette réservation.")
             
     return reservation
 
 @router.get("/", response_model=List[ReservationRead])
 async def list_reservations_endpoint(
-    session: Session = Depends(get_session),
-    current_user: Utilisateur = Depends(get_current_user)
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Lister les réservations (filtrées pour les clients, toutes pour le staff)."""
     if current_user.role.upper() == "CLIENT":
-        client = get_client_by_utilisateur_id(session, current_user.id)
-        if not client:
+        if not current_user.client_id:
             return []
-        return list_reservations_by_client(session, client.id)
+        return await list_reservations_by_client_async(session, current_user.client_id)
     
     # Pour le manager, serveur, cuisinier, on lister tout
-    return list_reservations(session)
+    return await list_reservations_async(session)
 
 @router.put("/{reservation_id}", response_model=ReservationRead)
-async def update_reservation_endpoint(
+def update_reservation_endpoint(
     session: Session = Depends(get_session),
     reservation_id: int = Path(...),
     reservation_in: ReservationUpdate = Body(...),
-    current_user: Utilisateur = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Mettre à jour une réservation (avec vérification de propriété)."""
     db_reservation = read_reservation(session, reservation_id)
@@ -98,18 +96,17 @@ async def update_reservation_endpoint(
         
     # Vérification de propriété pour les clients
     if current_user.role.upper() == "CLIENT":
-        client = get_client_by_utilisateur_id(session, current_user.id)
-        if not client or db_reservation.client_id != client.id:
+        if not current_user.client_id or db_reservation.client_id != current_user.client_id:
             raise HTTPException(status_code=403, detail="Action non autorisée sur cette réservation.")
 
     reservation = update_reservation(session, reservation_id, reservation_in)
     return reservation
 
 @router.delete("/{reservation_id}", response_model=ReservationRead)
-async def delete_reservation_endpoint(
+def delete_reservation_endpoint(
     session: Session = Depends(get_session),
     reservation_id: int = Path(...),
-    current_user: Utilisateur = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Supprimer une réservation (avec vérification de propriété)."""
     db_reservation = read_reservation(session, reservation_id)
@@ -118,18 +115,17 @@ async def delete_reservation_endpoint(
         
     # Vérification de propriété pour les clients
     if current_user.role.upper() == "CLIENT":
-        client = get_client_by_utilisateur_id(session, current_user.id)
-        if not client or db_reservation.client_id != client.id:
+        if not current_user.client_id or db_reservation.client_id != current_user.client_id:
             raise HTTPException(status_code=403, detail="Action non autorisée sur cette réservation.")
 
     reservation = delete_reservation(session, reservation_id)
     return reservation
 
 @router.post("/{reservation_id}/confirmer", response_model=ReservationRead)
-async def confirmer_reservation_endpoint(
+def confirmer_reservation_endpoint(
     reservation_id: int = Path(...),
     session: Session = Depends(get_session),
-    current_user: Utilisateur = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Confirmer une réservation (Personnel uniquement)."""
     if current_user.role.upper() == "CLIENT":
@@ -141,10 +137,10 @@ async def confirmer_reservation_endpoint(
     return reservation
 
 @router.post("/{reservation_id}/annuler", response_model=ReservationRead)
-async def annuler_reservation_endpoint(
+def annuler_reservation_endpoint(
     reservation_id: int = Path(...),
     session: Session = Depends(get_session),
-    current_user: Utilisateur = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Annuler une réservation (Propriétaire ou Personnel)."""
     db_reservation = read_reservation(session, reservation_id)
@@ -153,18 +149,17 @@ async def annuler_reservation_endpoint(
         
     # Vérification de propriété pour les clients
     if current_user.role.upper() == "CLIENT":
-        client = get_client_by_utilisateur_id(session, current_user.id)
-        if not client or db_reservation.client_id != client.id:
+        if not current_user.client_id or db_reservation.client_id != current_user.client_id:
             raise HTTPException(status_code=403, detail="Action non autorisée sur cette réservation.")
 
     reservation = annuler_reservation(session, reservation_id)
     return reservation
 
 @router.post("/{reservation_id}/no-show", response_model=ReservationRead)
-async def mark_no_show_endpoint(
+def mark_no_show_endpoint(
     reservation_id: int = Path(...),
     session: Session = Depends(get_session),
-    current_user: Utilisateur = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Marquer un client comme absent (Pénalité). (Personnel uniquement)."""
     if current_user.role.upper() == "CLIENT":
@@ -180,7 +175,7 @@ async def mark_no_show_endpoint(
 async def check_disponibilite_endpoint(
     table_id: int,
     date_reservation: datetime,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Vérifier si une table est disponible à une date donnée."""
-    return is_table_available(session, table_id, date_reservation)
+    return await is_table_available_async(session, table_id, date_reservation)
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, Body, HTTPException, Path
+from fastapi import APIRouter, Depends, Body, HTTPException, Path, Request
 
 from sqlmodel import Session
 from app.core.database import get_session
+from app.core.cache_http import cache_catalogue, serialiser
 
 from app.schemas.table import TableRead, TableCreate, TableUpdate
 from app.services.table_service import (
@@ -23,7 +24,7 @@ router = APIRouter(
 
 
 @router.post("/", response_model=TableRead)
-async def create_table_endpoint(
+def create_table_endpoint(
     session: Session = Depends(get_session),
     table_in: TableCreate = Body(...)
 )-> any:
@@ -33,7 +34,7 @@ async def create_table_endpoint(
     return create_table(session, table_in)
 
 @router.get("/{table_id}", response_model=TableRead)
-async def read_table_endpoint(
+def read_table_endpoint(
     session: Session = Depends(get_session),
     table_id: int = Path(...)
 )-> any:
@@ -46,7 +47,7 @@ async def read_table_endpoint(
     return table
 
 @router.get("/numero/{numero_table}", response_model=TableRead)
-async def read_table_by_numero_endpoint(
+def read_table_by_numero_endpoint(
     session: Session = Depends(get_session),
     numero_table: str = Path(...)
 )-> any:
@@ -59,7 +60,7 @@ async def read_table_by_numero_endpoint(
     return table
 
 @router.delete("/{table_id}", response_model=TableRead)
-async def delete_table_endpoint(
+def delete_table_endpoint(
     session: Session = Depends(get_session),
     table_id: int = Path(...)
 ) -> any:
@@ -72,7 +73,7 @@ async def delete_table_endpoint(
     return table
 
 @router.put("/{table_id}", response_model=TableRead)
-async def update_table_endpoint(
+def update_table_endpoint(
     session: Session = Depends(get_session),
     table_id: int = Path(...),
     table_in: TableUpdate = Body(...)
@@ -86,16 +87,20 @@ async def update_table_endpoint(
     return table
 
 @router.get("/", response_model=list[TableRead])
-async def list_tables_endpoint(
+def list_tables_endpoint(
+    request: Request,
     session: Session = Depends(get_session)
 ) -> any:
     """
-    Lister toutes les tables
+    Lister toutes les tables (réponse mise en cache, avec ETag)
     """
-    return list_tables(session)
+    consultation = cache_catalogue.consulter(request, tags=("table",))
+    if consultation.reponse:
+        return consultation.reponse
+    return consultation.enregistrer(serialiser(list[TableRead], list_tables(session)))
 
 @router.post("/{table_id}/occuper", response_model=TableRead)
-async def occuper_table_endpoint(
+def occuper_table_endpoint(
     table_id: int = Path(...),
     session: Session = Depends(get_session)
 ):
@@ -106,7 +111,7 @@ async def occuper_table_endpoint(
     return table
 
 @router.post("/{table_id}/liberer", response_model=TableRead)
-async def liberer_table_endpoint(
+def liberer_table_endpoint(
     table_id: int = Path(...),
     session: Session = Depends(get_session)
 ):
@@ -117,7 +122,7 @@ async def liberer_table_endpoint(
     return table
 
 @router.get("/qr/{qr_code}", response_model=TableRead)
-async def read_table_by_qr_endpoint(
+def read_table_by_qr_endpoint(
     qr_code: str = Path(...),
     session: Session = Depends(get_session)
 ):
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, Body, Path, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, Body, Path, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
 from app.core.database import get_session
 from app.services.utilisateur_service import (
@@ -22,7 +23,6 @@ router = APIRouter(
 
 @router.post("/", response_model=UtilisateurRead)
 async def create_utilisateur_endpoint(
-    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
     utilisateur_in: UtilisateurCreate = Body(...)
 ):
@@ -30,13 +30,13 @@ async def create_utilisateur_endpoint(
     Créer un nouvel utilisateur.
     """
     try:
-        return create_utilisateur(session, utilisateur_in, background_tasks)
+        return await run_in_threadpool(create_utilisateur, session, utilisateur_in)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/{utilisateur_id}", response_model=UtilisateurRead)
-async def read_utilisateur_endpoint(
+def read_utilisateur_endpoint(
     session: Session = Depends(get_session),
     utilisateur_id: int = Path(...)
 ) -> any:
@@ -50,7 +50,7 @@ async def read_utilisateur_endpoint(
 
 
 @router.get("/email/{email}", response_model=UtilisateurRead)
-async def read_utilisateur_by_email_endpoint(
+def read_utilisateur_by_email_endpoint(
     session: Session = Depends(get_session),
     email: str = Path(...)
 ) -> any:
@@ -64,7 +64,7 @@ async def read_utilisateur_by_email_endpoint(
 
 
 @router.delete("/{utilisateur_id}", response_model=UtilisateurRead)
-async def delete_utilisateur_endpoint(
+def delete_utilisateur_endpoint(
     session: Session = Depends(get_session),
     utilisateur_id: int = Path(...)
 ) -> any:
@@ -86,7 +86,8 @@ async def update_utilisateur_endpoint(
     """
     Mettre à jour un utilisateur
     """
-    utilisateur = update_utilisateur(session, utilisateur_id, utilisateur_in)
+    # Un changement de mot de passe déclenche un hachage Argon2
+    utilisateur = await run_in_threadpool(update_utilisateur, session, utilisateur_id, utilisateur_in)
     if not utilisateur:
         raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
     return utilisateur
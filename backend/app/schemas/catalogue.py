@@ -0,0 +1,44 @@
+from pydantic import BaseModel
+from typing import Dict, List
+
+
+class CataloguePlat(BaseModel):
+    id: int
+    nom: str
+    description: str | None = None
+    prix: int
+    image_url: str | None = None
+    image_variantes: Dict[str, str] | None = None
+    disponible: bool = True
+    temps_preparation: int | None = None
+
+
+class CatalogueCategorie(BaseModel):
+    id: int
+    nom: str
+    description: str | None = None
+    plats: List[CataloguePlat] = []
+
+
+class CatalogueMenuPlat(BaseModel):
+    """Plat d'un menu (détails complets dans sa catégorie)."""
+    id: int
+    nom: str
+    categorie_id: int | None = None
+    image_url: str | None = None
+    image_variantes: Dict[str, str] | None = None
+    disponible: bool = True
+
+
+class CatalogueMenu(BaseModel):
+    id: int
+    nom: str
+    prix_fixe: int
+    plats: List[CatalogueMenuPlat] = []
+
+
+class Catalogue(BaseModel):
+    """Carte complète pour le premier écran : catégories actives → plats, menus actifs → plats."""
+    version: str
+    categories: List[CatalogueCategorie]
+    menus: List[CatalogueMenu]
@@ -1,13 +1,16 @@
 from sqlmodel import SQLModel, Field
 from app.models.commande import CommandeBase, CommandeStatus
+from app.schemas.ligne_commande import LigneCommandeItem
 from datetime import datetime
+from typing import Optional, List
 
 
 class CommandeCreate(CommandeBase):
-    pass
+    # Calculé à partir des lignes lorsqu'elles sont fournies
+    montant_total: int = 0
+    lignes: List[LigneCommandeItem] = []
 
 
-from typing import Optional, List
 from app.schemas.table import TableRead
 # Avoid circular import by defining ClientRead minimal or importing if safe
 # Use TYPE_CHECKING or just Optional for now
@@ -34,3 +37,48 @@ class CommandeUpdate(SQLModel):
     type_commande: str | None = None
     notes: str | None = None
 
+
+
+class CommandeTransitionRequest(SQLModel):
+    """Transition groupée : plusieurs commandes vers un même statut."""
+    commande_ids: List[int]
+    status: CommandeStatus
+    raison: str | None = None  # refus (statut annulee)
+    methode: str = "especes"   # paiement (statut payee)
+
+
+class CommandeTransitionResultat(SQLModel):
+    commande_id: int
+    succes: bool
+    status: CommandeStatus | None = None
+    erreur: str | None = None
+
+
+class FileCuisineItem(SQLModel):
+    """Commande en préparation, dans l'ordre de priorité de la cuisine."""
+    commande_id: int
+    table_id: int
+    date_commande: datetime
+    nombre_articles: int
+    temps_preparation_max: int
+    attente_secondes: int
+
+
+class ProductionNote(SQLModel):
+    notes_speciales: str
+    quantite: int
+
+
+class ProductionPlat(SQLModel):
+    """Total à produire pour un plat (ou un menu) sur l'ensemble des commandes actives."""
+    plat_id: int | None = None
+    menu_id: int | None = None
+    nom: str
+    quantite: int
+    notes: List[ProductionNote] = []
+
+
+class CommandeStatutRead(SQLModel):
+    """Réponse légère pour le suivi d'une commande par le client."""
+    commande_id: int
+    status: CommandeStatus
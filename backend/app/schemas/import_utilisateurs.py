@@ -0,0 +1,25 @@
+from sqlmodel import SQLModel
+from typing import List
+
+
+class ImportLigneErreur(SQLModel):
+    """Ligne rejetée (numérotée à partir de 1, en-tête CSV exclu)."""
+    ligne: int
+    email: str | None = None
+    erreurs: List[str]
+
+
+class ImportCompte(SQLModel):
+    """Compte créé : utilisateur et id du profil (client, serveur, cuisinier ou gérant)."""
+    ligne: int
+    utilisateur_id: int
+    email: str
+    role: str
+    profil_id: int
+
+
+class ImportResultat(SQLModel):
+    total: int
+    crees: int
+    comptes: List[ImportCompte] = []
+    erreurs: List[ImportLigneErreur] = []
@@ -1,3 +1,4 @@
+from pydantic import field_validator
 from sqlmodel import SQLModel
 from typing import Optional
 
@@ -13,6 +14,14 @@ class LigneCommandeBase(SQLModel):
 class LigneCommandeCreate(LigneCommandeBase):
     pass
 
+class LigneCommandeItem(SQLModel):
+    """Ligne envoyée sans commande_id (ajout groupé)."""
+    plat_id: int | None = None
+    menu_id: int | None = None
+    quantite: int
+    prix_unitaire: float = 0
+    notes_speciales: str | None = None
+
 class LigneCommandeRead(LigneCommandeBase):
     id: int
     plat: Optional["PlatRead"] = None
@@ -28,3 +37,11 @@ class LigneCommandeUpdate(SQLModel):
     quantite: int | None = None
     notes_speciales: str | None = None
     statut: str | None = None
+
+    @field_validator("quantite")
+    @classmethod
+    def quantite_renseignee(cls, quantite):
+        # Omise : inchangée ; explicitement nulle : refusée (le total en dépend)
+        if quantite is None:
+            raise ValueError("La quantité ne peut pas être nulle")
+        return quantite
@@ -1,5 +1,6 @@
 from sqlmodel import SQLModel
-from typing import Optional
+from enum import Enum
+from typing import Dict, Optional
 
 class PlatBase(SQLModel):
     nom: str
@@ -15,6 +16,14 @@ class PlatCreate(PlatBase):
 
 class PlatRead(PlatBase):
     id: int
+    # miniature, moyenne (JPEG), miniature_webp, moyenne_webp, webp ; absent tant qu'elles sont en cours de génération
+    image_variantes: Dict[str, str] | None = None
+
+class TriPlats(str, Enum):
+    ID = "id"
+    NOM = "nom"
+    PRIX = "prix"
+    PRIX_DECROISSANT = "-prix"
 
 class PlatUpdate(SQLModel):
     nom: str | None = None
@@ -8,4 +8,19 @@ class Token(BaseModel):
 
 
 class TokenData(BaseModel):
-    sub: str | None = None
\ No newline at end of file
+    sub: str | None = None
+
+
+class Principal(BaseModel):
+    """Identité authentifiée, reconstruite à partir des claims du JWT.
+
+    `id` est celui de l'utilisateur ; les ids de profil sont résolus à la
+    connexion, ce qui évite de relire la base à chaque requête.
+    """
+    id: int
+    email: str
+    role: str
+    client_id: int | None = None
+    serveur_id: int | None = None
+    cuisinier_id: int | None = None
+    version: int = 0
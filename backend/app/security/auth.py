@@ -1,29 +1,83 @@
 from datetime import timedelta, datetime, timezone
+import logging
 
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends
-from typing import Annotated
+from typing import Annotated, Any, Dict
 from fastapi import HTTPException, status
 from pydantic import EmailStr
 
-from sqlmodel import Session, select
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from jose import jwt, JWTError
 
 from app.core.config import settings
-from app.core.database import get_session
+from app.core.database import get_async_session
+from app.models.client import Client
+from app.models.cuisinier import Cuisinier
+from app.models.personnel import Personnel
+from app.models.serveur import Serveur
 from app.models.utilisateur import Utilisateur
-from app.security.hashing import verify_password
+from app.schemas.token import Principal
+from app.security.hashing import verify_and_update_async
+from app.security.principal_cache import cache_principaux
 
+logger = logging.getLogger("app.auth")
 
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
+# Variante non bloquante : EventSource ne peut pas envoyer d'en-tête Authorization
+oauth2_scheme_optionnel = OAuth2PasswordBearer(tokenUrl="auth/token", auto_error=False)
 
 
 
-def create_access_token(data: dict, expires_delta: timedelta | None = None):
+def _requete_principal():
+    """Compte et profils (client, serveur, cuisinier) en une seule requête."""
+    return (
+        select(
+            Utilisateur.id, Utilisateur.email, Utilisateur.role, Utilisateur.active,
+            Utilisateur.is_verified, Utilisateur.token_version,
+            Client.id, Serveur.id, Cuisinier.id,
+        )
+        .outerjoin(Client, Client.utilisateur_id == Utilisateur.id)
+        .outerjoin(Personnel, Personnel.utilisateur_id == Utilisateur.id)
+        .outerjoin(Serveur, Serveur.personnel_id == Personnel.id)
+        .outerjoin(Cuisinier, Cuisinier.personnel_id == Personnel.id)
+    )
+
+
+def _principal_depuis_ligne(ligne) -> Principal:
+    utilisateur_id, email, role, _, _, version, client_id, serveur_id, cuisinier_id = ligne
+    return Principal(
+        id=utilisateur_id,
+        email=email,
+        role=role,
+        client_id=client_id,
+        serveur_id=serveur_id,
+        cuisinier_id=cuisinier_id,
+        version=version,
+    )
+
+
+async def construire_principal(session: AsyncSession, utilisateur: Utilisateur) -> Principal:
+    """Résoudre en une requête les profils client, serveur et cuisinier de l'utilisateur."""
+    ligne = (await session.exec(_requete_principal().where(Utilisateur.id == utilisateur.id))).first()
+    return _principal_depuis_ligne(ligne)
+
+
+def create_access_token(data: dict, expires_delta: timedelta | None = None, principal: Principal | None = None):
     to_encode = data.copy()
+    if principal is not None:
+        to_encode.update({
+            "uid": principal.id,
+            "role": principal.role,
+            "client_id": principal.client_id,
+            "serveur_id": principal.serveur_id,
+            "cuisinier_id": principal.cuisinier_id,
+            "ver": principal.version,
+        })
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
@@ -33,19 +87,26 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     return encoded_jwt
 
 
-def authentificate_user(session: Session, email: str, password: str) -> Utilisateur | None:
-    """Vérifier les informations d'identification de l'utilisateur."""
+async def authentificate_user(session: AsyncSession, email: str, password: str) -> Utilisateur | None:
+    """Vérifier les informations d'identification de l'utilisateur.
+
+    La vérification Argon2 s'exécute dans le pool de hachage, hors de la boucle.
+    Un hachage produit avec d'anciens paramètres Argon2 est remplacé au passage.
+    """
     clean_email = email.lower().strip()
     print(f"🔑 AUTH [START]: Tentative pour {clean_email}...")
     
     statement = select(Utilisateur).where(Utilisateur.email == clean_email)
-    utilisateur = session.exec(statement).first()
+    utilisateur = (await session.exec(statement)).first()
     
     if not utilisateur:
         print(f"❌ AUTH [FAIL]: Utilisateur {clean_email} non trouvé dans la DB.")
         return None
-        
-    is_password_correct = verify_password(password, utilisateur.hashed_password)
+
+    # La connexion retourne au pool pendant le calcul Argon2 : sinon chaque
+    # connexion en cours immobiliserait une connexion (l'objet reste lisible)
+    await session.close()
+    is_password_correct, nouveau_hash = await verify_and_update_async(password, utilisateur.hashed_password)
     if not is_password_correct:
         print(f"❌ AUTH [FAIL]: Mot de passe incorrect pour {clean_email}. HashPrefix={utilisateur.hashed_password[:10]}")
         return None
@@ -53,43 +114,129 @@ def authentificate_user(session: Session, email: str, password: str) -> Utilisat
     if not utilisateur.active:
         print(f"❌ AUTH [FAIL]: Compte {clean_email} désactivé.")
         return None
+
+    if nouveau_hash:
+        # Condition sur l'ancien hachage : un changement de mot de passe concurrent l'emporte
+        await session.exec(
+            update(Utilisateur)
+            .where(Utilisateur.id == utilisateur.id, Utilisateur.hashed_password == utilisateur.hashed_password)
+            .values(hashed_password=nouveau_hash)
+        )
+        await session.commit()
+        await session.close()
+        logger.info(f"Mot de passe de {clean_email} re-haché avec les paramètres Argon2 actuels")
         
     print(f"✅ AUTH [SUCCESS]: {clean_email} (ID={utilisateur.id}, Role={utilisateur.role}, Verified={utilisateur.is_verified})")
     return utilisateur
 
 
-async def get_current_user(
+async def get_current_principal(
         token: Annotated[str, Depends(oauth2_scheme)],
-        session: Annotated[Session, Depends(get_session)]
-    )-> Utilisateur:
-    """Récupérer l'utilisateur actuel à partir du token JWT."""
-    credentials_exception = HTTPException(
+        session: Annotated[AsyncSession, Depends(get_async_session)]
+    ) -> Principal:
+    """Identité de l'appelant lue dans le JWT, sans requête sur les profils."""
+    return await _principal_depuis_token(session, token)
+
+
+# Les routes qui n'ont besoin que de l'identité passent par le même cache
+get_current_user = get_current_principal
+
+
+async def get_current_principal_flux(
+        session: Annotated[AsyncSession, Depends(get_async_session)],
+        token_entete: Annotated[str | None, Depends(oauth2_scheme_optionnel)] = None,
+        token: str | None = None
+    ) -> Principal:
+    """Identité de l'appelant d'un flux SSE (jeton en en-tête ou en paramètre `token`)."""
+    jeton = token_entete or token
+    if not jeton:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Non authentifié.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await _principal_depuis_token(session, jeton)
+
+
+def invalider_principal(sujet: str):
+    """Retirer un compte du cache des principaux : il sera relu en base.
+
+    À appeler après le commit de toute modification du compte (rôle, mot de
+    passe, activation, vérification, profils, suppression).
+    """
+    cache_principaux.invalider(sujet.lower().strip())
+
+
+def _exception_identifiants() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Impossible de valider les identifiants.",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decoder(token: str) -> Dict[str, Any]:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise _exception_identifiants()
+    if payload.get("sub") is None:
+        raise _exception_identifiants()
+    return payload
 
-    statement = select(Utilisateur).where(Utilisateur.email == email)
-    utilisateur = session.exec(statement).first()
 
-    if utilisateur is None:
-        raise credentials_exception
-    if not utilisateur.active:
+def _verifier_compte(active: bool, is_verified: bool):
+    if not active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Compte désactivé. Veuillez contacter l'administration."
         )
-    if not utilisateur.is_verified:
+    if not is_verified:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Email non vérifié. Veuillez valider votre compte via le lien envoyé par mail."
         )
-    return utilisateur
-    
\ No newline at end of file
+
+
+async def _charger_principal(session: AsyncSession, sujet: str) -> Principal:
+    """Relire un compte actif et vérifié depuis la base (défaut de cache)."""
+    ligne = (await session.exec(_requete_principal().where(Utilisateur.email == sujet))).first()
+    if ligne is None:
+        raise _exception_identifiants()
+    _verifier_compte(ligne[3], ligne[4])
+    return _principal_depuis_ligne(ligne)
+
+
+async def _principal_depuis_token(session: AsyncSession, token: str) -> Principal:
+    """Construire le principal à partir des claims vérifiés du JWT.
+
+    Le compte n'est relu en base que s'il est absent du cache (ou expiré), ou
+    si le jeton est plus récent que l'entrée en cache.
+    """
+    payload = _decoder(token)
+    sujet = payload["sub"]
+    version = payload.get("ver", 0)
+
+    courant = cache_principaux.lire(sujet)
+    if courant is None or version > courant.version:
+        courant = await _charger_principal(session, sujet)
+        cache_principaux.enregistrer(sujet, courant)
+    if version != courant.version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Session expirée. Veuillez vous reconnecter.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if payload.get("uid") is None:
+        # Jeton émis avant l'ajout des claims : profils issus du cache
+        return courant
+    return Principal(
+        id=payload["uid"],
+        email=sujet,
+        role=payload["role"],
+        client_id=payload.get("client_id"),
+        serveur_id=payload.get("serveur_id"),
+        cuisinier_id=payload.get("cuisinier_id"),
+        version=version,
+    )
@@ -1,14 +1,98 @@
+"""
+Hachage des mots de passe (Argon2).
+
+Un calcul Argon2 prend plusieurs dizaines de millisecondes et réserve sa
+mémoire de travail ; tous les calculs passent donc par un pool de threads
+dédié, limité à HASH_CONCURRENCE_MAX (argon2-cffi libère le GIL pendant le
+calcul). Les routes asynchrones utilisent les variantes `*_async` pour ne
+pas bloquer la boucle d'événements.
+
+Le coût Argon2 se règle par machine (ARGON2_TIME_COST, ARGON2_MEMORY_COST,
+ARGON2_PARALLELISM, voir scripts/calibrer_argon2.py) ; les hachages produits
+avec d'anciens paramètres sont remplacés à la connexion suivante.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
+
 from passlib.context import CryptContext
 
+from app.core.config import settings
+
+
+def _parametres_argon2() -> dict:
+    """Paramètres fixés par la configuration ; les autres gardent la valeur par défaut de passlib."""
+    parametres = {
+        "time_cost": settings.ARGON2_TIME_COST,
+        "memory_cost": settings.ARGON2_MEMORY_COST,
+        "parallelism": settings.ARGON2_PARALLELISM,
+    }
+    return {f"argon2__{nom}": valeur for nom, valeur in parametres.items() if valeur is not None}
+
 
 pwd_context = CryptContext(
     schemes=["argon2"],
-    deprecated="auto"
+    deprecated="auto",
+    **_parametres_argon2()
 )
 
+_executor = ThreadPoolExecutor(
+    max_workers=settings.HASH_CONCURRENCE_MAX,
+    thread_name_prefix="argon2"
+)
+
+# Durée cumulée des vérifications, pour estimer le coût d'une tentative de connexion
+_mesures = {"verifications": 0, "secondes": 0.0}
+_mesures_lock = threading.Lock()
+
+
+def _verifier(plain_password: str, hashed_password: str, mettre_a_jour: bool = False):
+    debut = time.perf_counter()
+    try:
+        if mettre_a_jour:
+            return pwd_context.verify_and_update(plain_password, hashed_password)
+        return pwd_context.verify(plain_password, hashed_password)
+    finally:
+        with _mesures_lock:
+            _mesures["verifications"] += 1
+            _mesures["secondes"] += time.perf_counter() - debut
+
+
+def duree_moyenne_verification() -> float:
+    """Durée moyenne (secondes) d'une vérification Argon2 dans ce processus."""
+    with _mesures_lock:
+        if not _mesures["verifications"]:
+            return 0.0
+        return _mesures["secondes"] / _mesures["verifications"]
+
+
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    """Version bloquante : à n'appeler que hors de la boucle d'événements."""
+    return _executor.submit(pwd_context.hash, password).result()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    """Version bloquante : à n'appeler que hors de la boucle d'événements."""
+    return _executor.submit(_verifier, plain_password, hashed_password).result()
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.wrap_future(_executor.submit(pwd_context.hash, password))
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.wrap_future(
+        _executor.submit(_verifier, plain_password, hashed_password)
+    )
+
+
+async def verify_and_update_async(plain_password: str, hashed_password: str) -> Tuple[bool, str | None]:
+    """Vérifier et, si le hachage utilise d'anciens paramètres, renvoyer son remplaçant.
+
+    Le nouveau hachage est calculé dans la même tâche du pool que la vérification.
+    """
+    return await asyncio.wrap_future(
+        _executor.submit(_verifier, plain_password, hashed_password, True)
+    )
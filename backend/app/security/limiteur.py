@@ -0,0 +1,161 @@
+"""
+Limitation des tentatives de connexion (seaux à jetons par IP et par email).
+
+Chaque tentative consomme un jeton dans le seau de l'adresse IP puis dans
+celui de l'email visé ; les seaux se rechargent en continu. Une tentative
+refusée l'est avant toute lecture en base et tout calcul Argon2.
+
+Par défaut l'état est tenu en mémoire (un seau par processus). Avec
+LOGIN_LIMITE_REDIS_URL, les seaux sont partagés entre les workers via Redis.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+from app.core.config import settings
+from app.security.hashing import duree_moyenne_verification
+
+
+class SeauxMemoire:
+    """Seaux à jetons en mémoire, bornés en nombre (les moins récents sont évincés :
+    un seau inactif depuis longtemps est de toute façon plein)."""
+
+    def __init__(self, taille_max: int, horloge: Callable[[], float] = time.monotonic):
+        self.taille_max = taille_max
+        self._horloge = horloge
+        self._seaux: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def consommer(self, cle: str, capacite: int, debit: float) -> float:
+        """Prendre un jeton ; renvoie 0 si accordé, sinon l'attente en secondes."""
+        with self._lock:
+            maintenant = self._horloge()
+            jetons, dernier = self._seaux.get(cle, (capacite, maintenant))
+            jetons = min(capacite, jetons + (maintenant - dernier) * debit)
+            attente = 0.0
+            if jetons >= 1:
+                jetons -= 1
+            else:
+                attente = (1 - jetons) / debit
+            self._seaux[cle] = (jetons, maintenant)
+            self._seaux.move_to_end(cle)
+            while len(self._seaux) > self.taille_max:
+                self._seaux.popitem(last=False)
+            return attente
+
+    def vider(self):
+        with self._lock:
+            self._seaux.clear()
+
+
+# Même algorithme que SeauxMemoire, exécuté atomiquement par Redis avec son horloge
+# (les workers n'ont pas à avoir des horloges synchronisées)
+_SCRIPT_REDIS = """
+local capacite = tonumber(ARGV[1])
+local debit = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local maintenant = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local etat = redis.call('HMGET', KEYS[1], 'jetons', 'dernier')
+local jetons = tonumber(etat[1]) or capacite
+local dernier = tonumber(etat[2]) or maintenant
+jetons = math.min(capacite, jetons + (maintenant - dernier) * debit)
+local attente = 0
+if jetons >= 1 then
+    jetons = jetons - 1
+else
+    attente = (1 - jetons) / debit
+end
+redis.call('HSET', KEYS[1], 'jetons', tostring(jetons), 'dernier', tostring(maintenant))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacite / debit) + 1)
+return tostring(attente)
+"""
+
+
+class SeauxRedis:
+    """Seaux à jetons partagés entre les workers (clés expirées une fois pleines)."""
+
+    def __init__(self, url: str, prefixe: str = "limite-connexion:"):
+        # Dépendance optionnelle : seulement requise si l'état est partagé
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(_SCRIPT_REDIS)
+        self.prefixe = prefixe
+
+    async def consommer(self, cle: str, capacite: int, debit: float) -> float:
+        return float(await self._script(keys=[self.prefixe + cle], args=[capacite, debit]))
+
+
+class LimiteurConnexions:
+    """Applique les deux seaux (IP, email) à chaque tentative de connexion."""
+
+    def __init__(
+        self,
+        stockage,
+        capacite_ip: int,
+        par_minute_ip: float,
+        capacite_email: int,
+        par_minute_email: float,
+    ):
+        self.stockage = stockage
+        self.capacite_ip = capacite_ip
+        self.debit_ip = par_minute_ip / 60
+        self.capacite_email = capacite_email
+        self.debit_email = par_minute_email / 60
+        self._lock = threading.Lock()
+        self.acceptees = 0
+        self.refus_ip = 0
+        self.refus_email = 0
+
+    async def verifier(self, ip: str, email: str) -> float:
+        """Renvoie 0 si la tentative peut continuer, sinon le délai avant de réessayer."""
+        attente = await self.stockage.consommer(f"ip:{ip}", self.capacite_ip, self.debit_ip)
+        if attente:
+            self._compter("refus_ip")
+            return attente
+        attente = await self.stockage.consommer(
+            f"email:{email.lower().strip()}", self.capacite_email, self.debit_email
+        )
+        self._compter("refus_email" if attente else "acceptees")
+        return attente
+
+    def _compter(self, compteur: str):
+        with self._lock:
+            setattr(self, compteur, getattr(self, compteur) + 1)
+
+    def statistiques(self) -> Dict[str, Any]:
+        with self._lock:
+            refus = self.refus_ip + self.refus_email
+            duree = duree_moyenne_verification()
+            return {
+                "stockage": "redis" if isinstance(self.stockage, SeauxRedis) else "memoire",
+                "acceptees": self.acceptees,
+                "refus_ip": self.refus_ip,
+                "refus_email": self.refus_email,
+                # Chaque refus est une vérification Argon2 qui n'a pas eu lieu
+                "verifications_evitees": refus,
+                "duree_moyenne_verification_ms": round(duree * 1000, 2),
+                "secondes_cpu_evitees": round(refus * duree, 3),
+            }
+
+
+def delai_retry_after(attente: float) -> str:
+    """Valeur de l'en-tête Retry-After (secondes entières, au moins 1)."""
+    return str(max(1, math.ceil(attente)))
+
+
+def _creer_stockage():
+    if settings.LOGIN_LIMITE_REDIS_URL:
+        return SeauxRedis(settings.LOGIN_LIMITE_REDIS_URL)
+    return SeauxMemoire(taille_max=settings.LOGIN_LIMITE_TAILLE)
+
+
+limiteur_connexions = LimiteurConnexions(
+    _creer_stockage(),
+    capacite_ip=settings.LOGIN_LIMITE_IP_CAPACITE,
+    par_minute_ip=settings.LOGIN_LIMITE_IP_PAR_MINUTE,
+    capacite_email=settings.LOGIN_LIMITE_EMAIL_CAPACITE,
+    par_minute_email=settings.LOGIN_LIMITE_EMAIL_PAR_MINUTE,
+)
@@ -0,0 +1,85 @@
+"""
+Cache LRU + TTL des principaux authentifiés, indexé par sujet (email du JWT).
+
+Seuls les comptes actifs et vérifiés y entrent. Les services qui modifient un
+compte l'invalident explicitement ; le TTL borne le délai de prise en compte
+d'une modification faite par un autre processus.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+from app.core.config import settings
+from app.schemas.token import Principal
+
+
+class CachePrincipaux:
+    """Dictionnaire borné : les entrées expirent après `ttl` secondes et les
+    moins récemment utilisées sont évincées au-delà de `taille_max`."""
+
+    def __init__(self, taille_max: int, ttl: float, horloge: Callable[[], float] = time.monotonic):
+        self.taille_max = taille_max
+        self.ttl = ttl
+        self._horloge = horloge
+        self._entrees: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.succes = 0
+        self.echecs = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def lire(self, sujet: str) -> Principal | None:
+        with self._lock:
+            entree = self._entrees.get(sujet)
+            if entree is None:
+                self.echecs += 1
+                return None
+            expire_a, principal = entree
+            if expire_a <= self._horloge():
+                del self._entrees[sujet]
+                self.expirations += 1
+                self.echecs += 1
+                return None
+            self._entrees.move_to_end(sujet)
+            self.succes += 1
+            return principal
+
+    def enregistrer(self, sujet: str, principal: Principal):
+        with self._lock:
+            self._entrees[sujet] = (self._horloge() + self.ttl, principal)
+            self._entrees.move_to_end(sujet)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+                self.evictions += 1
+
+    def invalider(self, sujet: str):
+        with self._lock:
+            if self._entrees.pop(sujet, None) is not None:
+                self.invalidations += 1
+
+    def vider(self):
+        with self._lock:
+            self._entrees.clear()
+
+    def statistiques(self) -> Dict[str, Any]:
+        with self._lock:
+            lectures = self.succes + self.echecs
+            return {
+                "taille": len(self._entrees),
+                "taille_max": self.taille_max,
+                "ttl_secondes": self.ttl,
+                "succes": self.succes,
+                "echecs": self.echecs,
+                "taux_succes": round(self.succes / lectures, 4) if lectures else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+cache_principaux = CachePrincipaux(
+    taille_max=settings.PRINCIPAL_CACHE_TAILLE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDES,
+)
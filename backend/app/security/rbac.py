@@ -1,13 +1,13 @@
 from fastapi import Depends, HTTPException, status
-from app.models.utilisateur import Utilisateur
-from app.security.auth import get_current_user
+from app.schemas.token import Principal
+from app.security.auth import get_current_principal
 from typing import List
 
 class RoleChecker:
     def __init__(self, allowed_roles: List[str]):
         self.allowed_roles = allowed_roles
 
-    def __call__(self, user: Utilisateur = Depends(get_current_user)):
+    def __call__(self, user: Principal = Depends(get_current_principal)):
         if user.role.lower() not in self.allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
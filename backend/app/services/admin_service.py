@@ -6,6 +6,7 @@ from app.models.client import Client
 from app.models.personnel import Personnel
 from app.models.commande import Commande
 from app.models.table import RestaurantTable
+from app.security.auth import invalider_principal
 
 def toggle_user_active_status(session: Session, user_id: int, active: bool) -> Utilisateur | None:
     """Active ou désactive un utilisateur."""
@@ -14,9 +15,12 @@ def toggle_user_active_status(session: Session, user_id: int, active: bool) -> U
         return None
     
     user.active = active
+    # Une réactivation ne doit pas faire revivre les anciens jetons
+    user.token_version += 1
     session.add(user)
     session.commit()
     session.refresh(user)
+    invalider_principal(user.email)
     return user
 
 def get_system_summary(session: Session) -> Dict[str, Any]:
@@ -35,6 +39,8 @@ def delete_user_permanently(session: Session, user_id: int) -> bool:
     if not user:
         return False
     
+    email = user.email
     session.delete(user)
     session.commit()
+    invalider_principal(email)
     return True
@@ -0,0 +1,68 @@
+"""
+Document « catalogue » : catégories actives avec leurs plats et menus actifs
+avec leur contenu, en une seule réponse.
+
+Le document est construit en quatre requêtes (catégories, plats, contenus de
+menus, menus) puis servi tel quel depuis le cache du catalogue
+(app/core/cache_http.py) jusqu'à la prochaine écriture sur un plat, une
+catégorie ou un menu : il est reconstruit une fois par changement, pas à
+chaque requête.
+"""
+import hashlib
+import json
+from collections import defaultdict
+
+from sqlmodel import Session, select
+
+from app.models.categorie import Categorie
+from app.models.menu import ContenuMenu, Menu
+from app.models.plat import Plat
+from app.schemas.catalogue import (
+    Catalogue,
+    CatalogueCategorie,
+    CatalogueMenu,
+    CatalogueMenuPlat,
+    CataloguePlat,
+)
+
+# Étiquettes du cache dont dépend le document
+TAGS_CATALOGUE = ("plat", "categorie", "menu")
+
+
+def construire_catalogue(session: Session) -> Catalogue:
+    """Assembler le catalogue ; `version` est une empreinte du contenu, identique d'un processus à l'autre."""
+    categories = session.exec(
+        select(Categorie).where(Categorie.actif == True).order_by(Categorie.nom, Categorie.id)
+    ).all()
+    plats = session.exec(select(Plat).order_by(Plat.nom, Plat.id)).all()
+    contenus = session.exec(
+        select(ContenuMenu.menu_id, Plat)
+        .join(Plat, Plat.id == ContenuMenu.plat_id)
+        .join(Menu, Menu.id == ContenuMenu.menu_id)
+        .where(Menu.actif == True)
+        .order_by(Plat.nom, Plat.id)
+    ).all()
+    menus = session.exec(select(Menu).where(Menu.actif == True).order_by(Menu.nom, Menu.id)).all()
+
+    plats_par_categorie = defaultdict(list)
+    for plat in plats:
+        plats_par_categorie[plat.categorie_id].append(CataloguePlat.model_validate(plat, from_attributes=True))
+    plats_par_menu = defaultdict(list)
+    for menu_id, plat in contenus:
+        plats_par_menu[menu_id].append(CatalogueMenuPlat.model_validate(plat, from_attributes=True))
+
+    contenu = {
+        "categories": [
+            CatalogueCategorie(id=c.id, nom=c.nom, description=c.description, plats=plats_par_categorie[c.id])
+            for c in categories
+        ],
+        "menus": [
+            CatalogueMenu(id=m.id, nom=m.nom, prix_fixe=m.prix_fixe, plats=plats_par_menu[m.id])
+            for m in menus
+        ],
+    }
+    empreinte = hashlib.sha256(json.dumps(
+        {cle: [element.model_dump() for element in valeur] for cle, valeur in contenu.items()},
+        sort_keys=True, default=str,
+    ).encode()).hexdigest()[:16]
+    return Catalogue(version=empreinte, **contenu)
@@ -1,6 +1,8 @@
 from app.models.categorie import Categorie
 from app.schemas.categorie import CategorieCreate, CategorieRead, CategorieUpdate
 from sqlmodel import Session, select
+from app.core.cache_http import cache_catalogue
+from app.services.recherche_service import index_plats
 from typing import List
 
 def create_categorie(session: Session, categorie_in: CategorieCreate) -> Categorie:
@@ -8,7 +10,9 @@ def create_categorie(session: Session, categorie_in: CategorieCreate) -> Categor
     categorie = Categorie.model_validate(categorie_in)
     session.add(categorie)
     session.commit()
+    cache_catalogue.invalider("categorie")
     session.refresh(categorie)
+    index_plats.indexer_categorie(categorie)
     return categorie
 
 def read_categorie(session: Session, categorie_id: int) -> CategorieRead | None:
@@ -32,7 +36,9 @@ def update_categorie(session: Session, categorie_id: int, categorie_in: Categori
     db_categorie.sqlmodel_update(categorie_data)
     session.add(db_categorie)
     session.commit()
+    cache_catalogue.invalider("categorie")
     session.refresh(db_categorie)
+    index_plats.indexer_categorie(db_categorie)
     return db_categorie
 
 def delete_categorie(session: Session, categorie_id: int) -> Categorie | None:
@@ -42,4 +48,7 @@ def delete_categorie(session: Session, categorie_id: int) -> Categorie | None:
         return None
     session.delete(db_categorie)
     session.commit()
+    # Les plats de la catégorie perdent leur categorie_id
+    cache_catalogue.invalider("categorie", "plat")
+    index_plats.retirer_categorie(categorie_id)
     return db_categorie
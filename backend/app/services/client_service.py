@@ -1,27 +1,29 @@
 from app.models.client import Client
 from app.schemas.client import ClientCreate, ClientRead, ClientUpdate
 from app.schemas.client_full import ClientCreateFull
-from app.services.utilisateur_service import create_utilisateur
+from app.services.utilisateur_service import create_utilisateur, revoquer_jetons
+from app.security.auth import invalider_principal
 from sqlmodel import Session, select
 from typing import List
-from fastapi import BackgroundTasks
 
 def create_client(session: Session, client_in: ClientCreate) -> Client:
     """Créer un nouveau client."""
     client = Client.model_validate(client_in)
     session.add(client)
+    email = revoquer_jetons(session, client.utilisateur_id)
     session.commit()
     session.refresh(client)
+    if email:
+        invalider_principal(email)
     return client
 
 def create_client_full(
     session: Session, 
-    client_in: ClientCreateFull,
-    background_tasks: BackgroundTasks
+    client_in: ClientCreateFull
 ) -> Client:
     """Créer un utilisateur et un client en une seule fois."""
     # 1. Créer ou mettre à jour l'utilisateur
-    utilisateur = create_utilisateur(session, client_in, background_tasks)
+    utilisateur = create_utilisateur(session, client_in)
     
     # 2. Vérifier si un client existe déjà pour cet utilisateur
     statement = select(Client).where(Client.utilisateur_id == utilisateur.id)
@@ -35,8 +37,11 @@ def create_client_full(
     print(f"✨ CREATE_CLIENT : Création d'un nouveau profil client pour Utilisateur {utilisateur.id}")
     client = Client(utilisateur_id=utilisateur.id)
     session.add(client)
+    # Un compte existant gagne un profil : ses jetons n'ont pas de client_id
+    email = revoquer_jetons(session, utilisateur.id)
     session.commit()
     session.refresh(client)
+    invalider_principal(email)
     return client
 
 def read_client(session: Session, client_id: int) -> ClientRead | None:
@@ -73,8 +78,10 @@ def delete_client(session: Session, client_id: int) -> Client | None:
     from app.models.utilisateur import Utilisateur
     utilisateur = session.get(Utilisateur, utilisateur_id)
     if utilisateur:
+        email = utilisateur.email
         session.delete(utilisateur)
         session.commit()
+        invalider_principal(email)
     
     return db_client
 
@@ -1,45 +1,201 @@
+from app.models.client import Client
 from app.models.commande import Commande, CommandeStatus
 from app.models.ligne_commande import LigneCommande
+from app.models.paiement import Paiement, PaymentStatus, PaymentMethod
 from app.schemas.commande import CommandeCreate, CommandeRead, CommandeUpdate
-from app.schemas.ligne_commande import LigneCommandeCreate
-from sqlmodel import Session, select
-from typing import List
+from app.schemas.ligne_commande import LigneCommandeCreate, LigneCommandeItem, LigneCommandeUpdate
+from app.core.database import utc
+from app.core.events import bus, evenement_commande
+from app.services.cuisine_service import resumer_pour_cuisine
+from sqlalchemy import Numeric, and_, cast, delete, or_, tuple_, update
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Callable, Dict, FrozenSet, List, Tuple
+import base64
+import binascii
+
+
+def _options_chargement():
+    """Relations sérialisées par `CommandeRead`, chargées en lot (une requête IN par relation)."""
+    return [
+        selectinload(Commande.client).selectinload(Client.utilisateur),
+        selectinload(Commande.table),
+        selectinload(Commande.lignes).selectinload(LigneCommande.plat),
+    ]
+
+def _publier_lot(session: Session, evenements: List[dict]):
+    """Diffuser des changements de commandes aux écrans abonnés et à la file de la cuisine."""
+    resumer_pour_cuisine(session, evenements)
+    bus.publier_lot(evenements)
+
+def _publier(session: Session, commande: Commande, action: str):
+    _publier_lot(session, [evenement_commande(commande, action)])
+
+def _publier_lignes(session: Session, commande_id: int):
+    """Diffuser un ajout, une modification ou une suppression de lignes (total, priorité en cuisine)."""
+    commande = session.get(Commande, commande_id)
+    if commande:
+        _publier(session, commande, "lignes_modifiees")
+
+def _montant_ligne(prix_unitaire: float, quantite: int) -> int:
+    """Montant d'une ligne, arrondi à l'unité (demi vers le haut).
+
+    `montant_total` est entier : chaque ligne est arrondie une seule fois, de la
+    même façon à l'écriture et au recalcul (`update_montant_total`), si bien que
+    le total reste égal à la somme des lignes après n'importe quelle suite de
+    modifications.
+    """
+    montant = Decimal(str(prix_unitaire)) * quantite
+    return int(montant.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def _ajuster_montant_total(session: Session, commande_id: int, delta: int):
+    """Appliquer une variation au total d'une commande, de façon atomique côté SQL.
+
+    `montant_total = montant_total + :delta` évite qu'un ajout concurrent sur
+    la même commande n'écrase le total calculé par un autre. `delta` est une
+    différence de montants de lignes (`_montant_ligne`), donc entière.
+    """
+    if delta:
+        session.exec(
+            update(Commande)
+            .where(Commande.id == commande_id)
+            .values(montant_total=Commande.montant_total + delta)
+        )
 
 def create_commande(session: Session, commande_in: CommandeCreate) -> Commande:
-    """Créer une nouvelle commande."""
-    commande = Commande.model_validate(commande_in)
+    """Créer une nouvelle commande, avec ses lignes éventuelles, en un seul commit."""
+    commande = Commande.model_validate(commande_in.model_dump(exclude={"lignes"}))
     session.add(commande)
+    if commande_in.lignes:
+        session.flush()
+        lignes = _preparer_lignes(session, commande.id, commande_in.lignes)
+        session.add_all(lignes)
+        commande.montant_total = sum(_montant_ligne(l.prix_unitaire, l.quantite) for l in lignes)
     session.commit()
     session.refresh(commande)
+    _publier(session, commande, "creee")
     return commande
 
+def _requete_commande(commande_id: int):
+    return select(Commande).where(Commande.id == commande_id).options(*_options_chargement())
+
 def read_commande(session: Session, commande_id: int) -> CommandeRead | None:
     """Récupérer une commande par son ID."""
-    commande = session.get(Commande, commande_id)
+    commande = session.exec(_requete_commande(commande_id)).first()
     if not commande:
         return None
     return CommandeRead.model_validate(commande)
 
-def list_commandes(session: Session, skip: int = 0, limit: int = 100) -> List[Commande]:
-    """Lister toutes les commandes."""
-    statement = select(Commande).offset(skip).limit(limit)
-    return session.exec(statement).all()
+async def read_commande_async(session: AsyncSession, commande_id: int) -> CommandeRead | None:
+    commande = (await session.exec(_requete_commande(commande_id))).first()
+    if not commande:
+        return None
+    return CommandeRead.model_validate(commande)
+
+def encoder_curseur(commande: Commande) -> str:
+    """Curseur opaque désignant la position d'une commande dans l'ordre (date_commande, id)."""
+    brut = f"{commande.date_commande.isoformat()}|{commande.id}"
+    return base64.urlsafe_b64encode(brut.encode()).decode()
+
+def decoder_curseur(curseur: str) -> Tuple[datetime, int]:
+    """Décoder un curseur produit par `encoder_curseur` (ValueError s'il est invalide)."""
+    try:
+        date_iso, commande_id = base64.urlsafe_b64decode(curseur.encode()).decode().split("|")
+        return utc(datetime.fromisoformat(date_iso)), int(commande_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Curseur de pagination invalide")
 
-def list_commandes_by_client(session: Session, client_id: int, skip: int = 0, limit: int = 100) -> List[Commande]:
+def _requete_statut(commande_id: int):
+    return select(Commande.status, Commande.client_id).where(Commande.id == commande_id)
+
+def lire_statut_commande(session: Session, commande_id: int) -> Tuple[CommandeStatus, int] | None:
+    """Statut et client d'une commande, sans charger la commande entière."""
+    return session.exec(_requete_statut(commande_id)).first()
+
+async def lire_statut_commande_async(session: AsyncSession, commande_id: int) -> Tuple[CommandeStatus, int] | None:
+    return (await session.exec(_requete_statut(commande_id))).first()
+
+def _requete_commandes(
+    skip: int = 0,
+    limit: int = 100,
+    statuts: List[CommandeStatus] | None = None,
+    table_id: int | None = None,
+    serveur_id: int | None = None,
+    client_id: int | None = None,
+    date_debut: datetime | None = None,
+    date_fin: datetime | None = None,
+    apres: Tuple[datetime, int] | None = None,
+):
+    """Requête de liste par ordre chronologique, avec filtres optionnels.
+
+    `apres` (issu d'un curseur) reprend la liste juste après la dernière
+    commande de la page précédente (pagination par clé sur (date_commande, id)),
+    sans relire les lignes déjà parcourues comme le ferait un OFFSET.
+    """
+    statement = select(Commande)
+    if statuts:
+        statement = statement.where(Commande.status.in_(statuts))
+    if table_id is not None:
+        statement = statement.where(Commande.table_id == table_id)
+    if serveur_id is not None:
+        statement = statement.where(Commande.serveur_id == serveur_id)
+    if client_id is not None:
+        statement = statement.where(Commande.client_id == client_id)
+    if date_debut is not None:
+        statement = statement.where(Commande.date_commande >= utc(date_debut))
+    if date_fin is not None:
+        statement = statement.where(Commande.date_commande < utc(date_fin))
+    if apres is not None:
+        statement = statement.where(tuple_(Commande.date_commande, Commande.id) > tuple_(*apres))
+    statement = (
+        statement
+        .options(*_options_chargement())
+        .order_by(Commande.date_commande, Commande.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return statement
+
+def list_commandes(session: Session, **filtres) -> List[Commande]:
+    """Lister les commandes (filtres : voir `_requete_commandes`)."""
+    return session.exec(_requete_commandes(**filtres)).all()
+
+async def list_commandes_async(session: AsyncSession, **filtres) -> List[Commande]:
+    return (await session.exec(_requete_commandes(**filtres))).all()
+
+def list_commandes_by_client(session: Session, client_id: int, skip: int = 0, limit: int = 100, **filtres) -> List[Commande]:
     """Lister les commandes d'un client spécifique."""
-    statement = select(Commande).where(Commande.client_id == client_id).offset(skip).limit(limit)
-    return session.exec(statement).all()
+    return list_commandes(session, skip=skip, limit=limit, client_id=client_id, **filtres)
+
+async def list_commandes_by_client_async(session: AsyncSession, client_id: int, skip: int = 0, limit: int = 100, **filtres) -> List[Commande]:
+    return await list_commandes_async(session, skip=skip, limit=limit, client_id=client_id, **filtres)
 
 def update_commande(session: Session, commande_id: int, commande_in: CommandeUpdate) -> CommandeRead | None:
-    """Mettre à jour une commande."""
+    """Mettre à jour une commande.
+
+    Un changement de statut passe par la machine à états (`TRANSITIONS`) :
+    ValueError s'il n'est pas autorisé depuis le statut courant. Les statuts
+    ne peuvent ainsi qu'avancer, ce sur quoi repose l'ETag de suivi.
+    """
     db_commande = session.get(Commande, commande_id)
     if not db_commande:
         return None
     commande_data = commande_in.model_dump(exclude_unset=True)
+    status = commande_data.pop("status", None)
+    if status is not None and status != db_commande.status:
+        transitionner(session, commande_id, status)
+    if not commande_data:
+        session.refresh(db_commande)
+        return db_commande
     db_commande.sqlmodel_update(commande_data)
     session.add(db_commande)
     session.commit()
     session.refresh(db_commande)
+    _publier(session, db_commande, "modifiee")
     return db_commande
 
 def delete_commande(session: Session, commande_id: int) -> Commande | None:
@@ -47,8 +203,12 @@ def delete_commande(session: Session, commande_id: int) -> Commande | None:
     db_commande = session.get(Commande, commande_id)
     if not db_commande:
         return None
+    evenement = evenement_commande(db_commande, "supprimee")
+    # Sans cascade sur la relation, les lignes seraient détachées (commande_id NULL refusé)
+    session.exec(delete(LigneCommande).where(LigneCommande.commande_id == commande_id))
     session.delete(db_commande)
     session.commit()
+    bus.publier(evenement)
     return db_commande
 
 def add_ligne_commande(session: Session, ligne_in: LigneCommandeCreate) -> LigneCommande:
@@ -70,170 +230,301 @@ def add_ligne_commande(session: Session, ligne_in: LigneCommandeCreate) -> Ligne
                 ligne.prix_unitaire = menu.prix_fixe
 
     session.add(ligne)
+    _ajuster_montant_total(session, ligne.commande_id, _montant_ligne(ligne.prix_unitaire, ligne.quantite))
     session.commit()
     session.refresh(ligne)
-    # Re-calculer le montant total de la commande
-    update_montant_total(session, ligne.commande_id)
+    _publier_lignes(session, ligne.commande_id)
     return ligne
 
-def update_montant_total(session: Session, commande_id: int):
-    """Calcule et met à jour le montant total d'une commande."""
-    commande = session.get(Commande, commande_id)
-    if commande:
-        total = sum(l.prix_unitaire * l.quantite for l in commande.lignes)
-        commande.montant_total = total
-        session.add(commande)
-        session.commit()
+def _preparer_lignes(session: Session, commande_id: int, lignes_in: List[LigneCommandeItem]) -> List[LigneCommande]:
+    """Construire les lignes d'une commande en résolvant les prix manquants.
 
-def valider_commande(session: Session, commande_id: int, serveur_id: int) -> Commande | None:
-    """Valider une commande par un serveur."""
+    Les prix des plats et des menus sont récupérés avec une seule requête IN
+    par table, quel que soit le nombre de lignes.
+    """
+    from app.models.plat import Plat
+    from app.models.menu import Menu
+
+    sans_prix = [l for l in lignes_in if not l.prix_unitaire]
+    plat_ids = {l.plat_id for l in sans_prix if l.plat_id}
+    menu_ids = {l.menu_id for l in sans_prix if not l.plat_id and l.menu_id}
+
+    prix_plats = dict(session.exec(select(Plat.id, Plat.prix).where(Plat.id.in_(plat_ids))).all()) if plat_ids else {}
+    prix_menus = dict(session.exec(select(Menu.id, Menu.prix_fixe).where(Menu.id.in_(menu_ids))).all()) if menu_ids else {}
+
+    lignes = []
+    for ligne_in in lignes_in:
+        ligne = LigneCommande(commande_id=commande_id, **ligne_in.model_dump())
+        if not ligne.prix_unitaire:
+            if ligne.plat_id:
+                ligne.prix_unitaire = prix_plats.get(ligne.plat_id, 0)
+            elif ligne.menu_id:
+                ligne.prix_unitaire = prix_menus.get(ligne.menu_id, 0)
+        lignes.append(ligne)
+    return lignes
+
+def add_lignes_commande(session: Session, commande_id: int, lignes_in: List[LigneCommandeItem]) -> List[LigneCommande] | None:
+    """Ajouter plusieurs lignes à une commande en une seule transaction."""
     commande = session.get(Commande, commande_id)
     if not commande:
         return None
-    
-    curr_status = commande.status
-    if curr_status == CommandeStatus.APPROUVEE:
-        # Idempotency: Already approved, update server if needed but don't error
-        if commande.serveur_id != serveur_id:
-             commande.serveur_id = serveur_id
-             session.add(commande)
-             session.commit()
-             session.refresh(commande)
-        return commande
-
-    if curr_status != CommandeStatus.EN_ATTENTE:
-        raise ValueError(f"Impossible de valider une commande avec le statut: {curr_status}")
-    
-    commande.status = CommandeStatus.APPROUVEE
-    commande.serveur_id = serveur_id
-    
-    session.add(commande)
+
+    lignes = _preparer_lignes(session, commande_id, lignes_in)
+    session.add_all(lignes)
+    session.flush()
+
+    # Une seule mise à jour incrémentale du total pour toutes les lignes ajoutées
+    _ajuster_montant_total(session, commande_id, sum(_montant_ligne(l.prix_unitaire, l.quantite) for l in lignes))
+    ids = [l.id for l in lignes]
     session.commit()
-    session.refresh(commande)
-    return commande
+    _publier_lignes(session, commande_id)
 
-def refuser_commande(session: Session, commande_id: int, serveur_id: int, raison: str) -> Commande | None:
-    """Refuser une commande (EN_ATTENTE -> ANNULEE)."""
-    commande = session.get(Commande, commande_id)
-    if not commande:
+    statement = (
+        select(LigneCommande)
+        .where(LigneCommande.id.in_(ids))
+        .options(selectinload(LigneCommande.plat))
+        .order_by(LigneCommande.id)
+    )
+    return session.exec(statement).all()
+
+def update_ligne_commande(session: Session, commande_id: int, ligne_id: int, ligne_in: LigneCommandeUpdate) -> LigneCommande | None:
+    """Modifier une ligne de commande et répercuter l'écart sur le total."""
+    ligne = session.get(LigneCommande, ligne_id)
+    if not ligne or ligne.commande_id != commande_id:
         return None
-    
-    if commande.status != CommandeStatus.EN_ATTENTE:
-        raise ValueError(f"Impossible de refuser une commande avec le statut: {commande.status}")
-    
-    commande.status = CommandeStatus.ANNULEE
-    commande.serveur_id = serveur_id
-    commande.notes = f"{commande.notes or ''} [Refusée: {raison}]".strip()
-    
-    session.add(commande)
+    ancien_montant = _montant_ligne(ligne.prix_unitaire, ligne.quantite)
+    ligne.sqlmodel_update(ligne_in.model_dump(exclude_unset=True))
+    session.add(ligne)
+    _ajuster_montant_total(session, commande_id, _montant_ligne(ligne.prix_unitaire, ligne.quantite) - ancien_montant)
     session.commit()
-    session.refresh(commande)
-    return commande
+    session.refresh(ligne)
+    _publier_lignes(session, commande_id)
+    return ligne
 
-def transmettre_cuisine(session: Session, commande_id: int) -> Commande | None:
-    """Passer la commande en cuisine (APPROUVEE -> EN_COURS)."""
-    commande = session.get(Commande, commande_id)
-    if not commande:
+def delete_ligne_commande(session: Session, commande_id: int, ligne_id: int) -> LigneCommande | None:
+    """Supprimer une ligne de commande et retrancher son montant du total."""
+    # Le plat est chargé avant suppression pour pouvoir renvoyer la ligne complète
+    ligne = session.get(LigneCommande, ligne_id, options=[selectinload(LigneCommande.plat)])
+    if not ligne or ligne.commande_id != commande_id:
         return None
-    if commande.status == CommandeStatus.EN_COURS:
-        return commande
+    session.delete(ligne)
+    _ajuster_montant_total(session, commande_id, -_montant_ligne(ligne.prix_unitaire, ligne.quantite))
+    session.commit()
+    _publier_lignes(session, commande_id)
+    return ligne
 
-    if commande.status != CommandeStatus.APPROUVEE:
-        raise ValueError(f"Action invalide pour le statut: {commande.status}")
-    
-    commande.status = CommandeStatus.EN_COURS
-    session.add(commande)
+def update_montant_total(session: Session, commande_id: int):
+    """Recalculer entièrement le total d'une commande à partir de ses lignes.
+
+    Le total est normalement maintenu de façon incrémentale ; cette fonction
+    sert de réparation et s'exécute en une seule requête UPDATE. Chaque ligne
+    est arrondie comme dans `_montant_ligne` (ROUND sur NUMERIC : demi vers le
+    haut, sous PostgreSQL comme sous SQLite).
+    """
+    montant = func.round(cast(LigneCommande.prix_unitaire * LigneCommande.quantite, Numeric))
+    total = (
+        select(func.coalesce(func.sum(montant), 0))
+        .where(LigneCommande.commande_id == commande_id)
+        .scalar_subquery()
+    )
+    session.exec(update(Commande).where(Commande.id == commande_id).values(montant_total=total))
     session.commit()
-    session.refresh(commande)
-    return commande
+
+# ---------------------------------------------------------------------------
+# Machine à états des commandes
+# ---------------------------------------------------------------------------
+
+COMMANDE_INTROUVABLE = "Commande non trouvée"
+
+
+def _enregistrer_paiements(session: Session, commandes: List[Commande], methode: str = "especes"):
+    """Effet du passage à PAYEE : lignes marquées payées et paiements créés."""
+    session.exec(
+        update(LigneCommande)
+        .where(LigneCommande.commande_id.in_([c.id for c in commandes]))
+        .values(statut="payee")
+    )
+    session.add_all([
+        Paiement(
+            commande_id=c.id,
+            montant=c.montant_total,
+            methode_paiement=PaymentMethod(methode),
+            statut=PaymentStatus.REUSSI
+        )
+        for c in commandes
+    ])
+
+
+@dataclass(frozen=True)
+class Transition:
+    """Passage autorisé vers un statut de commande."""
+    action: str                                  # événement publié sur le bus
+    depuis: FrozenSet[CommandeStatus]            # statuts de départ acceptés
+    acteur: str | None = None                    # colonne du membre du personnel à renseigner
+    idempotente: bool = True                     # déjà au statut cible : pas une erreur
+    message: str = "Action invalide pour le statut: {statut}"
+    effet: Callable[..., None] | None = None     # écritures complémentaires, dans la même transaction
+
+
+TRANSITIONS: Dict[CommandeStatus, Transition] = {
+    CommandeStatus.APPROUVEE: Transition(
+        "validee", frozenset({CommandeStatus.EN_ATTENTE}), acteur="serveur_id",
+        message="Impossible de valider une commande avec le statut: {statut}",
+    ),
+    CommandeStatus.ANNULEE: Transition(
+        "refusee", frozenset({CommandeStatus.EN_ATTENTE}), acteur="serveur_id", idempotente=False,
+        message="Impossible de refuser une commande avec le statut: {statut}",
+    ),
+    CommandeStatus.EN_COURS: Transition("en_cuisine", frozenset({CommandeStatus.APPROUVEE})),
+    CommandeStatus.PRETE: Transition("prete", frozenset({CommandeStatus.EN_COURS}), acteur="cuisinier_id"),
+    CommandeStatus.SERVIE: Transition("servie", frozenset({CommandeStatus.PRETE})),
+    CommandeStatus.RECEPTIONNEE: Transition("receptionnee", frozenset({CommandeStatus.SERVIE})),
+    CommandeStatus.PAYEE: Transition(
+        "payee",
+        frozenset({
+            CommandeStatus.APPROUVEE, CommandeStatus.EN_COURS, CommandeStatus.PRETE,
+            CommandeStatus.SERVIE, CommandeStatus.RECEPTIONNEE, CommandeStatus.LIVREE,
+        }),
+        message="Impossible de payer une commande avec le statut: {statut}",
+        effet=_enregistrer_paiements,
+    ),
+}
+
+
+def transitionner_commandes(
+    session: Session,
+    commande_ids: List[int],
+    vers: CommandeStatus,
+    acteur_id: int | None = None,
+    valeurs: dict | None = None,
+    **options,
+) -> Tuple[List[Commande], Dict[int, str]]:
+    """Faire passer des commandes au statut `vers` par compare-and-swap.
+
+    Toutes les commandes sont modifiées par une seule instruction
+    `UPDATE … WHERE id IN (…) AND status IN (<statuts de départ>) RETURNING *` :
+    une commande modifiée entre-temps par un autre membre du personnel n'est
+    simplement pas retenue. Un seul commit est effectué, puis les événements
+    sont publiés.
+
+    Retourne les commandes au statut cible (modifiées ou déjà à ce statut si
+    la transition est idempotente) et, pour les autres, le motif de l'échec.
+    """
+    transition = TRANSITIONS.get(vers)
+    if transition is None:
+        raise ValueError(f"Aucune transition vers le statut: {vers}")
+    if not commande_ids:
+        return [], {}
+
+    condition = Commande.status.in_(transition.depuis)
+    colonnes = {"status": vers, **(valeurs or {})}
+    if transition.acteur and acteur_id is not None:
+        colonne = getattr(Commande, transition.acteur)
+        colonnes[transition.acteur] = acteur_id
+        # Une commande déjà au statut cible peut être réattribuée à un autre membre du personnel
+        condition = or_(condition, and_(Commande.status == vers, colonne.is_distinct_from(acteur_id)))
+
+    modifiees = session.scalars(
+        update(Commande)
+        .where(Commande.id.in_(commande_ids), condition)
+        .values(**colonnes)
+        .returning(Commande),
+        execution_options={"synchronize_session": "fetch"},
+    ).all()
+
+    # Les commandes non retenues sont relues pour distinguer absence, idempotence et conflit
+    ids_modifies = {c.id for c in modifiees}
+    restantes = [i for i in commande_ids if i not in ids_modifies]
+    inchangees, echecs = [], {}
+    if restantes:
+        existantes = {c.id: c for c in session.exec(select(Commande).where(Commande.id.in_(restantes))).all()}
+        for commande_id in restantes:
+            commande = existantes.get(commande_id)
+            if commande is None:
+                echecs[commande_id] = COMMANDE_INTROUVABLE
+            elif commande.status == vers and transition.idempotente:
+                inchangees.append(commande)
+            else:
+                echecs[commande_id] = transition.message.format(statut=CommandeStatus(commande.status).value)
+
+    if modifiees and transition.effet:
+        transition.effet(session, modifiees, **options)
+    evenements = [evenement_commande(c, transition.action) for c in modifiees]
+    # Résumé pour la cuisine calculé dans la transaction : une requête pour tout le lot
+    resumer_pour_cuisine(session, evenements)
+    session.commit()
+    bus.publier_lot(evenements)
+
+    par_id = {c.id: c for c in list(modifiees) + inchangees}
+    return [par_id[i] for i in commande_ids if i in par_id], echecs
+
+
+def transitionner(
+    session: Session,
+    commande_id: int,
+    vers: CommandeStatus,
+    acteur_id: int | None = None,
+    valeurs: dict | None = None,
+    **options,
+) -> Commande | None:
+    """Appliquer une transition à une seule commande (None si elle n'existe pas)."""
+    commandes, echecs = transitionner_commandes(session, [commande_id], vers, acteur_id, valeurs, **options)
+    if commandes:
+        return commandes[0]
+    if echecs[commande_id] == COMMANDE_INTROUVABLE:
+        return None
+    raise ValueError(echecs[commande_id])
+
+
+def valider_commande(session: Session, commande_id: int, serveur_id: int) -> Commande | None:
+    """Valider une commande par un serveur (EN_ATTENTE -> APPROUVEE)."""
+    return transitionner(session, commande_id, CommandeStatus.APPROUVEE, acteur_id=serveur_id)
+
+def _notes_refus(raison: str):
+    """Expression SQL ajoutant le motif du refus aux notes existantes."""
+    return func.trim(func.coalesce(Commande.notes, "") + f" [Refusée: {raison}]")
+
+def transitionner_lot(
+    session: Session,
+    commande_ids: List[int],
+    vers: CommandeStatus,
+    acteur_id: int | None = None,
+    raison: str | None = None,
+    methode: str = "especes",
+) -> Tuple[List[Commande], Dict[int, str]]:
+    """Transition groupée (cuisine, salle) avec les paramètres propres à chaque statut."""
+    valeurs = {}
+    if vers == CommandeStatus.ANNULEE:
+        valeurs["notes"] = _notes_refus(raison or "Aucune raison spécifiée")
+    options = {}
+    if vers == CommandeStatus.PAYEE:
+        PaymentMethod(methode)
+        options["methode"] = methode
+    # Une commande citée deux fois n'est traitée qu'une fois
+    commande_ids = list(dict.fromkeys(commande_ids))
+    return transitionner_commandes(session, commande_ids, vers, acteur_id, valeurs, **options)
+
+def refuser_commande(session: Session, commande_id: int, serveur_id: int, raison: str) -> Commande | None:
+    """Refuser une commande (EN_ATTENTE -> ANNULEE)."""
+    return transitionner(session, commande_id, CommandeStatus.ANNULEE, acteur_id=serveur_id, valeurs={"notes": _notes_refus(raison)})
+
+def transmettre_cuisine(session: Session, commande_id: int) -> Commande | None:
+    """Passer la commande en cuisine (APPROUVEE -> EN_COURS)."""
+    return transitionner(session, commande_id, CommandeStatus.EN_COURS)
 
 def marquer_prete(session: Session, commande_id: int, cuisinier_id: int) -> Commande | None:
     """Marquer la commande comme prête (EN_COURS -> PRETE)."""
-    commande = session.get(Commande, commande_id)
-    if not commande:
-        return None
-    if commande.status == CommandeStatus.PRETE:
-        if commande.cuisinier_id != cuisinier_id:
-            commande.cuisinier_id = cuisinier_id
-            session.add(commande)
-            session.commit()
-            session.refresh(commande)
-        return commande
-
-    if commande.status != CommandeStatus.EN_COURS:
-        raise ValueError(f"Action invalide pour le statut: {commande.status}")
-    
-    commande.status = CommandeStatus.PRETE
-    commande.cuisinier_id = cuisinier_id
-    session.add(commande)
-    session.commit()
-    session.refresh(commande)
-    return commande
+    return transitionner(session, commande_id, CommandeStatus.PRETE, acteur_id=cuisinier_id)
 
 def marquer_servie(session: Session, commande_id: int) -> Commande | None:
     """Marquer la commande comme servie (PRETE -> SERVIE)."""
-    commande = session.get(Commande, commande_id)
-    if not commande:
-        return None
-    if commande.status == CommandeStatus.SERVIE:
-        return commande
-
-    if commande.status != CommandeStatus.PRETE:
-        raise ValueError(f"Action invalide pour le statut: {commande.status}")
-    
-    commande.status = CommandeStatus.SERVIE
-    session.add(commande)
-    session.commit()
-    session.refresh(commande)
-    return commande
+    return transitionner(session, commande_id, CommandeStatus.SERVIE)
 
 def valider_reception(session: Session, commande_id: int) -> Commande | None:
     """Le client valide la réception de sa commande (SERVIE -> RECEPTIONNEE)."""
-    commande = session.get(Commande, commande_id)
-    if not commande:
-        return None
-    if commande.status == CommandeStatus.RECEPTIONNEE:
-        return commande
-
-    if commande.status != CommandeStatus.SERVIE:
-        raise ValueError(f"Action invalide pour le statut: {commande.status}")
-    
-    commande.status = CommandeStatus.RECEPTIONNEE
-    session.add(commande)
-    session.commit()
-    session.refresh(commande)
-    return commande
+    return transitionner(session, commande_id, CommandeStatus.RECEPTIONNEE)
 
 def marquer_payee(session: Session, commande_id: int, methode: str = "especes") -> Commande | None:
-    """Marquer une commande comme payée par un serveur."""
-    from app.models.paiement import Paiement, PaymentStatus, PaymentMethod
-    commande = session.get(Commande, commande_id)
-    if not commande:
-        return None
-    
-    # Vérifier que la commande a été validée par un serveur avant de permettre le paiement
-    if commande.status == CommandeStatus.EN_ATTENTE:
-        raise ValueError("Impossible de payer une commande non validée par un serveur.")
-    
-    # Mettre à jour le statut de la commande
-    commande.status = CommandeStatus.PAYEE
-    
-    # Mettre à jour le statut de toutes les lignes de commande
-    for ligne in commande.lignes:
-        ligne.statut = "payee"
-        session.add(ligne)
-        
-    session.add(commande)
-    
-    # Créer le record de paiement
-    paiement = Paiement(
-        commande_id=commande.id,
-        montant=commande.montant_total,
-        methode_paiement=PaymentMethod(methode),
-        statut=PaymentStatus.REUSSI
-    )
-    session.add(paiement)
-    
-    session.commit()
-    session.refresh(commande)
-    return commande
+    """Marquer une commande comme payée par un serveur (toute commande validée et non annulée)."""
+    PaymentMethod(methode)  # ValueError avant toute écriture si la méthode est inconnue
+    return transitionner(session, commande_id, CommandeStatus.PAYEE, methode=methode)
@@ -0,0 +1,237 @@
+"""
+Vues de la cuisine : file de priorité et tableau de production.
+
+Les commandes entrent dans la file lorsqu'elles passent EN_COURS et en
+sortent dès qu'elles quittent ce statut ou sont supprimées ; la file est
+alimentée par le bus d'événements, si bien que sa lecture ne touche pas la base
+de données. Les événements d'une commande EN_COURS portent ce qui fixe sa
+priorité (`resumer_pour_cuisine`, calculé par l'écriture qui publie) : la file
+les applique sans requête. Le bus ne couvre que le processus courant : la file est
+reconstruite depuis la base après CUISINE_FILE_TTL_SECONDES pour prendre en
+compte les écritures des autres workers.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select, func
+
+from app.core.config import settings
+from app.core.events import bus
+from app.models.commande import Commande, CommandeStatus
+from app.models.ligne_commande import LigneCommande
+from app.models.menu import Menu
+from app.models.plat import Plat
+from app.schemas.commande import ProductionNote, ProductionPlat
+
+# Pondération de la priorité, exprimée en secondes d'attente équivalentes :
+# une minute de préparation du plat le plus long compte comme une minute
+# d'attente, et chaque article comme SECONDES_PAR_ARTICLE d'attente.
+POIDS_PREPARATION = 1.0
+SECONDES_PAR_ARTICLE = 30
+
+
+@dataclass(frozen=True)
+class EntreeCuisine:
+    """Une commande en préparation et ce qui détermine sa priorité."""
+    commande_id: int
+    table_id: int
+    date_commande: datetime
+    nombre_articles: int
+    temps_preparation_max: int  # minutes, plat le plus long de la commande
+
+    @property
+    def cle(self) -> float:
+        """Clé de tri croissante : plus elle est petite, plus la commande est prioritaire.
+
+        Le score est attente + POIDS_PREPARATION * préparation + SECONDES_PAR_ARTICLE * articles.
+        L'attente augmente au même rythme pour toutes les commandes ; l'ordre
+        ne dépend donc que de la date de commande et reste valable sans retri.
+        """
+        return (
+            self.date_commande.timestamp()
+            - POIDS_PREPARATION * self.temps_preparation_max * 60
+            - SECONDES_PAR_ARTICLE * self.nombre_articles
+        )
+
+
+def _entree(commande: Commande) -> EntreeCuisine:
+    date = commande.date_commande
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return EntreeCuisine(
+        commande_id=commande.id,
+        table_id=commande.table_id,
+        date_commande=date,
+        nombre_articles=sum(l.quantite for l in commande.lignes),
+        temps_preparation_max=max(
+            (l.plat.temps_preparation or 0 for l in commande.lignes if l.plat), default=0
+        ),
+    )
+
+
+def _entree_evenement(evenement: Dict[str, Any]) -> EntreeCuisine:
+    date = datetime.fromisoformat(evenement["date_commande"])
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return EntreeCuisine(
+        commande_id=evenement["commande_id"],
+        table_id=evenement["table_id"],
+        date_commande=date,
+        nombre_articles=evenement["nombre_articles"],
+        temps_preparation_max=evenement["temps_preparation_max"],
+    )
+
+
+def _charger_commandes(session: Session, *conditions) -> List[Commande]:
+    statement = (
+        select(Commande)
+        .where(*conditions)
+        .options(selectinload(Commande.lignes).selectinload(LigneCommande.plat))
+    )
+    return session.exec(statement).all()
+
+
+class FileCuisine:
+    """Liste triée des commandes EN_COURS (insertion et retrait par bissection)."""
+
+    def __init__(self, ttl: float | None = None, horloge: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._horloge = horloge
+        self._ordre: List[Tuple[float, int]] = []
+        self._entrees: Dict[int, EntreeCuisine] = {}
+        # Réentrant : les lectures de la base se font sous verrou (voir `reconstruire`)
+        self._lock = threading.RLock()
+        self._construite_le: float | None = None
+
+    @property
+    def initialisee(self) -> bool:
+        return self._construite_le is not None
+
+    def reconstruire(self, session: Session):
+        """Recharger la file depuis la base (première lecture, puis après expiration)."""
+        # Lecture sous verrou : un événement concurrent est appliqué après le chargement
+        with self._lock:
+            entrees = [_entree(c) for c in _charger_commandes(session, Commande.status == CommandeStatus.EN_COURS)]
+            self._entrees = {e.commande_id: e for e in entrees}
+            self._ordre = sorted((e.cle, e.commande_id) for e in entrees)
+            self._construite_le = self._horloge()
+
+    def assurer_a_jour(self, session: Session):
+        with self._lock:
+            if self.initialisee and (self.ttl is None or self._horloge() - self._construite_le < self.ttl):
+                return
+            self.reconstruire(session)
+
+    def ajouter(self, entree: EntreeCuisine):
+        with self._lock:
+            self._retirer(entree.commande_id)
+            self._entrees[entree.commande_id] = entree
+            insort(self._ordre, (entree.cle, entree.commande_id))
+
+    def retirer(self, commande_id: int):
+        with self._lock:
+            self._retirer(commande_id)
+
+    def _retirer(self, commande_id: int):
+        entree = self._entrees.pop(commande_id, None)
+        if entree is not None:
+            del self._ordre[bisect_left(self._ordre, (entree.cle, commande_id))]
+
+    def lister(self, limit: int | None = None) -> List[EntreeCuisine]:
+        """Commandes par ordre de priorité décroissante."""
+        with self._lock:
+            ordre = self._ordre[:limit] if limit else list(self._ordre)
+            return [self._entrees[commande_id] for _, commande_id in ordre]
+
+    def __len__(self) -> int:
+        return len(self._ordre)
+
+    def sur_evenements(self, evenements: List[Dict[str, Any]]):
+        """Écouteur du bus : suit les entrées et sorties du statut EN_COURS.
+
+        L'entrée d'une commande qui est (ou reste) EN_COURS est construite à
+        partir de l'événement, sans requête : un changement de lignes met
+        aussi à jour sa priorité.
+        """
+        if not self.initialisee:
+            # La file sera construite complète à sa première lecture
+            return
+        with self._lock:
+            for evenement in evenements:
+                if evenement["event"] == "supprimee" or evenement["status"] != CommandeStatus.EN_COURS:
+                    self._retirer(evenement["commande_id"])
+                elif "nombre_articles" in evenement:
+                    self.ajouter(_entree_evenement(evenement))
+
+
+def resumer_pour_cuisine(session: Session, evenements: List[Dict[str, Any]]):
+    """Compléter les événements des commandes EN_COURS (nombre d'articles, plat
+    le plus long) par une requête agrégée dans la session de l'écriture."""
+    ids = {
+        e["commande_id"] for e in evenements
+        if e["event"] != "supprimee" and e["status"] == CommandeStatus.EN_COURS
+    }
+    if not ids:
+        return
+    resumes = {
+        commande_id: (articles, temps)
+        for commande_id, articles, temps in session.exec(
+            select(LigneCommande.commande_id, func.sum(LigneCommande.quantite), func.max(Plat.temps_preparation))
+            .outerjoin(Plat, LigneCommande.plat_id == Plat.id)
+            .where(LigneCommande.commande_id.in_(ids))
+            .group_by(LigneCommande.commande_id)
+        ).all()
+    }
+    for evenement in evenements:
+        if evenement["commande_id"] in ids:
+            articles, temps = resumes.get(evenement["commande_id"], (0, 0))
+            evenement["nombre_articles"] = int(articles or 0)
+            evenement["temps_preparation_max"] = int(temps or 0)
+
+
+file_cuisine = FileCuisine(ttl=settings.CUISINE_FILE_TTL_SECONDES)
+bus.ecouter(file_cuisine.sur_evenements)
+
+
+def lister_file_cuisine(session: Session, limit: int | None = None) -> List[EntreeCuisine]:
+    """File de la cuisine par priorité ; la base n'est lue qu'à la première demande
+    et après expiration (écritures des autres processus)."""
+    file_cuisine.assurer_a_jour(session)
+    return file_cuisine.lister(limit)
+
+
+def tableau_production(session: Session, statuts: List[CommandeStatus] | None = None) -> List[ProductionPlat]:
+    """Quantités à produire par plat sur toutes les commandes actives (EN_COURS par défaut).
+
+    Une seule requête agrégée, groupée par plat (ou menu) et par note spéciale ;
+    les notes sont ensuite rattachées à leur plat.
+    """
+    statement = (
+        select(
+            LigneCommande.plat_id,
+            LigneCommande.menu_id,
+            func.coalesce(Plat.nom, Menu.nom),
+            LigneCommande.notes_speciales,
+            func.sum(LigneCommande.quantite),
+        )
+        .join(Commande, LigneCommande.commande_id == Commande.id)
+        .outerjoin(Plat, LigneCommande.plat_id == Plat.id)
+        .outerjoin(Menu, LigneCommande.menu_id == Menu.id)
+        .where(Commande.status.in_(statuts or [CommandeStatus.EN_COURS]))
+        .group_by(LigneCommande.plat_id, LigneCommande.menu_id, Plat.nom, Menu.nom, LigneCommande.notes_speciales)
+    )
+
+    tableau: Dict[Tuple[int | None, int | None], ProductionPlat] = {}
+    for plat_id, menu_id, nom, notes, quantite in session.exec(statement).all():
+        cle = (plat_id, menu_id)
+        if cle not in tableau:
+            tableau[cle] = ProductionPlat(plat_id=plat_id, menu_id=menu_id, nom=nom or "?", quantite=0)
+        tableau[cle].quantite += quantite
+        if notes:
+            tableau[cle].notes.append(ProductionNote(notes_speciales=notes, quantite=quantite))
+    return sorted(tableau.values(), key=lambda p: (-p.quantite, p.nom))
@@ -0,0 +1,195 @@
+"""
+Worker d'envoi de la file d'emails (EmailSortant).
+
+Une seule connexion SMTP authentifiée est ouverte à la demande puis réutilisée
+pour tous les messages ; elle est fermée après une période d'inactivité. Les
+emails dus sont traités par lots ; un échec temporaire reprogramme l'email
+avec un délai croissant (backoff exponentiel), un refus définitif (5xx) ou
+l'épuisement des tentatives le passe en échec.
+
+Lancement : python scripts/email_worker.py (ou EMAIL_WORKER_INTEGRE=true pour
+l'exécuter dans le processus web).
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Dict
+
+import aiosmtplib
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_engine
+from app.models.email_sortant import EmailSortant, EmailStatut
+
+logger = logging.getLogger("app.email")
+
+# Erreurs qui indiquent une connexion perdue : le reste du lot attendra le prochain tour
+ERREURS_CONNEXION = (aiosmtplib.SMTPConnectError, aiosmtplib.SMTPServerDisconnected,
+                     aiosmtplib.SMTPTimeoutError, OSError)
+
+
+class ConnexionSMTP:
+    """Connexion SMTP réutilisée d'un message à l'autre (une seule authentification)."""
+
+    def __init__(
+        self,
+        hote: str,
+        port: int,
+        utilisateur: str | None = None,
+        mot_de_passe: str | None = None,
+        ssl_tls: bool = False,
+        starttls: bool = False,
+        valider_certs: bool = True,
+        delai: float = 30,
+    ):
+        self._parametres = dict(
+            hostname=hote, port=port, username=utilisateur, password=mot_de_passe,
+            use_tls=ssl_tls, start_tls=starttls, validate_certs=valider_certs, timeout=delai,
+        )
+        self._smtp: aiosmtplib.SMTP | None = None
+        self.ouvertures = 0
+        self.dernier_usage = 0.0
+
+    @classmethod
+    def depuis_configuration(cls) -> "ConnexionSMTP":
+        # Port 465 = SSL/TLS, Port 587 = STARTTLS, sauf configuration explicite
+        ssl_tls = settings.MAIL_SSL_TLS if settings.MAIL_SSL_TLS is not None else (settings.MAIL_PORT == 465)
+        starttls = settings.MAIL_STARTTLS if settings.MAIL_STARTTLS is not None else (settings.MAIL_PORT == 587)
+        identifiants = settings.USE_CREDENTIALS and settings.MAIL_USERNAME
+        return cls(
+            settings.MAIL_SERVER, settings.MAIL_PORT,
+            utilisateur=settings.MAIL_USERNAME if identifiants else None,
+            mot_de_passe=settings.MAIL_PASSWORD if identifiants else None,
+            ssl_tls=ssl_tls, starttls=starttls, valider_certs=settings.VALIDATE_CERTS,
+        )
+
+    @property
+    def ouverte(self) -> bool:
+        return self._smtp is not None and self._smtp.is_connected
+
+    async def _ouvrir(self):
+        await self.fermer()
+        self._smtp = aiosmtplib.SMTP(**self._parametres)
+        await self._smtp.connect()
+        self.ouvertures += 1
+
+    async def envoyer(self, message: EmailMessage):
+        reutilisee = self.ouverte
+        if not reutilisee:
+            await self._ouvrir()
+        try:
+            await self._smtp.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            if not reutilisee:
+                raise
+            # Le serveur a fermé une connexion restée ouverte : une seule reconnexion
+            await self._ouvrir()
+            await self._smtp.send_message(message)
+        self.dernier_usage = asyncio.get_running_loop().time()
+
+    async def fermer(self):
+        if self._smtp is None:
+            return
+        smtp, self._smtp = self._smtp, None
+        if smtp.is_connected:
+            try:
+                await smtp.quit()
+            except aiosmtplib.SMTPException:
+                smtp.close()
+
+
+def _message(email: EmailSortant) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))
+    message["To"] = email.destinataire
+    message["Subject"] = email.sujet
+    message.set_content(email.corps_html, subtype="html")
+    return message
+
+
+def _definitif(erreur: Exception) -> bool:
+    """Refus 5xx du serveur : inutile de réessayer."""
+    if isinstance(erreur, aiosmtplib.SMTPRecipientsRefused):
+        return all(500 <= r.code < 600 for r in erreur.recipients)
+    return isinstance(erreur, aiosmtplib.SMTPResponseException) and 500 <= erreur.code < 600
+
+
+def _reprogrammer(email: EmailSortant, erreur: Exception, maintenant: datetime):
+    email.tentatives += 1
+    email.derniere_erreur = f"{type(erreur).__name__}: {erreur}"[:500]
+    if _definitif(erreur) or email.tentatives >= settings.EMAIL_TENTATIVES_MAX:
+        email.statut = EmailStatut.ECHEC
+        logger.error(f"Email {email.id} vers {email.destinataire} abandonné : {email.derniere_erreur}")
+        return
+    delai = min(settings.EMAIL_BACKOFF_MAX_SECONDES,
+                settings.EMAIL_BACKOFF_BASE_SECONDES * 2 ** (email.tentatives - 1))
+    email.prochain_essai = maintenant + timedelta(seconds=delai)
+    logger.warning(f"Email {email.id} vers {email.destinataire} reporté de {delai:.0f} s : {email.derniere_erreur}")
+
+
+async def traiter_lot(session: AsyncSession, smtp: ConnexionSMTP, taille: int) -> Dict[str, int]:
+    """Envoyer au plus `taille` emails dus, sur la connexion partagée."""
+    maintenant = datetime.now(timezone.utc)
+    # SKIP LOCKED : plusieurs workers se partagent la file sans s'attendre (ignoré par SQLite)
+    statement = (
+        select(EmailSortant)
+        .where(EmailSortant.statut == EmailStatut.EN_ATTENTE, EmailSortant.prochain_essai <= maintenant)
+        .order_by(EmailSortant.prochain_essai, EmailSortant.id)
+        .limit(taille)
+        .with_for_update(skip_locked=True)
+    )
+    emails = (await session.exec(statement)).all()
+    bilan = {"lus": len(emails), "envoyes": 0, "reportes": 0, "echecs": 0}
+    for email in emails:
+        try:
+            await smtp.envoyer(_message(email))
+        except (aiosmtplib.SMTPException, OSError) as erreur:
+            _reprogrammer(email, erreur, maintenant)
+            bilan["echecs" if email.statut == EmailStatut.ECHEC else "reportes"] += 1
+            session.add(email)
+            if isinstance(erreur, ERREURS_CONNEXION):
+                await smtp.fermer()
+                break
+            continue
+        email.statut = EmailStatut.ENVOYE
+        email.date_envoi = datetime.now(timezone.utc)
+        email.derniere_erreur = None
+        session.add(email)
+        bilan["envoyes"] += 1
+    await session.commit()
+    return bilan
+
+
+async def executer(arret: asyncio.Event, smtp: ConnexionSMTP | None = None):
+    """Boucle du worker jusqu'à `arret` : lots successifs, pause quand la file est vide."""
+    smtp = smtp or ConnexionSMTP.depuis_configuration()
+    boucle = asyncio.get_running_loop()
+    logger.info("Worker email démarré")
+    try:
+        while not arret.is_set():
+            try:
+                async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                    bilan = await traiter_lot(session, smtp, settings.EMAIL_LOT_TAILLE)
+            except Exception:
+                # Base indisponible… : le worker ne doit pas s'arrêter
+                logger.exception("Lot d'emails en échec")
+                bilan = {}
+            if bilan.get("lus"):
+                logger.info(f"Lot d'emails : {bilan}")
+            if bilan.get("envoyes") == settings.EMAIL_LOT_TAILLE:
+                continue  # lot complet envoyé : la file n'est peut-être pas vide
+
+            inactivite = boucle.time() - smtp.dernier_usage
+            if smtp.ouverte and inactivite > settings.EMAIL_CONNEXION_INACTIVITE_SECONDES:
+                await smtp.fermer()
+            try:
+                await asyncio.wait_for(arret.wait(), timeout=settings.EMAIL_INTERVALLE_SECONDES)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        await smtp.fermer()
+        logger.info("Worker email arrêté")
@@ -0,0 +1,97 @@
+"""
+Variantes redimensionnées des images de plats.
+
+Le redimensionnement et l'encodage WebP sont des calculs CPU : ils tournent
+dans un pool de processus (IMAGE_PROCESSUS_MAX), hors du processus web. Les
+fonctions exécutées dans le pool ne dépendent que de Pillow et des chemins
+qu'elles reçoivent.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict
+
+from PIL import Image, ImageOps
+
+# Largeur maximale de chaque variante (jamais agrandie)
+VARIANTES = {"miniature": 320, "moyenne": 960}
+QUALITE_JPEG = 82
+QUALITE_WEBP = 80
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _rgb(image: Image.Image, alpha: bool) -> Image.Image:
+    """Convertir (CMYK, palette, niveaux de gris…) en RGB, ou RGBA si `alpha` et l'image est transparente."""
+    transparente = "A" in image.getbands() or "transparency" in image.info
+    mode = "RGBA" if alpha and transparente else "RGB"
+    return image if image.mode == mode else image.convert(mode)
+
+
+def _enregistrer(image: Image.Image, chemin: Path, format: str, **options):
+    # Écriture atomique : un fichier servi n'est jamais à moitié écrit
+    partiel = chemin.with_name(f"{chemin.name}.{os.getpid()}.part")
+    image.save(partiel, format, **options)
+    os.replace(partiel, chemin)
+
+
+def generer_variantes(chemin_source: str, remplacer: bool = False) -> Dict[str, str]:
+    """Écrire les variantes à côté de l'original et renvoyer leurs noms de fichiers.
+
+    Pour « abc.jpg » : abc_miniature.jpg/.webp, abc_moyenne.jpg/.webp et abc.webp
+    (taille d'origine). Les originaux étant nommés par leur contenu, des
+    variantes déjà présentes sont identiques et ne sont pas refaites, sauf si
+    `remplacer`.
+    """
+    source = Path(chemin_source)
+    cibles = {}
+    for nom in VARIANTES:
+        cibles[nom] = f"{source.stem}_{nom}.jpg"
+        cibles[f"{nom}_webp"] = f"{source.stem}_{nom}.webp"
+    if source.suffix != ".webp":
+        cibles["webp"] = f"{source.stem}.webp"
+    if not remplacer and all(source.with_name(fichier).exists() for fichier in cibles.values()):
+        return cibles
+
+    with Image.open(source) as ouverte:
+        # Appliquer l'orientation EXIF des photos de téléphone avant de redimensionner
+        image = ImageOps.exif_transpose(ouverte)
+        image.load()
+    for nom, largeur in VARIANTES.items():
+        reduite = image.copy()
+        reduite.thumbnail((largeur, largeur), Image.Resampling.LANCZOS)
+        _enregistrer(_rgb(reduite, alpha=False), source.with_name(cibles[nom]), "JPEG",
+                     quality=QUALITE_JPEG, optimize=True, progressive=True)
+        _enregistrer(_rgb(reduite, alpha=True), source.with_name(cibles[f"{nom}_webp"]), "WEBP",
+                     quality=QUALITE_WEBP, method=4)
+    if "webp" in cibles:
+        _enregistrer(_rgb(image, alpha=True), source.with_name(cibles["webp"]), "WEBP",
+                     quality=QUALITE_WEBP, method=4)
+    return cibles
+
+
+def _obtenir_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        from app.core.config import settings
+        # « spawn » : pas de fork d'un processus qui a déjà des threads (pool Argon2, anyio)
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_PROCESSUS_MAX,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def generer_variantes_async(chemin_source: str, remplacer: bool = False) -> Dict[str, str]:
+    boucle = asyncio.get_running_loop()
+    return await boucle.run_in_executor(_obtenir_pool(), generer_variantes, chemin_source, remplacer)
+
+
+def arreter_pool():
+    """Arrêter les processus du pool (arrêt de l'application)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
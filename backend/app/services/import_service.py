@@ -0,0 +1,179 @@
+"""
+Import en masse de comptes (clients et personnel) depuis un CSV ou du JSON.
+
+Toutes les lignes sont validées avant la moindre écriture (format, rôle,
+doublons dans le fichier et en base). Les mots de passe sont ensuite hachés
+en parallèle dans le pool Argon2, puis utilisateurs, personnels et profils
+sont insérés par lots dans une seule transaction, via une AsyncSession : la
+boucle n'attend ni la base ni les hachages.
+"""
+import asyncio
+import csv
+import io
+from typing import Any, Dict, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select, or_
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.client import Client
+from app.models.cuisinier import Cuisinier
+from app.models.gerant import Gerant
+from app.models.personnel import Personnel
+from app.models.serveur import Serveur
+from app.models.utilisateur import Utilisateur
+from app.schemas.import_utilisateurs import ImportCompte, ImportLigneErreur, ImportResultat
+from app.schemas.utilisateur import UtilisateurCreate
+from app.security.hashing import hash_password_async
+from app.services.email_service import mettre_en_file_verification
+from app.services.utilisateur_service import preparer_verification
+
+# Profil créé pour chaque rôle (None : compte client, sans personnel)
+PROFILS_PERSONNEL = {"serveur": Serveur, "cuisinier": Cuisinier, "gerant": Gerant}
+ROLES_IMPORT = {"client", *PROFILS_PERSONNEL}
+IMPORT_LIGNES_MAX = 1000
+
+
+def lire_csv(contenu: bytes) -> List[Dict[str, Any]]:
+    """Lignes d'un CSV avec en-tête (séparateur `,` `;` ou tabulation, comme en sortie d'Excel)."""
+    try:
+        texte = contenu.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("Le fichier doit être encodé en UTF-8.")
+    try:
+        dialecte = csv.Sniffer().sniff(texte[:4096], delimiters=",;\t")
+    except csv.Error:
+        dialecte = csv.excel
+    lecteur = csv.DictReader(io.StringIO(texte), dialect=dialecte)
+    return [
+        {(cle or "").strip().lower(): (valeur or "").strip() for cle, valeur in ligne.items()}
+        for ligne in lecteur
+    ]
+
+
+async def valider_lignes(
+    session: AsyncSession, lignes_brutes: List[Dict[str, Any]]
+) -> Tuple[List[Tuple[int, UtilisateurCreate]], List[ImportLigneErreur]]:
+    """Séparer les lignes valides des lignes rejetées, avec toutes les raisons de chaque rejet."""
+    candidates: List[Tuple[int, UtilisateurCreate]] = []
+    problemes: Dict[int, List[str]] = {}
+    emails_vus: Dict[str, int] = {}
+    telephones_vus: Dict[str, int] = {}
+
+    for numero, brute in enumerate(lignes_brutes, start=1):
+        try:
+            ligne = UtilisateurCreate.model_validate(brute)
+        except ValidationError as e:
+            problemes[numero] = [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()]
+            continue
+        erreurs = problemes.setdefault(numero, [])
+        ligne.email = (ligne.email or "").lower().strip()
+        ligne.telephone = (ligne.telephone or "").strip()
+        ligne.role = ligne.role.lower().strip()
+        if not ligne.email:
+            erreurs.append("email: champ requis")
+        if not ligne.telephone:
+            erreurs.append("telephone: champ requis")
+        if not ligne.password:
+            erreurs.append("password: champ requis")
+        if ligne.role not in ROLES_IMPORT:
+            erreurs.append(f"role: '{ligne.role}' inconnu (attendu : {', '.join(sorted(ROLES_IMPORT))})")
+        if ligne.email in emails_vus:
+            erreurs.append(f"email: déjà présent ligne {emails_vus[ligne.email]}")
+        if ligne.telephone in telephones_vus:
+            erreurs.append(f"telephone: déjà présent ligne {telephones_vus[ligne.telephone]}")
+        emails_vus.setdefault(ligne.email, numero)
+        telephones_vus.setdefault(ligne.telephone, numero)
+        candidates.append((numero, ligne))
+
+    # Une seule requête pour tous les emails et téléphones déjà en base
+    if candidates:
+        existants = (await session.exec(
+            select(Utilisateur.email, Utilisateur.telephone).where(or_(
+                Utilisateur.email.in_([l.email for _, l in candidates]),
+                Utilisateur.telephone.in_([l.telephone for _, l in candidates]),
+            ))
+        )).all()
+        emails_pris = {email for email, _ in existants}
+        telephones_pris = {telephone for _, telephone in existants}
+        for numero, ligne in candidates:
+            if ligne.email in emails_pris:
+                problemes[numero].append("email: déjà utilisé")
+            if ligne.telephone in telephones_pris:
+                problemes[numero].append("telephone: déjà utilisé")
+
+    valides = [(numero, ligne) for numero, ligne in candidates if not problemes.get(numero)]
+    rejets = [
+        ImportLigneErreur(ligne=numero, email=lignes_brutes[numero - 1].get("email"), erreurs=erreurs)
+        for numero, erreurs in sorted(problemes.items()) if erreurs
+    ]
+    return valides, rejets
+
+
+async def creer_comptes(
+    session: AsyncSession, lignes: List[Tuple[int, UtilisateurCreate]], hashes: List[str]
+) -> List[ImportCompte]:
+    """Insérer utilisateurs, personnels et profils en une transaction (tout ou rien)."""
+    utilisateurs = [
+        Utilisateur(
+            nom=ligne.nom, prenom=ligne.prenom, email=ligne.email,
+            telephone=ligne.telephone, role=ligne.role, hashed_password=hache,
+        )
+        for (_, ligne), hache in zip(lignes, hashes)
+    ]
+    tokens = [preparer_verification(utilisateur) for utilisateur in utilisateurs]
+    try:
+        session.add_all(utilisateurs)
+        await session.flush()
+
+        personnels = {
+            i: Personnel(utilisateur_id=utilisateur.id)
+            for i, utilisateur in enumerate(utilisateurs) if utilisateur.role in PROFILS_PERSONNEL
+        }
+        session.add_all(personnels.values())
+        await session.flush()
+
+        profils = [
+            PROFILS_PERSONNEL[utilisateur.role](personnel_id=personnels[i].id) if i in personnels
+            else Client(utilisateur_id=utilisateur.id)
+            for i, utilisateur in enumerate(utilisateurs)
+        ]
+        session.add_all(profils)
+        for utilisateur, token in zip(utilisateurs, tokens):
+            mettre_en_file_verification(session, utilisateur.email, token)
+        await session.flush()
+
+        comptes = [
+            ImportCompte(ligne=numero, utilisateur_id=utilisateur.id, email=utilisateur.email,
+                         role=utilisateur.role, profil_id=profil.id)
+            for (numero, _), utilisateur, profil in zip(lignes, utilisateurs, profils)
+        ]
+        await session.commit()
+    except IntegrityError:
+        # Compte créé entre la validation et l'insertion
+        await session.rollback()
+        raise ValueError("Import annulé : un email ou un téléphone vient d'être utilisé. Relancez l'import.")
+    return comptes
+
+
+async def importer_utilisateurs(
+    session: AsyncSession, lignes_brutes: List[Dict[str, Any]], ignorer_erreurs: bool = False
+) -> ImportResultat:
+    """Valider puis importer ; avec des lignes rejetées, rien n'est créé sauf si `ignorer_erreurs`."""
+    if not lignes_brutes:
+        raise ValueError("Aucune ligne à importer.")
+    if len(lignes_brutes) > IMPORT_LIGNES_MAX:
+        raise ValueError(f"Import limité à {IMPORT_LIGNES_MAX} lignes.")
+
+    valides, erreurs = await valider_lignes(session, lignes_brutes)
+    resultat = ImportResultat(total=len(lignes_brutes), crees=0, erreurs=erreurs)
+    if (erreurs and not ignorer_erreurs) or not valides:
+        return resultat
+
+    # La connexion retourne au pool pendant les calculs Argon2
+    await session.close()
+    hashes = await asyncio.gather(*(hash_password_async(ligne.password) for _, ligne in valides))
+    resultat.comptes = await creer_comptes(session, valides, list(hashes))
+    resultat.crees = len(resultat.comptes)
+    return resultat
@@ -1,6 +1,7 @@
 from app.models.menu import Menu, ContenuMenu
 from app.schemas.menu import MenuCreate, MenuRead, MenuUpdate, ContenuMenuCreate
 from sqlmodel import Session, select
+from app.core.cache_http import cache_catalogue
 from typing import List
 
 def create_menu(session: Session, menu_in: MenuCreate) -> Menu:
@@ -8,6 +9,7 @@ def create_menu(session: Session, menu_in: MenuCreate) -> Menu:
     menu = Menu.model_validate(menu_in)
     session.add(menu)
     session.commit()
+    cache_catalogue.invalider("menu")
     session.refresh(menu)
     return menu
 
@@ -32,6 +34,7 @@ def update_menu(session: Session, menu_id: int, menu_in: MenuUpdate) -> MenuRead
     db_menu.sqlmodel_update(menu_data)
     session.add(db_menu)
     session.commit()
+    cache_catalogue.invalider("menu")
     session.refresh(db_menu)
     return db_menu
 
@@ -42,6 +45,7 @@ def delete_menu(session: Session, menu_id: int) -> Menu | None:
         return None
     session.delete(db_menu)
     session.commit()
+    cache_catalogue.invalider("menu")
     return db_menu
 
 def add_plat_to_menu(session: Session, menu_id: int, plat_id: int) -> ContenuMenu:
@@ -49,6 +53,7 @@ def add_plat_to_menu(session: Session, menu_id: int, plat_id: int) -> ContenuMen
     contenu = ContenuMenu(menu_id=menu_id, plat_id=plat_id)
     session.add(contenu)
     session.commit()
+    cache_catalogue.invalider("menu")
     session.refresh(contenu)
     return contenu
 
@@ -59,5 +64,6 @@ def remove_plat_from_menu(session: Session, menu_id: int, plat_id: int) -> bool:
     if contenu:
         session.delete(contenu)
         session.commit()
+        cache_catalogue.invalider("menu")
         return True
     return False
\ No newline at end of file
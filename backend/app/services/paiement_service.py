@@ -3,15 +3,14 @@ from app.models.paiement import Paiement, PaymentStatus, PaymentMethod
 from app.models.commande import Commande, CommandeStatus
 from app.models.ligne_commande import LigneCommande
 from app.schemas.paiement import PaiementCreate
+from app.core.events import bus, evenement_commande
 from fastapi import HTTPException
 
 def get_addition(session: Session, commande_id: int) -> float:
-    """Calculer le montant total de la commande."""
-    statement = select(LigneCommande).where(LigneCommande.commande_id == commande_id)
-    lignes = session.exec(statement).all()
-    if not lignes:
-        return 0.0
-    return sum(l.prix_unitaire * l.quantite for l in lignes)
+    """Montant à payer : le `montant_total` tenu à jour à chaque écriture de ligne
+    (lignes arrondies une à une), lu en une seule requête."""
+    statement = select(Commande.montant_total).where(Commande.id == commande_id)
+    return float(session.exec(statement).first() or 0)
 
 def process_payment(session: Session, paiement_in: PaiementCreate) -> Paiement:
     """Traiter un paiement et mettre à jour le statut de la commande."""
@@ -43,6 +42,8 @@ def process_payment(session: Session, paiement_in: PaiementCreate) -> Paiement:
     
     session.commit()
     session.refresh(paiement)
+    session.refresh(commande)
+    bus.publier(evenement_commande(commande, "payee"))
     return paiement
 
 def get_paiement_by_commande(session: Session, commande_id: int) -> Paiement | None:
@@ -9,10 +9,22 @@ from app.schemas.cuisinier import cuisinierCreate # Note: lowercase in schema
 from app.schemas.personnel_full import (
     PersonnelCreateFull, GerantCreateFull, ServeurCreateFull, CuisinierCreateFull
 )
-from app.services.utilisateur_service import create_utilisateur
+from app.services.utilisateur_service import create_utilisateur, revoquer_jetons
+from app.security.auth import invalider_principal
 from sqlmodel import Session, select
 from typing import List
-from fastapi import BackgroundTasks
+
+def _ajouter_profil(session: Session, profil: Serveur | Cuisinier):
+    """Enregistrer un profil serveur ou cuisinier et révoquer les jetons de son
+    utilisateur, qui ne portent pas encore l'id de ce profil."""
+    session.add(profil)
+    personnel = session.get(Personnel, profil.personnel_id)
+    email = revoquer_jetons(session, personnel.utilisateur_id) if personnel else None
+    session.commit()
+    session.refresh(profil)
+    if email:
+        invalider_principal(email)
+    return profil
 
 def create_personnel(session: Session, personnel_in: PersonnelCreate) -> Personnel:
     """Créer un nouveau personnel de base."""
@@ -24,11 +36,10 @@ def create_personnel(session: Session, personnel_in: PersonnelCreate) -> Personn
 
 def create_personnel_full(
     session: Session, 
-    personnel_in: PersonnelCreateFull,
-    background_tasks: BackgroundTasks
+    personnel_in: PersonnelCreateFull
 ) -> Personnel:
     """Créer un utilisateur et un personnel en une seule fois."""
-    utilisateur = create_utilisateur(session, personnel_in, background_tasks)
+    utilisateur = create_utilisateur(session, personnel_in)
     personnel = Personnel(utilisateur_id=utilisateur.id)
     session.add(personnel)
     session.commit()
@@ -37,11 +48,10 @@ def create_personnel_full(
 
 def create_gerant_full(
     session: Session, 
-    gerant_in: GerantCreateFull,
-    background_tasks: BackgroundTasks
+    gerant_in: GerantCreateFull
 ) -> Gerant:
     """Créer un utilisateur, un personnel et un gérant en une seule fois."""
-    personnel = create_personnel_full(session, gerant_in, background_tasks)
+    personnel = create_personnel_full(session, gerant_in)
     gerant = Gerant(personnel_id=personnel.id)
     session.add(gerant)
     session.commit()
@@ -50,29 +60,19 @@ def create_gerant_full(
 
 def create_serveur_full(
     session: Session, 
-    serveur_in: ServeurCreateFull,
-    background_tasks: BackgroundTasks
+    serveur_in: ServeurCreateFull
 ) -> Serveur:
     """Créer un utilisateur, un personnel et un serveur en une seule fois."""
-    personnel = create_personnel_full(session, serveur_in, background_tasks)
-    serveur = Serveur(personnel_id=personnel.id)
-    session.add(serveur)
-    session.commit()
-    session.refresh(serveur)
-    return serveur
+    personnel = create_personnel_full(session, serveur_in)
+    return _ajouter_profil(session, Serveur(personnel_id=personnel.id))
 
 def create_cuisinier_full(
     session: Session, 
-    cuisinier_in: CuisinierCreateFull,
-    background_tasks: BackgroundTasks
+    cuisinier_in: CuisinierCreateFull
 ) -> Cuisinier:
     """Créer un utilisateur, un personnel et un cuisinier en une seule fois."""
-    personnel = create_personnel_full(session, cuisinier_in, background_tasks)
-    cuisinier = Cuisinier(personnel_id=personnel.id)
-    session.add(cuisinier)
-    session.commit()
-    session.refresh(cuisinier)
-    return cuisinier
+    personnel = create_personnel_full(session, cuisinier_in)
+    return _ajouter_profil(session, Cuisinier(personnel_id=personnel.id))
 
 def create_gerant(session: Session, gerant_in: GerantCreate) -> Gerant:
     """Créer un gérant."""
@@ -84,19 +84,11 @@ def create_gerant(session: Session, gerant_in: GerantCreate) -> Gerant:
 
 def create_serveur(session: Session, serveur_in: ServeurCreate) -> Serveur:
     """Créer un serveur."""
-    serveur = Serveur.model_validate(serveur_in)
-    session.add(serveur)
-    session.commit()
-    session.refresh(serveur)
-    return serveur
+    return _ajouter_profil(session, Serveur.model_validate(serveur_in))
 
 def create_cuisinier(session: Session, cuisinier_in: cuisinierCreate) -> Cuisinier:
     """Créer un cuisinier."""
-    cuisinier = Cuisinier.model_validate(cuisinier_in)
-    session.add(cuisinier)
-    session.commit()
-    session.refresh(cuisinier)
-    return cuisinier
+    return _ajouter_profil(session, Cuisinier.model_validate(cuisinier_in))
 
 def read_personnel(session: Session, personnel_id: int) -> Personnel | None:
     """Récupérer un personnel par son ID."""
@@ -112,8 +104,12 @@ def delete_personnel(session: Session, personnel_id: int) -> Personnel | None:
     db_personnel = session.get(Personnel, personnel_id)
     if not db_personnel:
         return None
+    # Les ids de profil portés par les jetons de cet utilisateur deviennent caducs
+    email = revoquer_jetons(session, db_personnel.utilisateur_id)
     session.delete(db_personnel)
     session.commit()
+    if email:
+        invalider_principal(email)
     return db_personnel
 
 def get_serveur_by_utilisateur_id(session: Session, utilisateur_id: int) -> Serveur | None:
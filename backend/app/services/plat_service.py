@@ -1,12 +1,23 @@
 from app.models.plat import Plat
-from app.schemas.plat import PlatCreate, PlatRead, PlatUpdate
+from app.schemas.plat import PlatCreate, PlatRead, PlatUpdate, TriPlats
 
+from sqlalchemy import func
 from sqlmodel import Session, select
-from typing import List
+from sqlmodel.ext.asyncio.session import AsyncSession
+import logging
+from pathlib import Path
+from typing import Dict, List
 from fastapi import UploadFile
-from app.services.storage_service import save_upload_file, delete_old_image
-
+from fastapi.concurrency import run_in_threadpool
+from app.core.database import engine
+from app.services.image_service import generer_variantes_async
+from app.services.storage_service import (
+    recevoir_upload, installer_upload, verrou_images, delete_old_image, chemin_local, url_voisine
+)
+from app.core.cache_http import cache_catalogue
+from app.services.recherche_service import index_plats
 
+logger = logging.getLogger("app.images")
 
 
 def create_plat(session: Session, plat_in: PlatCreate) -> Plat:
@@ -22,21 +33,46 @@ def create_plat(session: Session, plat_in: PlatCreate) -> Plat:
     )
     session.add(plat)
     session.commit()
+    cache_catalogue.invalider("plat")
     session.refresh(plat)
+    index_plats.indexer_plat(plat)
     return plat
 
 
+# Une requête par lecture, partagée par la variante synchrone et la variante async
+
+def _requete_plat(plat_id: int):
+    return select(Plat).where(Plat.id == plat_id)
+
+
+def _requete_plat_par_nom(nom: str):
+    return select(Plat).where(Plat.nom == nom)
+
+
 def read_plat(session: Session, plat_id: int) -> PlatRead | None:
     """Recuperer un plat par son ID."""
-    plat = session.get(Plat, plat_id)
+    plat = session.exec(_requete_plat(plat_id)).first()
+    if not plat:
+        return None
+    return PlatRead.model_validate(plat)
+
+
+async def read_plat_async(session: AsyncSession, plat_id: int) -> PlatRead | None:
+    plat = (await session.exec(_requete_plat(plat_id))).first()
     if not plat:
         return None
     return PlatRead.model_validate(plat)
 
 
 def get_plat_by_nom(session: Session, nom: str) -> PlatRead | None:
-    statement = select(Plat).where(Plat.nom == nom)
-    plat = session.exec(statement).first()
+    plat = session.exec(_requete_plat_par_nom(nom)).first()
+    if plat:
+        return PlatRead.model_validate(plat)
+    return None
+
+
+async def get_plat_by_nom_async(session: AsyncSession, nom: str) -> PlatRead | None:
+    plat = (await session.exec(_requete_plat_par_nom(nom))).first()
     if plat:
         return PlatRead.model_validate(plat)
     return None
@@ -46,8 +82,12 @@ def delete_plat(session: Session, plat_id: int) -> Plat | None:
     """Supprimer un plat par son ID."""
     plat = session.get(Plat, plat_id)
     if plat:
+        image = (plat.image_url, plat.image_variantes)
         session.delete(plat)
         session.commit()
+        cache_catalogue.invalider("plat")
+        index_plats.retirer_plat(plat_id)
+        liberer_image(session, *image)
         return plat
     return None
 
@@ -63,38 +103,152 @@ def update_plat(
         return None
 
     updates = plat_in.model_dump(exclude_unset=True)
+    ancienne = None
+    if "image_url" in updates and updates["image_url"] != plat.image_url:
+        ancienne = (plat.image_url, plat.image_variantes)
+        updates["image_variantes"] = None
 
     plat.sqlmodel_update(updates)
     
     session.add(plat)
     session.commit()
+    cache_catalogue.invalider("plat")
     session.refresh(plat)
+    index_plats.indexer_plat(plat)
+    if ancienne:
+        liberer_image(session, *ancienne)
     return plat
 
 
 
-def list_plats(session: Session, skip: int = 0, limit: int = 100) -> List[Plat]:
-    statement = select(Plat).offset(skip).limit(limit)
-    return session.exec(statement).all()
+ORDRES_PLATS = {
+    TriPlats.ID: (Plat.id,),
+    TriPlats.NOM: (Plat.nom, Plat.id),
+    TriPlats.PRIX: (Plat.prix, Plat.id),
+    TriPlats.PRIX_DECROISSANT: (Plat.prix.desc(), Plat.id.desc()),
+}
+
+
+def _requete_plats(
+    skip: int = 0,
+    limit: int = 100,
+    categorie_id: int | None = None,
+    disponible: bool | None = None,
+    prix_min: int | None = None,
+    prix_max: int | None = None,
+    tri: TriPlats = TriPlats.ID,
+):
+    """Requête de liste filtrée en SQL ; PlatRead n'expose que `categorie_id`, la catégorie n'est pas chargée."""
+    if prix_min is not None and prix_max is not None and prix_min > prix_max:
+        raise ValueError("prix_min doit être inférieur ou égal à prix_max.")
+    statement = select(Plat)
+    if categorie_id is not None:
+        statement = statement.where(Plat.categorie_id == categorie_id)
+    if disponible is not None:
+        statement = statement.where(Plat.disponible == disponible)
+    if prix_min is not None:
+        statement = statement.where(Plat.prix >= prix_min)
+    if prix_max is not None:
+        statement = statement.where(Plat.prix <= prix_max)
+    return statement.order_by(*ORDRES_PLATS[tri]).offset(skip).limit(limit)
+
+
+def list_plats(session: Session, **filtres) -> List[Plat]:
+    """Lister les plats (filtres de `_requete_plats`)."""
+    return session.exec(_requete_plats(**filtres)).all()
+
+
+async def list_plats_async(session: AsyncSession, **filtres) -> List[Plat]:
+    return (await session.exec(_requete_plats(**filtres))).all()
+
+
+def liberer_image(session: Session, image_url: str | None, variantes: Dict[str, str] | None = None):
+    """
+    Supprimer une image (et ses variantes) du disque si plus aucun plat ne la
+    référence. Les fichiers étant nommés par leur contenu, une même image peut
+    être partagée par plusieurs plats : le compte des références vient de la base.
+    Compte et suppression se font sous `verrou_images`, comme la mise en place
+    d'un upload et le commit de sa référence (`_remplacer_image`).
+    """
+    if not image_url:
+        return
+    with verrou_images:
+        references = session.exec(
+            select(func.count()).select_from(Plat).where(Plat.image_url == image_url)
+        ).one()
+        if references == 0:
+            delete_old_image(image_url, variantes)
+
+
+def _remplacer_image(session: Session, plat_id: int, partiel: Path, image_url: str) -> Plat | None:
+    with verrou_images:
+        plat = session.get(Plat, plat_id)
+        if not plat:
+            # Fichier jamais mis en place : rien à libérer
+            return None
+        installer_upload(partiel, image_url)
+        if plat.image_url == image_url:
+            # Même contenu renvoyé : même fichier, variantes toujours valables
+            return plat
+        ancienne = (plat.image_url, plat.image_variantes)
+
+        # Les variantes de la nouvelle image sont générées après la réponse
+        # (ou reprises d'un plat qui partage déjà ce fichier)
+        plat.image_url = image_url
+        plat.image_variantes = session.exec(
+            select(Plat.image_variantes).where(
+                Plat.image_url == image_url, Plat.image_variantes.is_not(None)
+            ).limit(1)
+        ).first()
+        session.add(plat)
+        session.commit()
+    cache_catalogue.invalider("plat")
+    session.refresh(plat)
+    index_plats.indexer_plat(plat)
+
+    # L'ancienne image n'est supprimée qu'une fois la nouvelle enregistrée
+    liberer_image(session, *ancienne)
+    return plat
 
 
-def update_plat_image(session: Session, plat_id: int, file: UploadFile) -> Plat | None:
-    """Mettre à jour l'image d'un plat."""
-    plat = session.get(Plat, plat_id)
-    if not plat:
+async def update_plat_image(session: Session, plat_id: int, file: UploadFile) -> Plat | None:
+    """Mettre à jour l'image d'un plat (écriture par blocs, taille bornée)."""
+    if not await run_in_threadpool(session.get, Plat, plat_id):
         return None
-    
-    # 1. Supprimer l'ancienne image si elle existe
-    if plat.image_url:
-        delete_old_image(plat.image_url)
-    
-    # 2. Sauvegarder la nouvelle image
-    image_url = save_upload_file(file, folder="plats")
-    
-    # 3. Mettre à jour la base de données
-    plat.image_url = image_url
-    session.add(plat)
-    session.commit()
-    session.refresh(plat)
-    
-    return plat
\ No newline at end of file
+    partiel, image_url = await recevoir_upload(file, folder="plats")
+    try:
+        return await run_in_threadpool(_remplacer_image, session, plat_id, partiel, image_url)
+    finally:
+        partiel.unlink(missing_ok=True)
+
+
+def _enregistrer_variantes(image_url: str, variantes: Dict[str, str]):
+    with verrou_images, Session(engine) as session:
+        # Tous les plats qui partagent ce fichier reçoivent les variantes
+        plats = session.exec(select(Plat).where(Plat.image_url == image_url)).all()
+        if not plats:
+            # Image remplacée (ou plats supprimés) pendant la génération
+            delete_old_image(image_url, variantes)
+            return
+        for plat in plats:
+            plat.image_variantes = variantes
+            session.add(plat)
+        session.commit()
+        cache_catalogue.invalider("plat")
+        for plat in plats:
+            session.refresh(plat)
+            index_plats.indexer_plat(plat)
+
+
+async def generer_variantes_plat(image_url: str, remplacer: bool = False):
+    """Générer miniature, taille moyenne et WebP dans le pool de processus, puis les enregistrer."""
+    chemin = chemin_local(image_url)
+    if chemin is None:
+        return
+    try:
+        fichiers = await generer_variantes_async(str(chemin), remplacer)
+    except Exception:
+        logger.exception(f"Variantes de {image_url} non générées")
+        return
+    variantes = {nom: url_voisine(image_url, fichier) for nom, fichier in fichiers.items()}
+    await run_in_threadpool(_enregistrer_variantes, image_url, variantes)
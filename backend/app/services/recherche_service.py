@@ -0,0 +1,298 @@
+"""
+Recherche de plats par index inversé en mémoire.
+
+Le nom, la description et la catégorie de chaque plat sont découpés en mots
+normalisés (minuscules, sans accents). Une requête trouve les mots exacts,
+ceux qui commencent par le terme saisi et ceux à une faute de frappe près
+(voisinage par suppression d'une lettre, sans calcul de distance à la
+requête). Tous les termes doivent correspondre ; le score favorise le nom,
+puis la catégorie, puis la description.
+
+L'index est chargé à la première recherche puis tenu à jour par les services
+des plats et des catégories. Il est rechargé après RECHERCHE_INDEX_TTL_SECONDES
+pour prendre en compte les écritures d'un autre processus.
+"""
+import bisect
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Set
+
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.categorie import Categorie
+from app.models.plat import Plat
+from app.schemas.plat import PlatRead
+
+POIDS_NOM = 3.0
+POIDS_CATEGORIE = 2.0
+POIDS_DESCRIPTION = 1.0
+SCORE_EXACT = 1.0
+SCORE_PREFIXE = 0.8
+SCORE_APPROCHE = 0.5
+PREFIXES_MAX = 50  # mots du vocabulaire retenus par préfixe
+LONGUEUR_APPROCHE_MIN = 4  # en dessous, une faute change trop le mot
+
+MOTS_VIDES = {"de", "du", "des", "la", "le", "les", "au", "aux", "et", "en", "a", "l", "d", "un", "une", "sur"}
+_SEPARATEURS = re.compile(r"[^a-z0-9]+")
+
+
+def normaliser(texte: str | None) -> List[str]:
+    """Mots en minuscules, sans accents ni mots vides : « Attiéké au Poulet » → ['attieke', 'poulet']."""
+    if not texte:
+        return []
+    decompose = unicodedata.normalize("NFKD", texte.lower())
+    sans_accents = "".join(c for c in decompose if not unicodedata.combining(c))
+    return [mot for mot in _SEPARATEURS.split(sans_accents) if mot and mot not in MOTS_VIDES]
+
+
+def _suppressions(mot: str) -> Set[str]:
+    return {mot[:i] + mot[i + 1:] for i in range(len(mot))}
+
+
+class IndexPlats:
+    """Index inversé mot → plats, avec vocabulaire trié (préfixes) et voisinage
+    par suppression (fautes de frappe). Toutes les opérations sont protégées par un verrou."""
+
+    def __init__(self, ttl: float, horloge: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._horloge = horloge
+        self._lock = threading.RLock()
+        self._charge_le: float | None = None
+        self._vider()
+
+    def _vider(self):
+        self._plats: Dict[int, PlatRead] = {}
+        self._cles_tri: Dict[int, tuple] = {}
+        self._disponibles: Set[int] = set()
+        # mot → {plat_id: poids du meilleur champ}
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._mots_par_plat: Dict[int, Set[str]] = {}
+        # mot → catégories ; catégorie → plats
+        self._postings_categories: Dict[str, Set[int]] = defaultdict(set)
+        self._mots_par_categorie: Dict[int, Set[str]] = {}
+        self._plats_par_categorie: Dict[int, Set[int]] = defaultdict(set)
+        # Vocabulaire commun : comptage des usages, liste triée, voisinage
+        self._usages: Dict[str, int] = defaultdict(int)
+        self._vocabulaire: List[str] = []
+        self._voisins: Dict[str, Set[str]] = defaultdict(set)
+
+    # --- Vocabulaire ---
+
+    def _ajouter_mots(self, mots: Iterable[str]):
+        for mot in mots:
+            self._usages[mot] += 1
+            if self._usages[mot] == 1:
+                bisect.insort(self._vocabulaire, mot)
+                for variante in _suppressions(mot):
+                    self._voisins[variante].add(mot)
+
+    def _retirer_mots(self, mots: Iterable[str]):
+        for mot in mots:
+            self._usages[mot] -= 1
+            if self._usages[mot] > 0:
+                continue
+            del self._usages[mot]
+            position = bisect.bisect_left(self._vocabulaire, mot)
+            del self._vocabulaire[position]
+            for variante in _suppressions(mot):
+                self._voisins[variante].discard(mot)
+                if not self._voisins[variante]:
+                    del self._voisins[variante]
+
+    # --- Mise à jour ---
+
+    @property
+    def charge(self) -> bool:
+        return self._charge_le is not None
+
+    def charger(self, session: Session):
+        """(Re)construire l'index à partir de la base."""
+        # Lecture sous verrou : une écriture concurrente est appliquée après le chargement
+        with self._lock:
+            self.remplir(session.exec(select(Categorie)).all(), session.exec(select(Plat)).all())
+
+    def remplir(self, categories: Iterable[Categorie], plats: Iterable[Plat]):
+        """Remplacer tout le contenu de l'index."""
+        with self._lock:
+            self._vider()
+            for categorie in categories:
+                self._indexer_categorie(categorie.id, categorie.nom)
+            for plat in plats:
+                self._indexer_plat(PlatRead.model_validate(plat))
+            self._charge_le = self._horloge()
+
+    def assurer_charge(self, session: Session):
+        with self._lock:
+            if self.charge and self._horloge() - self._charge_le < self.ttl:
+                return
+            self.charger(session)
+
+    def invalider(self):
+        """Forcer un rechargement complet à la prochaine recherche."""
+        with self._lock:
+            self._charge_le = None
+
+    def _indexer_plat(self, plat: PlatRead):
+        self._retirer_plat(plat.id)
+        poids: Dict[str, float] = {}
+        for mot in normaliser(plat.description):
+            poids[mot] = POIDS_DESCRIPTION
+        for mot in normaliser(plat.nom):
+            poids[mot] = POIDS_NOM
+        for mot, valeur in poids.items():
+            self._postings[mot][plat.id] = valeur
+        self._ajouter_mots(poids)
+        self._mots_par_plat[plat.id] = set(poids)
+        self._plats[plat.id] = plat
+        self._cles_tri[plat.id] = (plat.nom.lower(), plat.id)
+        if plat.disponible:
+            self._disponibles.add(plat.id)
+        if plat.categorie_id is not None:
+            self._plats_par_categorie[plat.categorie_id].add(plat.id)
+
+    def _retirer_plat(self, plat_id: int):
+        plat = self._plats.pop(plat_id, None)
+        if plat is None:
+            return
+        mots = self._mots_par_plat.pop(plat_id)
+        del self._cles_tri[plat_id]
+        self._disponibles.discard(plat_id)
+        for mot in mots:
+            del self._postings[mot][plat_id]
+            if not self._postings[mot]:
+                del self._postings[mot]
+        self._retirer_mots(mots)
+        if plat.categorie_id is not None:
+            self._plats_par_categorie[plat.categorie_id].discard(plat_id)
+
+    def _indexer_categorie(self, categorie_id: int, nom: str):
+        self._retirer_categorie(categorie_id)
+        mots = set(normaliser(nom))
+        for mot in mots:
+            self._postings_categories[mot].add(categorie_id)
+        self._ajouter_mots(mots)
+        self._mots_par_categorie[categorie_id] = mots
+
+    def _retirer_categorie(self, categorie_id: int):
+        mots = self._mots_par_categorie.pop(categorie_id, None)
+        if mots is None:
+            return
+        for mot in mots:
+            self._postings_categories[mot].discard(categorie_id)
+            if not self._postings_categories[mot]:
+                del self._postings_categories[mot]
+        self._retirer_mots(mots)
+
+    # Points d'entrée des services (sans effet tant que l'index n'est pas chargé)
+
+    def indexer_plat(self, plat: Plat):
+        with self._lock:
+            if self.charge:
+                self._indexer_plat(PlatRead.model_validate(plat))
+
+    def retirer_plat(self, plat_id: int):
+        with self._lock:
+            if self.charge:
+                self._retirer_plat(plat_id)
+
+    def indexer_categorie(self, categorie: Categorie):
+        with self._lock:
+            if self.charge:
+                self._indexer_categorie(categorie.id, categorie.nom)
+
+    def retirer_categorie(self, categorie_id: int):
+        with self._lock:
+            if not self.charge:
+                return
+            self._retirer_categorie(categorie_id)
+            # La suppression détache les plats de la catégorie (categorie_id à NULL)
+            for plat_id in self._plats_par_categorie.pop(categorie_id, set()):
+                self._plats[plat_id] = self._plats[plat_id].model_copy(update={"categorie_id": None})
+
+    # --- Recherche ---
+
+    def _mots_proches(self, terme: str) -> Dict[str, float]:
+        """Mots du vocabulaire correspondant au terme, avec leur score de correspondance."""
+        trouves: Dict[str, float] = {}
+        if len(terme) >= LONGUEUR_APPROCHE_MIN:
+            # Une lettre en trop, en moins ou différente
+            candidats = set(self._voisins.get(terme, ()))
+            for variante in _suppressions(terme):
+                if variante in self._usages:
+                    candidats.add(variante)
+                candidats |= self._voisins.get(variante, set())
+            for mot in candidats:
+                trouves[mot] = SCORE_APPROCHE
+        position = bisect.bisect_left(self._vocabulaire, terme)
+        for mot in self._vocabulaire[position:position + PREFIXES_MAX]:
+            if not mot.startswith(terme):
+                break
+            trouves[mot] = SCORE_PREFIXE
+        if terme in self._usages:
+            trouves[terme] = SCORE_EXACT
+        return trouves
+
+    def _scores_terme(self, terme: str) -> Dict[int, float]:
+        """Meilleur score de chaque plat pour un terme (champ du plat ou nom de sa catégorie)."""
+        scores: Dict[int, float] = {}
+        scores_categories: Dict[int, float] = {}
+        for mot, correspondance in self._mots_proches(terme).items():
+            for plat_id, poids in self._postings.get(mot, {}).items():
+                score = correspondance * poids
+                if score > scores.get(plat_id, 0.0):
+                    scores[plat_id] = score
+            score = correspondance * POIDS_CATEGORIE
+            for categorie_id in self._postings_categories.get(mot, ()):
+                if score > scores_categories.get(categorie_id, 0.0):
+                    scores_categories[categorie_id] = score
+        for categorie_id, score in scores_categories.items():
+            for plat_id in self._plats_par_categorie.get(categorie_id, ()):
+                if score > scores.get(plat_id, 0.0):
+                    scores[plat_id] = score
+        return scores
+
+    def rechercher(self, requete: str, limite: int = 20, disponible: bool | None = None) -> List[PlatRead]:
+        termes = normaliser(requete)
+        if not termes:
+            return []
+        with self._lock:
+            scores: Dict[int, float] | None = None
+            for terme in dict.fromkeys(termes):
+                scores_terme = self._scores_terme(terme)
+                # Tous les termes doivent correspondre
+                if scores is None:
+                    scores = scores_terme
+                else:
+                    scores = {plat_id: s + scores_terme[plat_id] for plat_id, s in scores.items() if plat_id in scores_terme}
+                if not scores:
+                    return []
+            candidats = scores.items() if disponible is None else (
+                (plat_id, score) for plat_id, score in scores.items()
+                if (plat_id in self._disponibles) == disponible
+            )
+            # Les `limite` meilleurs sans trier tous les résultats (requêtes larges)
+            meilleurs = heapq.nsmallest(limite, candidats, key=lambda ps: (-ps[1], self._cles_tri[ps[0]]))
+            return [self._plats[plat_id] for plat_id, _ in meilleurs]
+
+    def statistiques(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "plats": len(self._plats),
+                "categories": len(self._mots_par_categorie),
+                "mots": len(self._vocabulaire),
+                "variantes": len(self._voisins),
+            }
+
+
+index_plats = IndexPlats(ttl=settings.RECHERCHE_INDEX_TTL_SECONDES)
+
+
+def rechercher_plats(session: Session, requete: str, limite: int = 20, disponible: bool | None = None) -> List[PlatRead]:
+    """Rechercher dans l'index (chargé ou rechargé depuis `session` si nécessaire)."""
+    index_plats.assurer_charge(session)
+    return index_plats.rechercher(requete, limite, disponible)
@@ -1,13 +1,15 @@
 from datetime import datetime, timedelta
 from typing import List
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.database import utc
 from app.models.reservation import Reservation, ReservationStatus
 from app.schemas.reservation import ReservationCreate, ReservationRead, ReservationUpdate
 
-def is_table_available(session: Session, table_id: int, start_time: datetime, exclude_id: int | None = None) -> bool:
-    """Vérifie si une table est disponible (fenêtre de 2h)."""
+def _requete_chevauchement(table_id: int, start_time: datetime, exclude_id: int | None = None):
     # Fenêtre de 2 heures
     buffer = timedelta(hours=2)
+    start_time = utc(start_time)
     start_window = start_time - buffer
     end_window = start_time + buffer
     
@@ -19,8 +21,15 @@ def is_table_available(session: Session, table_id: int, start_time: datetime, ex
     )
     if exclude_id:
         statement = statement.where(Reservation.id != exclude_id)
-        
-    overlap = session.exec(statement).first()
+    return statement
+
+def is_table_available(session: Session, table_id: int, start_time: datetime, exclude_id: int | None = None) -> bool:
+    """Vérifie si une table est disponible (fenêtre de 2h)."""
+    overlap = session.exec(_requete_chevauchement(table_id, start_time, exclude_id)).first()
+    return overlap is None
+
+async def is_table_available_async(session: AsyncSession, table_id: int, start_time: datetime, exclude_id: int | None = None) -> bool:
+    overlap = (await session.exec(_requete_chevauchement(table_id, start_time, exclude_id))).first()
     return overlap is None
 
 def create_reservation(session: Session, reservation_in: ReservationCreate) -> Reservation:
@@ -29,6 +38,7 @@ def create_reservation(session: Session, reservation_in: ReservationCreate) -> R
         raise ValueError("La table est déjà réservée pour ce créneau (fenêtre de 2h).")
 
     reservation = Reservation.model_validate(reservation_in)
+    reservation.date_reservation = utc(reservation.date_reservation)
     session.add(reservation)
     session.commit()
     session.refresh(reservation)
@@ -56,22 +66,41 @@ def annuler_reservation(session: Session, reservation_id: int) -> Reservation |
     session.refresh(reservation)
     return reservation
 
+def _requete_reservation(reservation_id: int):
+    return select(Reservation).where(Reservation.id == reservation_id)
+
+def _requete_reservations(skip: int = 0, limit: int = 100, client_id: int | None = None):
+    statement = select(Reservation)
+    if client_id is not None:
+        statement = statement.where(Reservation.client_id == client_id)
+    return statement.offset(skip).limit(limit)
+
 def read_reservation(session: Session, reservation_id: int) -> ReservationRead | None:
     """Récupérer une réservation par son ID."""
-    reservation = session.get(Reservation, reservation_id)
+    reservation = session.exec(_requete_reservation(reservation_id)).first()
+    if not reservation:
+        return None
+    return ReservationRead.model_validate(reservation)
+
+async def read_reservation_async(session: AsyncSession, reservation_id: int) -> ReservationRead | None:
+    reservation = (await session.exec(_requete_reservation(reservation_id))).first()
     if not reservation:
         return None
     return ReservationRead.model_validate(reservation)
 
 def list_reservations(session: Session, skip: int = 0, limit: int = 100) -> List[Reservation]:
     """Lister toutes les réservations."""
-    statement = select(Reservation).offset(skip).limit(limit)
-    return session.exec(statement).all()
+    return session.exec(_requete_reservations(skip, limit)).all()
+
+async def list_reservations_async(session: AsyncSession, skip: int = 0, limit: int = 100) -> List[Reservation]:
+    return (await session.exec(_requete_reservations(skip, limit))).all()
 
 def list_reservations_by_client(session: Session, client_id: int, skip: int = 0, limit: int = 100) -> List[Reservation]:
     """Lister les réservations d'un client spécifique."""
-    statement = select(Reservation).where(Reservation.client_id == client_id).offset(skip).limit(limit)
-    return session.exec(statement).all()
+    return session.exec(_requete_reservations(skip, limit, client_id=client_id)).all()
+
+async def list_reservations_by_client_async(session: AsyncSession, client_id: int, skip: int = 0, limit: int = 100) -> List[Reservation]:
+    return (await session.exec(_requete_reservations(skip, limit, client_id=client_id))).all()
 
 def update_reservation(session: Session, reservation_id: int, reservation_in: ReservationUpdate) -> ReservationRead | None:
     """Mettre à jour une réservation."""
@@ -79,6 +108,8 @@ def update_reservation(session: Session, reservation_id: int, reservation_in: Re
     if not db_reservation:
         return None
     reservation_data = reservation_in.model_dump(exclude_unset=True)
+    if reservation_data.get("date_reservation"):
+        reservation_data["date_reservation"] = utc(reservation_data["date_reservation"])
     db_reservation.sqlmodel_update(reservation_data)
     session.add(db_reservation)
     session.commit()
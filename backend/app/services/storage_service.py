@@ -1,45 +1,131 @@
+import hashlib
 import os
 import secrets
+import threading
 from fastapi import UploadFile
 from pathlib import Path
+from typing import Dict, Tuple
+
+import anyio
+
+from app.core.config import settings
+from app.core.statique import NOM_ADRESSE
 
 # Utiliser le chemin absolu basé sur l'emplacement de ce fichier
 BASE_DIR = Path(__file__).resolve().parent.parent
 UPLOAD_DIR = BASE_DIR / "static" / "uploads"
 
-def save_upload_file(upload_file: UploadFile, folder: str = "plats") -> str:
+TAILLE_BLOC = 64 * 1024
+
+# Un fichier n'est mis en place et référencé, ou compté et supprimé, que sous ce
+# verrou : un upload du même contenu ne peut pas s'intercaler entre le compte
+# des références et la suppression (plat_service.liberer_image)
+verrou_images = threading.RLock()
+
+# Signatures des formats acceptés → extension enregistrée
+SIGNATURES = {
+    b"\xff\xd8\xff": ".jpg",
+    b"\x89PNG\r\n\x1a\n": ".png",
+    b"GIF87a": ".gif",
+    b"GIF89a": ".gif",
+}
+
+
+class ImageTropVolumineuse(ValueError):
+    pass
+
+
+def _extension_image(debut: bytes) -> str:
+    """Extension d'après le contenu (et non le nom de fichier envoyé par le client)."""
+    if debut[:4] == b"RIFF" and debut[8:12] == b"WEBP":
+        return ".webp"
+    for signature, extension in SIGNATURES.items():
+        if debut.startswith(signature):
+            return extension
+    raise ValueError("Format d'image non pris en charge (JPEG, PNG, WebP ou GIF).")
+
+
+async def recevoir_upload(upload_file: UploadFile, folder: str = "plats") -> Tuple[Path, str]:
     """
-    Sauvegarde un fichier uploadé et retourne son URL relative.
+    Reçoit un fichier uploadé par blocs dans un fichier partiel et retourne ce
+    fichier avec l'URL relative qu'il prendra (`installer_upload`).
+
+    Le fichier est nommé d'après l'empreinte SHA-256 de son contenu : une même
+    image envoyée deux fois n'est stockée qu'une fois, et une URL ne désigne
+    jamais qu'un seul contenu. Il n'est jamais chargé entier en mémoire ; au-delà
+    de IMAGE_TAILLE_MAX_OCTETS l'écriture s'arrête et ImageTropVolumineuse est levée.
+    L'appelant supprime le fichier partiel s'il ne l'installe pas.
     """
+    taille_max = settings.IMAGE_TAILLE_MAX_OCTETS
+    if upload_file.size is not None and upload_file.size > taille_max:
+        raise ImageTropVolumineuse(f"Image trop volumineuse (maximum {taille_max // 1024} Kio).")
+
+    premier_bloc = await upload_file.read(TAILLE_BLOC)
+    extension = _extension_image(premier_bloc)
+
     # Créer le dossier s'il n'existe pas
     dest_dir = UPLOAD_DIR / folder
     dest_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Générer un nom unique pour éviter les collisions
-    extension = Path(upload_file.filename).suffix
-    unique_filename = f"{secrets.token_hex(8)}{extension}"
-    
-    file_path = dest_dir / unique_filename
-    
-    # Écrire le fichier sur le disque
-    with open(file_path, "wb") as buffer:
-        buffer.write(upload_file.file.read())
-        
-    # Retourner l'URL relative
-    return f"/static/uploads/{folder}/{unique_filename}"
-
-def delete_old_image(image_url: str):
+
+    # Fichier partiel jamais servi, au nom aléatoire tant que l'empreinte n'est pas connue
+    partiel = dest_dir / f"{secrets.token_hex(8)}.part"
+    empreinte = hashlib.sha256()
+    taille = 0
+    try:
+        async with await anyio.open_file(partiel, "wb") as buffer:
+            bloc = premier_bloc
+            while bloc:
+                taille += len(bloc)
+                if taille > taille_max:
+                    raise ImageTropVolumineuse(f"Image trop volumineuse (maximum {taille_max // 1024} Kio).")
+                empreinte.update(bloc)
+                await buffer.write(bloc)
+                bloc = await upload_file.read(TAILLE_BLOC)
+    except BaseException:
+        partiel.unlink(missing_ok=True)
+        raise
+
+    unique_filename = f"{empreinte.hexdigest()[:32]}{extension}"
+    return partiel, f"/static/uploads/{folder}/{unique_filename}"
+
+
+def installer_upload(partiel: Path, image_url: str):
     """
-    Supprime une ancienne image du disque si elle existe.
+    Met en place un fichier reçu par `recevoir_upload`, sous `verrou_images`
+    jusqu'au commit de la référence. Contenu déjà présent : le remplacer par
+    une copie identique le garde en place.
     """
-    if not image_url or not image_url.startswith("/static/"):
-        return
-        
-    # Convertir l'URL relative en chemin local
+    os.replace(partiel, chemin_local(image_url))
+
+
+def chemin_local(image_url: str) -> Path | None:
+    """Chemin sur le disque d'une URL /static/uploads/…, None si elle pointe ailleurs."""
+    if not image_url or not image_url.startswith("/static/uploads/"):
+        return None
     # /static/uploads/plats/abc.jpg -> static/uploads/plats/abc.jpg
-    relative_path = image_url.lstrip("/")
-    # Utiliser BASE_DIR pour obtenir le chemin complet
-    full_path = BASE_DIR / relative_path
-    
-    if full_path.exists():
-        os.remove(full_path)
+    chemin = (BASE_DIR / image_url.lstrip("/")).resolve()
+    if not chemin.is_relative_to(UPLOAD_DIR.resolve()):
+        return None
+    return chemin
+
+
+def est_adressee(image_url: str) -> bool:
+    """URL d'un fichier nommé par son contenu (donc jamais modifié)."""
+    return bool(NOM_ADRESSE.match(image_url.rsplit("/", 1)[-1]))
+
+
+def url_voisine(image_url: str, nom_fichier: str) -> str:
+    """URL d'un fichier du même dossier que `image_url` (variantes)."""
+    return image_url.rsplit("/", 1)[0] + "/" + nom_fichier
+
+
+def delete_old_image(image_url: str | None, variantes: Dict[str, str] | None = None):
+    """
+    Supprime une ancienne image (et ses variantes) du disque si elle existe.
+    Un fichier pouvant être partagé, vérifier d'abord qu'il n'est plus référencé
+    (plat_service.liberer_image).
+    """
+    for url in [image_url, *(variantes or {}).values()]:
+        full_path = chemin_local(url)
+        if full_path is not None and full_path.exists():
+            os.remove(full_path)
@@ -2,6 +2,7 @@ from app.models.table import RestaurantTable, TableStatus
 from app.schemas.table import TableCreate, TableRead, TableUpdate
 
 from sqlmodel import Session, select
+from app.core.cache_http import cache_catalogue
 from typing import List
 
 def create_table(session: Session, table_in: TableCreate) -> RestaurantTable:
@@ -14,6 +15,7 @@ def create_table(session: Session, table_in: TableCreate) -> RestaurantTable:
     )
     session.add(table)
     session.commit()
+    cache_catalogue.invalider("table")
     session.refresh(table)
     return table
 
@@ -41,6 +43,7 @@ def delete_table(session: Session, table_id: int) -> RestaurantTable | None:
     if table:
         session.delete(table)
         session.commit()
+        cache_catalogue.invalider("table")
         return table 
     return None
 
@@ -60,6 +63,7 @@ def update_table(
     
     session.add(table)
     session.commit()
+    cache_catalogue.invalider("table")
     session.refresh(table)
     return table
 
@@ -77,6 +81,7 @@ def occuper_table(session: Session, table_id: int) -> RestaurantTable | None:
     table.statut = TableStatus.OCCUPEE
     session.add(table)
     session.commit()
+    cache_catalogue.invalider("table")
     session.refresh(table)
     return table
 
@@ -88,5 +93,6 @@ def liberer_table(session: Session, table_id: int) -> RestaurantTable | None:
     table.statut = TableStatus.LIBRE
     session.add(table)
     session.commit()
+    cache_catalogue.invalider("table")
     session.refresh(table)
     return table
\ No newline at end of file
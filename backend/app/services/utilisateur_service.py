@@ -7,18 +7,26 @@ from app.schemas.utilisateur import (
 )
 
 from app.security.hashing import hash_password
+from app.security.auth import invalider_principal
 import secrets
-from fastapi import BackgroundTasks
-from app.services.email_service import send_verification_email
+from app.services.email_service import mettre_en_file_verification
 from datetime import datetime, timedelta, timezone
 
 
 
 
+def preparer_verification(utilisateur: Utilisateur) -> str:
+    """Attribuer un jeton de vérification (valable 24h) et le renvoyer."""
+    token = secrets.token_urlsafe(32)
+    utilisateur.is_verified = True
+    utilisateur.verification_token = token
+    utilisateur.verification_token_expires = datetime.now(timezone.utc) + timedelta(hours=24)
+    return token
+
+
 def create_utilisateur(
     session: Session, 
-    utilisateur_in: UtilisateurCreate,
-    background_tasks: BackgroundTasks
+    utilisateur_in: UtilisateurCreate
 ) -> Utilisateur:
     """Creer un nouvel utilisateur dans la base de donnees.
     Si l'utilisateur existe déjà mais n'est pas vérifié, on met à jour ses informations.
@@ -71,26 +79,35 @@ def create_utilisateur(
             hashed_password=hash_password(utilisateur_in.password)
         )
 
-    token = secrets.token_urlsafe(32)
-    token_expires = datetime.now(timezone.utc) + timedelta(hours=24)
-    
-    utilisateur.is_verified = True
-    utilisateur.verification_token = token
-    utilisateur.verification_token_expires = token_expires
+    token = preparer_verification(utilisateur)
     
     # ajouter l'utilisateur a la session (ou le mettre à jour)
     session.add(utilisateur)
+    # L'email de vérification est écrit dans la même transaction : il ne peut
+    # pas être perdu, ni partir pour un compte qui n'a pas été créé
+    mettre_en_file_verification(session, clean_email, token)
     session.commit()
     session.refresh(utilisateur)
 
     print(f"✅ CREATE_USER [SUCCESS]: ID={utilisateur.id}, Email={utilisateur.email}, PasswordHashPrefix={utilisateur.hashed_password[:10]}")
 
-    # Envoyer l'email (asynchrone via BackgroundTasks)
-    background_tasks.add_task(send_verification_email, utilisateur.email, token)
-
     return utilisateur
 
 
+def revoquer_jetons(session: Session, utilisateur_id: int) -> str | None:
+    """Rendre caducs les jetons déjà émis (token_version + 1), sans commit.
+
+    Les jetons portent les ids de profil (client, serveur, cuisinier) : à
+    appeler dans la transaction qui crée ou supprime un profil, puis passer
+    l'email renvoyé à `invalider_principal` après le commit.
+    """
+    utilisateur = session.get(Utilisateur, utilisateur_id)
+    if not utilisateur:
+        return None
+    utilisateur.token_version += 1
+    session.add(utilisateur)
+    return utilisateur.email
+
 def read_utilisateur(session: Session, utilisateur_id: int) -> UtilisateurRead | None:
     """Recuperer un utilisateur par son ID."""
     utilisateur = session.get(Utilisateur, utilisateur_id)
@@ -111,8 +128,10 @@ def delete_utilisateur(session: Session, utilisateur_id: int) -> Utilisateur | N
     """Supprimer un utilisateur par son ID."""
     utilisateur = session.get(Utilisateur, utilisateur_id)
     if utilisateur:
+        email = utilisateur.email
         session.delete(utilisateur)
         session.commit()
+        invalider_principal(email)
         return utilisateur
     return None
 
@@ -128,6 +147,7 @@ def update_utilisateur(
         return None
 
     updates = utilisateur_in.model_dump(exclude_unset=True)
+    ancien_email = utilisateur.email
 
     if "password" in updates:
         updates["hashed_password"] = hash_password(
@@ -135,9 +155,13 @@ def update_utilisateur(
         )
 
     utilisateur.sqlmodel_update(updates)
-    
+    # Les claims du jeton (email, rôle) ou le mot de passe changent : on révoque
+    if updates.keys() & {"email", "role", "hashed_password", "active"}:
+        utilisateur.token_version += 1
+
     session.add(utilisateur)
     session.commit()
+    invalider_principal(ancien_email)
     session.refresh(utilisateur)
     return utilisateur
 
@@ -168,6 +192,8 @@ def verify_email_token(session: Session, token: str) -> bool:
     utilisateur.is_verified = True
     utilisateur.verification_token = None
     utilisateur.verification_token_expires = None
+    email = utilisateur.email
     session.add(utilisateur)
     session.commit()
+    invalider_principal(email)
     return True
\ No newline at end of file
@@ -2,12 +2,10 @@ from sqlmodel import Session
 from app.core.database import engine
 from app.services.personnel_service import create_gerant_full, create_serveur_full, create_cuisinier_full
 from app.schemas.personnel_full import GerantCreateFull, ServeurCreateFull, CuisinierCreateFull
-from fastapi import BackgroundTasks
 
 def create_test_users():
     with Session(engine) as session:
         print("Creating test users...")
-        bg = BackgroundTasks()
 
         # Create Gerant
         try:
@@ -19,7 +17,7 @@ def create_test_users():
                 password="gerant",  # Will use same password as email prefix for simplicity
                 role="GERANT"
             )
-            create_gerant_full(session, gerant_in, bg)
+            create_gerant_full(session, gerant_in)
             print("Created Gerant: gerant@test.com / gerant")
         except Exception as e:
             print(f"Gerant creation skipped (might exist): {e}")
@@ -34,7 +32,7 @@ def create_test_users():
                 password="serveur",
                 role="SERVEUR"
             )
-            create_serveur_full(session, serveur_in, bg)
+            create_serveur_full(session, serveur_in)
             print("Created Serveur: serveur@test.com / serveur")
         except Exception as e:
             print(f"Serveur creation skipped (might exist): {e}")
@@ -49,7 +47,7 @@ def create_test_users():
                 password="cuisinier",
                 role="CUISINIER"
             )
-            create_cuisinier_full(session, cuisinier_in, bg)
+            create_cuisinier_full(session, cuisinier_in)
             print("Created Cuisinier: cuisinier@test.com / cuisinier")
         except Exception as e:
             print(f"Cuisinier creation skipped (might exist): {e}")
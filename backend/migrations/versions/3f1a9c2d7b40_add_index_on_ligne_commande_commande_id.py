@@ -0,0 +1,32 @@
+"""add index on ligne_commande.commande_id
+
+Revision ID: 3f1a9c2d7b40
+Revises: 98e731c0baa5
+Create Date: 2026-10-17 09:12:04.318552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a9c2d7b40'
+down_revision: Union[str, Sequence[str], None] = '98e731c0baa5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    indexes = [i['name'] for i in inspector.get_indexes('lignecommande')]
+    if 'ix_lignecommande_commande_id' not in indexes:
+        op.create_index(op.f('ix_lignecommande_commande_id'), 'lignecommande', ['commande_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_lignecommande_commande_id'), table_name='lignecommande')
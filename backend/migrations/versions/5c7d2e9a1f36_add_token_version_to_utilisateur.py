@@ -0,0 +1,32 @@
+"""add token_version to utilisateur
+
+Revision ID: 5c7d2e9a1f36
+Revises: 8b5e0d4f2a91
+Create Date: 2026-10-17 14:12:05.318744
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c7d2e9a1f36'
+down_revision: Union[str, Sequence[str], None] = '8b5e0d4f2a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = [c['name'] for c in inspector.get_columns('utilisateur')]
+    if 'token_version' not in columns:
+        op.add_column('utilisateur', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('utilisateur', 'token_version')
@@ -0,0 +1,43 @@
+"""add composite indexes on commande for filtered keyset listing
+
+Revision ID: 8b5e0d4f2a91
+Revises: 3f1a9c2d7b40
+Create Date: 2026-10-17 10:41:27.905113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b5e0d4f2a91'
+down_revision: Union[str, Sequence[str], None] = '3f1a9c2d7b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = {
+    'ix_commande_date_id': ['date_commande', 'id'],
+    'ix_commande_status_date_id': ['status', 'date_commande', 'id'],
+    'ix_commande_table_date_id': ['table_id', 'date_commande', 'id'],
+    'ix_commande_serveur_date_id': ['serveur_id', 'date_commande', 'id'],
+    'ix_commande_client_date_id': ['client_id', 'date_commande', 'id'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = [i['name'] for i in inspector.get_indexes('commande')]
+    for name, columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, 'commande', columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in INDEXES:
+        op.drop_index(name, table_name='commande')
@@ -0,0 +1,52 @@
+"""create email_sortant outbox table
+
+Revision ID: a4d8f3b6c2e1
+Revises: 5c7d2e9a1f36
+Create Date: 2026-10-17 16:03:48.220417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d8f3b6c2e1'
+down_revision: Union[str, Sequence[str], None] = '5c7d2e9a1f36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'email_sortant' in inspector.get_table_names():
+        return
+    op.create_table(
+        'email_sortant',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('destinataire', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('sujet', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('corps_html', sa.Text(), nullable=False),
+        sa.Column('statut', sa.Enum('EN_ATTENTE', 'ENVOYE', 'ECHEC', name='emailstatut'), nullable=False),
+        sa.Column('tentatives', sa.Integer(), nullable=False),
+        sa.Column('prochain_essai', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('derniere_erreur', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('date_creation', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('date_envoi', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_email_sortant_statut_prochain_essai', 'email_sortant',
+        ['statut', 'prochain_essai', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_email_sortant_statut_prochain_essai', table_name='email_sortant')
+    op.drop_table('email_sortant')
+    sa.Enum(name='emailstatut').drop(op.get_bind(), checkfirst=True)
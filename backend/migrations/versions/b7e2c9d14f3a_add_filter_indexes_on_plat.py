@@ -0,0 +1,41 @@
+"""add indexes on plat for filtered listing
+
+Revision ID: b7e2c9d14f3a
+Revises: a4d8f3b6c2e1
+Create Date: 2026-10-17 19:12:05.418327
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c9d14f3a'
+down_revision: Union[str, Sequence[str], None] = 'a4d8f3b6c2e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = {
+    'ix_plat_categorie_disponible_prix': ['categorie_id', 'disponible', 'prix', 'id'],
+    'ix_plat_disponible_prix': ['disponible', 'prix', 'id'],
+    'ix_plat_prix': ['prix', 'id'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = [i['name'] for i in inspector.get_indexes('plat')]
+    for name, columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, 'plat', columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in INDEXES:
+        op.drop_index(name, table_name='plat')
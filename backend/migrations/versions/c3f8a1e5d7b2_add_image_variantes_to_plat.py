@@ -0,0 +1,32 @@
+"""add image_variantes to plat
+
+Revision ID: c3f8a1e5d7b2
+Revises: b7e2c9d14f3a
+Create Date: 2026-10-17 20:05:41.772190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8a1e5d7b2'
+down_revision: Union[str, Sequence[str], None] = 'b7e2c9d14f3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = [c['name'] for c in inspector.get_columns('plat')]
+    if 'image_variantes' not in columns:
+        op.add_column('plat', sa.Column('image_variantes', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('plat', 'image_variantes')
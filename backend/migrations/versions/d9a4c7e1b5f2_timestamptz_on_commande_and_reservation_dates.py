@@ -0,0 +1,57 @@
+"""store commande and reservation dates as timestamp with time zone
+
+Revision ID: d9a4c7e1b5f2
+Revises: c3f8a1e5d7b2
+Create Date: 2026-10-17 16:08:42.511027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9a4c7e1b5f2'
+down_revision: Union[str, Sequence[str], None] = 'c3f8a1e5d7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Colonnes comparées aux dates envoyées par les clients (filtres, curseurs,
+# disponibilité des tables) ; les valeurs existantes sont en UTC
+COLONNES = [('commande', 'date_commande'), ('reservation', 'date_reservation')]
+
+
+def _colonnes_sans_fuseau(inspector):
+    for table, colonne in COLONNES:
+        for info in inspector.get_columns(table):
+            if info['name'] == colonne and not getattr(info['type'], 'timezone', False):
+                yield table, colonne
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    # SQLite ne distingue pas les deux types
+    if bind.dialect.name != 'postgresql':
+        return
+    for table, colonne in list(_colonnes_sans_fuseau(sa.inspect(bind))):
+        op.alter_column(
+            table, colonne,
+            type_=sa.DateTime(timezone=True),
+            postgresql_using=f"{colonne} AT TIME ZONE 'UTC'",
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    for table, colonne in COLONNES:
+        op.alter_column(
+            table, colonne,
+            type_=sa.DateTime(),
+            postgresql_using=f"{colonne} AT TIME ZONE 'UTC'",
+        )
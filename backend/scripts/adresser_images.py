@@ -0,0 +1,74 @@
+"""
+Renommer les images de plats envoyées avant l'adressage par contenu d'après
+leur empreinte SHA-256, pour qu'elles soient servies comme immuables. Les
+doublons sont fusionnés en un seul fichier et les variantes régénérées.
+
+Le script tourne dans son propre processus : il ne peut pas vider le cache du
+catalogue ni l'index de recherche des workers de l'API. Ceux-ci servent les
+anciennes URL jusqu'à l'expiration de CATALOGUE_CACHE_TTL_SECONDES et de
+RECHERCHE_INDEX_TTL_SECONDES, ou jusqu'à leur redémarrage.
+
+Usage : python scripts/adresser_images.py
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app.models  # noqa: F401 (enregistre toutes les tables)
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.models.plat import Plat
+from app.services.image_service import arreter_pool
+from app.services.plat_service import generer_variantes_plat
+from app.services.storage_service import TAILLE_BLOC, chemin_local, delete_old_image, est_adressee, url_voisine
+
+
+def _empreinte(chemin) -> str:
+    empreinte = hashlib.sha256()
+    with open(chemin, "rb") as fichier:
+        while bloc := fichier.read(TAILLE_BLOC):
+            empreinte.update(bloc)
+    return empreinte.hexdigest()[:32]
+
+
+def adresser() -> list[str]:
+    """Renommer les fichiers et mettre à jour les plats ; renvoie les nouvelles URL."""
+    nouvelles = set()
+    with Session(engine) as session:
+        images = session.exec(select(Plat.image_url).where(Plat.image_url.is_not(None)).distinct()).all()
+        for image_url in images:
+            chemin = chemin_local(image_url)
+            if chemin is None or est_adressee(image_url) or not chemin.exists():
+                continue
+            nouvelle_url = url_voisine(image_url, f"{_empreinte(chemin)}{chemin.suffix.lower()}")
+            os.replace(chemin, chemin_local(nouvelle_url))
+            plats = session.exec(select(Plat).where(Plat.image_url == image_url)).all()
+            for plat in plats:
+                # Anciennes variantes supprimées, régénérées sous les nouveaux noms
+                delete_old_image(None, plat.image_variantes)
+                plat.image_url = nouvelle_url
+                plat.image_variantes = None
+                session.add(plat)
+            session.commit()
+            nouvelles.add(nouvelle_url)
+            print(f"{image_url} -> {nouvelle_url} ({len(plats)} plat(s))")
+    return sorted(nouvelles)
+
+
+async def main():
+    nouvelles = adresser()
+    print(f"{len(nouvelles)} image(s) renommée(s) ; redémarrer l'API pour servir les nouvelles URL sans attendre")
+    try:
+        await asyncio.gather(*(generer_variantes_plat(image_url) for image_url in nouvelles))
+    finally:
+        arreter_pool()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+Mesure l'effet des connexions sur la latence des autres requêtes.
+
+Lance N connexions simultanées (Argon2) et, pendant ce temps, interroge en
+boucle un endpoint sans rapport ; affiche p50/p99 de ces requêtes témoins.
+L'option --bloquant reproduit l'ancien comportement (vérification Argon2
+dans la boucle d'événements) pour comparaison.
+
+Usage : python scripts/bench_login.py [--connexions 50] [--bloquant]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+from sqlmodel import Session
+
+from app.main import app
+from app.core.database import engine, create_db_and_tables
+from app.schemas.client_full import ClientCreateFull
+from app.security import auth
+from app.security.hashing import pwd_context
+from app.services.client_service import create_client_full
+
+ENDPOINT_TEMOIN = "/categories/"
+INTERVALLE_TEMOIN = 0.005
+
+
+def creer_compte() -> str:
+    uid = uuid.uuid4().hex[:8]
+    email = f"bench-{uid}@test.com"
+    with Session(engine) as session:
+        create_client_full(session, ClientCreateFull(
+            nom="Bench", prenom="Login", email=email,
+            telephone=f"0B{uid}", role="client", password="bench-password"
+        ))
+    return email
+
+
+def percentile(valeurs, p):
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(round(p / 100 * (len(valeurs) - 1))))]
+
+
+async def scenario(email: str, connexions: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(ENDPOINT_TEMOIN)  # échauffement
+
+        latences = []
+        termine = asyncio.Event()
+
+        async def temoin():
+            while not termine.is_set():
+                debut = time.perf_counter()
+                await client.get(ENDPOINT_TEMOIN)
+                latences.append((time.perf_counter() - debut) * 1000)
+                await asyncio.sleep(INTERVALLE_TEMOIN)
+
+        async def connexion():
+            res = await client.post("/auth/token", data={"username": email, "password": "bench-password"})
+            assert res.status_code == 200, res.text
+
+        tache_temoin = asyncio.create_task(temoin())
+        await asyncio.sleep(0)  # la première requête témoin part avant les connexions
+        debut = time.perf_counter()
+        await asyncio.gather(*(connexion() for _ in range(connexions)))
+        duree = time.perf_counter() - debut
+        termine.set()
+        await tache_temoin
+    return latences, duree
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connexions", type=int, default=50)
+    parser.add_argument("--bloquant", action="store_true",
+                        help="vérifier le mot de passe dans la boucle (comportement d'avant le pool)")
+    args = parser.parse_args()
+
+    if args.bloquant:
+        async def verification_bloquante(plain_password, hashed_password):
+            return pwd_context.verify_and_update(plain_password, hashed_password)
+        auth.verify_and_update_async = verification_bloquante
+
+    create_db_and_tables()
+    email = creer_compte()
+    latences, duree = asyncio.run(scenario(email, args.connexions))
+
+    mode = "bloquant" if args.bloquant else "pool Argon2"
+    print(f"Mode : {mode} — {args.connexions} connexions en {duree:.2f} s")
+    print(f"Requêtes témoins ({ENDPOINT_TEMOIN}) : {len(latences)}")
+    if not latences:
+        print("  aucune requête témoin n'a abouti pendant les connexions")
+        return
+    print(f"  p50 = {statistics.median(latences):.1f} ms")
+    print(f"  p99 = {percentile(latences, 99):.1f} ms")
+    print(f"  max = {max(latences):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Calibre le coût Argon2 pour la machine courante.
+
+Mesure la durée d'une vérification pour plusieurs couples mémoire / passes
+et retient les paramètres les plus coûteux qui restent sous la latence
+cible : d'abord la mémoire la plus grande (ce qui coûte le plus à un
+attaquant équipé de GPU), puis le plus grand nombre de passes.
+
+La mémoire réservée au pire moment vaut memory_cost × HASH_CONCURRENCE_MAX :
+--memoire-max borne la mémoire d'un calcul.
+
+Les lignes à reporter dans le .env sont affichées à la fin ; les comptes
+existants sont re-hachés à leur prochaine connexion.
+
+Usage : python scripts/calibrer_argon2.py [--cible-ms 250] [--memoire-max 262144]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from passlib.hash import argon2
+
+from app.core.config import settings
+
+# Plancher recommandé par l'OWASP pour argon2id : 19 Mio
+MEMOIRE_MIN = 19 * 1024
+TIME_COST_MAX = 10
+
+
+def mesurer(memory_cost: int, time_cost: int, parallelism: int, repetitions: int) -> float:
+    """Durée médiane (secondes) d'une vérification avec ces paramètres."""
+    handler = argon2.using(memory_cost=memory_cost, time_cost=time_cost, parallelism=parallelism)
+    hache = handler.hash("calibration")
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        handler.verify("calibration", hache)
+        durees.append(time.perf_counter() - debut)
+    return statistics.median(durees)
+
+
+def memoires_candidates(memoire_max: int):
+    """Puissances de deux (Kio) entre le plancher et le maximum, de la plus grande à la plus petite."""
+    memoires = []
+    memoire = 1 << max(0, memoire_max.bit_length() - 1)
+    while memoire >= MEMOIRE_MIN:
+        memoires.append(memoire)
+        memoire //= 2
+    if MEMOIRE_MIN not in memoires:
+        memoires.append(MEMOIRE_MIN)
+    return memoires
+
+
+def calibrer(cible: float, memoire_max: int, parallelism: int, repetitions: int):
+    """Renvoie (memory_cost, time_cost, durée) ou None si même le minimum dépasse la cible."""
+    for memory_cost in memoires_candidates(memoire_max):
+        duree = mesurer(memory_cost, 1, parallelism, repetitions)
+        print(f"  m={memory_cost:>7} Kio t=1 p={parallelism} : {duree * 1000:7.1f} ms")
+        if duree > cible:
+            continue
+        retenu = (memory_cost, 1, duree)
+        for time_cost in range(2, TIME_COST_MAX + 1):
+            duree = mesurer(memory_cost, time_cost, parallelism, repetitions)
+            print(f"  m={memory_cost:>7} Kio t={time_cost} p={parallelism} : {duree * 1000:7.1f} ms")
+            if duree > cible:
+                break
+            retenu = (memory_cost, time_cost, duree)
+        return retenu
+    return None
+
+
+def main():
+    # Chaque calcul simultané occupe `parallelism` threads : on partage les cœurs
+    parallelisme_defaut = max(1, (os.cpu_count() or 1) // settings.HASH_CONCURRENCE_MAX)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cible-ms", type=float, default=250, help="latence de vérification visée")
+    parser.add_argument("--memoire-max", type=int, default=256 * 1024, help="mémoire maximale d'un calcul (Kio)")
+    parser.add_argument("--parallelisme", type=int, default=parallelisme_defaut)
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Cible : {args.cible_ms:.0f} ms par vérification, {args.parallelisme} voie(s), "
+          f"{os.cpu_count()} cœur(s), HASH_CONCURRENCE_MAX={settings.HASH_CONCURRENCE_MAX}")
+    resultat = calibrer(args.cible_ms / 1000, args.memoire_max, args.parallelisme, args.repetitions)
+    if resultat is None:
+        print(f"Aucun paramètre sous {args.cible_ms:.0f} ms avec {MEMOIRE_MIN} Kio : augmentez la cible.")
+        sys.exit(1)
+
+    memory_cost, time_cost, duree = resultat
+    simultanes = min(settings.HASH_CONCURRENCE_MAX, max(1, (os.cpu_count() or 1) // args.parallelisme))
+    print(f"\nRetenu : m={memory_cost} Kio, t={time_cost}, p={args.parallelisme} ({duree * 1000:.1f} ms)")
+    print(f"Débit estimé : ~{simultanes / duree:.0f} connexions/s, "
+          f"mémoire au pire {memory_cost * settings.HASH_CONCURRENCE_MAX // 1024} Mio")
+    print("\nÀ ajouter au .env :")
+    print(f"ARGON2_MEMORY_COST={memory_cost}")
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_PARALLELISM={args.parallelisme}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Worker d'envoi des emails en file (table email_sortant).
+
+À lancer à côté des workers web ; plusieurs instances peuvent tourner en
+parallèle sur PostgreSQL (verrouillage SKIP LOCKED). Ctrl+C / SIGTERM
+terminent le lot en cours puis ferment la connexion SMTP.
+
+Usage : python scripts/email_worker.py
+"""
+import asyncio
+import logging
+import os
+import signal
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app.models  # noqa: F401 (enregistre toutes les tables)
+from app.core.database import async_engine
+from app.services.email_worker import executer
+
+
+async def main():
+    arret = asyncio.Event()
+    boucle = asyncio.get_running_loop()
+    for signal_arret in (signal.SIGINT, signal.SIGTERM):
+        boucle.add_signal_handler(signal_arret, arret.set)
+    try:
+        await executer(arret)
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+"""
+Générer les variantes (miniature, moyenne, WebP) des images de plats qui n'en
+ont pas encore, par exemple les images envoyées avant leur introduction.
+
+Usage : python scripts/generer_variantes.py [--toutes]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app.models  # noqa: F401 (enregistre toutes les tables)
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.models.plat import Plat
+from app.services.image_service import arreter_pool
+from app.services.plat_service import generer_variantes_plat
+
+
+async def main(toutes: bool):
+    with Session(engine) as session:
+        statement = select(Plat.image_url).where(Plat.image_url.is_not(None)).distinct()
+        if not toutes:
+            statement = statement.where(Plat.image_variantes.is_(None))
+        images = session.exec(statement).all()
+    print(f"{len(images)} image(s) à traiter")
+    try:
+        # Les images sont traitées en parallèle par le pool de processus
+        await asyncio.gather(*(generer_variantes_plat(image_url, remplacer=toutes) for image_url in images))
+    finally:
+        arreter_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--toutes", action="store_true", help="régénérer aussi les variantes existantes")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main(args.toutes))
@@ -0,0 +1,98 @@
+import sys
+import os
+import uuid
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Request
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.main import app
+from app.core.cache_http import CacheReponses
+from app.core.database import engine, create_db_and_tables
+from app.schemas.categorie import CategorieCreate
+from app.services.categorie_service import create_categorie
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+def _requete(chemin: str, etag: str | None = None) -> Request:
+    entetes = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "GET", "path": chemin, "query_string": b"", "headers": entetes})
+
+
+def test_etag_et_304():
+    print("\n--- Test ETag / 304 sur /tables/ ---")
+    res = client.get("/tables/")
+    assert res.status_code == 200
+    etag = res.headers["etag"]
+    assert etag.startswith('"') and res.headers["cache-control"] == "no-cache"
+
+    revalidation = client.get("/tables/", headers={"If-None-Match": etag})
+    assert revalidation.status_code == 304
+    assert revalidation.content == b"" and revalidation.headers["etag"] == etag
+
+    # Une écriture invalide la liste : nouvel ETag, nouvelle table visible
+    numero = f"T-{uuid.uuid4().hex[:6]}"
+    assert client.post("/tables/", json={"numero_table": numero, "capacite": 4}).status_code == 200
+    apres = client.get("/tables/", headers={"If-None-Match": etag})
+    assert apres.status_code == 200 and apres.headers["etag"] != etag
+    assert numero in {t["numero_table"] for t in apres.json()}
+    print("-> 304 tant que rien ne change, 200 après écriture.")
+
+
+def test_invalidation_par_service():
+    print("\n--- Test de l'invalidation par les services ---")
+    etag = client.get("/categories/").headers["etag"]
+    assert client.get("/categories/", headers={"If-None-Match": etag}).status_code == 304
+    nom = f"Cat-{uuid.uuid4().hex[:6]}"
+    with Session(engine) as session:
+        create_categorie(session, CategorieCreate(nom=nom))
+    res = client.get("/categories/", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert nom in {c["nom"] for c in res.json()}
+    print("-> create_categorie invalide l'étiquette 'categorie'.")
+
+
+def test_lecture_concurrente_d_une_ecriture():
+    cache = CacheReponses(taille_max=10, ttl=60)
+    # Lecture commencée avant l'écriture : le corps (périmé) n'est pas mémorisé
+    consultation = cache.consulter(_requete("/plats/"), tags=("plat",))
+    cache.invalider("plat")
+    assert consultation.enregistrer(b"[]").status_code == 200
+    assert cache.consulter(_requete("/plats/"), tags=("plat",)).reponse is None
+
+    # Une étiquette étrangère ne touche pas l'entrée
+    cache.consulter(_requete("/plats/"), tags=("plat",)).enregistrer(b"[1]")
+    cache.invalider("table")
+    assert cache.consulter(_requete("/plats/"), tags=("plat",)).reponse.body == b"[1]"
+
+
+def test_expiration_et_eviction():
+    instant = [0.0]
+    cache = CacheReponses(taille_max=2, ttl=10, horloge=lambda: instant[0])
+    for chemin in ("/a", "/b", "/c"):
+        cache.consulter(_requete(chemin), tags=("t",)).enregistrer(chemin.encode())
+    assert cache.consulter(_requete("/a"), tags=("t",)).reponse is None  # évincée (LRU)
+    etag = cache.consulter(_requete("/c"), tags=("t",)).reponse.headers["etag"]
+    assert cache.consulter(_requete("/c", etag), tags=("t",)).reponse.status_code == 304
+    instant[0] = 11
+    assert cache.consulter(_requete("/c"), tags=("t",)).reponse is None
+    stats = cache.statistiques()
+    assert stats["reponses_304"] == 1 and stats["taille"] == 1
+
+
+if __name__ == "__main__":
+    try:
+        test_etag_et_304()
+        test_invalidation_par_service()
+        test_lecture_concurrente_d_une_ecriture()
+        test_expiration_et_eviction()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
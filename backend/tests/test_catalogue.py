@@ -0,0 +1,89 @@
+import sys
+import os
+import uuid
+from contextlib import contextmanager
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.main import app
+from app.core.database import engine, create_db_and_tables
+from app.schemas.categorie import CategorieCreate
+from app.schemas.menu import MenuCreate
+from app.schemas.plat import PlatCreate, PlatUpdate
+from app.services.categorie_service import create_categorie
+from app.services.menu_service import add_plat_to_menu, create_menu
+from app.services.plat_service import create_plat, update_plat
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+@contextmanager
+def compter_requetes():
+    requetes = []
+    ecouteur = lambda *args: requetes.append(args[2])
+    event.listen(engine, "before_cursor_execute", ecouteur)
+    try:
+        yield requetes
+    finally:
+        event.remove(engine, "before_cursor_execute", ecouteur)
+
+
+def _peupler():
+    uid = uuid.uuid4().hex[:6]
+    with Session(engine) as session:
+        entrees = create_categorie(session, CategorieCreate(nom=f"Entrées {uid}"))
+        cachee = create_categorie(session, CategorieCreate(nom=f"Archivée {uid}", actif=False))
+        salade = create_plat(session, PlatCreate(nom=f"Salade {uid}", prix=2500, categorie_id=entrees.id))
+        soupe = create_plat(session, PlatCreate(nom=f"Soupe {uid}", prix=2000, categorie_id=entrees.id))
+        create_plat(session, PlatCreate(nom=f"Ancien {uid}", prix=1000, categorie_id=cachee.id))
+        menu = create_menu(session, MenuCreate(nom=f"Midi {uid}", prix_fixe=5000))
+        add_plat_to_menu(session, menu.id, salade.id)
+        return uid, entrees.id, menu.id, soupe.id
+
+
+def test_catalogue_document():
+    print("\n--- Test du document catalogue ---")
+    uid, categorie_id, menu_id, soupe_id = _peupler()
+    res = client.get("/catalogue")
+    assert res.status_code == 200, res.text
+    data = res.json()
+    categories = {c["id"]: c for c in data["categories"]}
+    assert {p["nom"] for p in categories[categorie_id]["plats"]} == {f"Salade {uid}", f"Soupe {uid}"}
+    assert f"Archivée {uid}" not in {c["nom"] for c in data["categories"]}
+    menu = next(m for m in data["menus"] if m["id"] == menu_id)
+    assert [p["nom"] for p in menu["plats"]] == [f"Salade {uid}"]
+    assert menu["plats"][0]["categorie_id"] == categorie_id
+
+    # Servi depuis le document précalculé : aucune requête SQL, 304 si inchangé
+    with compter_requetes() as requetes:
+        assert client.get("/catalogue").json()["version"] == data["version"]
+        assert client.get("/catalogue", headers={"If-None-Match": res.headers["etag"]}).status_code == 304
+    assert requetes == []
+
+    # Une écriture sur le catalogue déclenche une seule reconstruction
+    with Session(engine) as session:
+        update_plat(session, soupe_id, PlatUpdate(disponible=False))
+    with compter_requetes() as requetes:
+        apres = client.get("/catalogue").json()
+        client.get("/catalogue")
+    assert 0 < len(requetes) <= 4
+    assert apres["version"] != data["version"]
+    soupe = next(p for c in apres["categories"] for p in c["plats"] if p["id"] == soupe_id)
+    assert soupe["disponible"] is False
+    print(f"-> Document reconstruit en {len(requetes)} requêtes après modification.")
+
+
+if __name__ == "__main__":
+    try:
+        test_catalogue_document()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
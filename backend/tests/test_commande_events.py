@@ -0,0 +1,96 @@
+import sys
+import os
+import uuid
+import asyncio
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.main import app
+from app.core.database import engine, create_db_and_tables
+from app.core.events import bus
+from app.models.commande import CommandeStatus
+from app.schemas.client_full import ClientCreateFull
+from app.schemas.commande import CommandeCreate
+from app.schemas.table import TableCreate
+from app.services.client_service import create_client_full
+from app.services.table_service import create_table
+from app.services.commande_service import create_commande, valider_commande, transmettre_cuisine
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+def _evenement(status, table_id=1, client_id=1):
+    return {"event": "test", "commande_id": 1, "status": status, "table_id": table_id, "client_id": client_id}
+
+
+def test_bus_filtres():
+    print("\n--- Test des filtres du bus d'événements ---")
+
+    async def scenario():
+        with bus.abonner(role="cuisinier") as cuisine, bus.abonner(table_id=2) as table2:
+            bus.publier(_evenement(CommandeStatus.EN_ATTENTE, table_id=2))
+            bus.publier(_evenement(CommandeStatus.EN_COURS, table_id=1))
+            await asyncio.sleep(0.01)
+            assert cuisine.queue.qsize() == 1
+            assert (await cuisine.queue.get())["status"] == CommandeStatus.EN_COURS
+            assert table2.queue.qsize() == 1
+            assert (await table2.queue.get())["table_id"] == 2
+        assert bus.nombre_abonnes == 0
+
+    asyncio.run(scenario())
+    print("-> Chaque abonné ne reçoit que ses événements.")
+
+
+def test_transitions_publient_evenements():
+    print("\n--- Test de la publication lors des transitions ---")
+    uid = str(uuid.uuid4())[:8]
+
+    async def scenario():
+        with Session(engine) as session:
+            c = create_client_full(session, ClientCreateFull(
+                nom="Flux", prenom="Client", email=f"flux-{uid}@test.com",
+                telephone=f"07{uid}", role="client", password="pass"
+            ))
+            table = create_table(session, TableCreate(numero_table=f"F-{uid}", capacite=2))
+            commande = create_commande(session, CommandeCreate(
+                client_id=c.id, table_id=table.id, montant_total=0, type_commande="sur_place"
+            ))
+
+            with bus.abonner(client_id=c.id) as abonnement:
+                valider_commande(session, commande.id, serveur_id=1)
+                transmettre_cuisine(session, commande.id)
+                await asyncio.sleep(0.01)
+                recus = [abonnement.queue.get_nowait() for _ in range(abonnement.queue.qsize())]
+
+        assert [e["event"] for e in recus] == ["validee", "en_cuisine"]
+        assert recus[-1]["status"] == CommandeStatus.EN_COURS
+        assert recus[-1]["commande_id"] == commande.id
+
+    asyncio.run(scenario())
+    print("-> Les transitions sont diffusées après commit.")
+
+
+def test_flux_requiert_authentification():
+    print("\n--- Test de l'authentification du flux SSE ---")
+    res = client.get("/commandes/flux")
+    assert res.status_code == 401
+    res = client.get("/commandes/flux", params={"token": "invalide"})
+    assert res.status_code == 401
+    print("-> Accès refusé sans jeton valide.")
+
+
+if __name__ == "__main__":
+    try:
+        test_bus_filtres()
+        test_transitions_publient_evenements()
+        test_flux_requiert_authentification()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
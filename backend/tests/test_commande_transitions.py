@@ -0,0 +1,189 @@
+import sys
+import os
+import uuid
+import asyncio
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.main import app
+from app.core.database import engine, create_db_and_tables
+from app.core.events import bus
+from app.models.commande import Commande, CommandeStatus
+from app.models.ligne_commande import LigneCommande
+from app.models.paiement import Paiement
+from app.schemas.client_full import ClientCreateFull
+from app.schemas.commande import CommandeCreate
+from app.schemas.personnel_full import CuisinierCreateFull
+from app.schemas.table import TableCreate
+from app.services.client_service import create_client_full
+from app.services.personnel_service import create_cuisinier_full
+from app.services.table_service import create_table
+from app.services.commande_service import (
+    create_commande, valider_commande, refuser_commande, transmettre_cuisine,
+    marquer_prete, marquer_servie, valider_reception, marquer_payee, transitionner_commandes
+)
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+def _creer_commandes(session: Session, nombre: int):
+    uid = str(uuid.uuid4())[:8]
+    c = create_client_full(session, ClientCreateFull(
+        nom="Etat", prenom="Client", email=f"etat-{uid}@test.com",
+        telephone=f"01{uid}", role="client", password="pass"
+    ))
+    table = create_table(session, TableCreate(numero_table=f"E-{uid}", capacite=4))
+    return [
+        create_commande(session, CommandeCreate(
+            client_id=c.id, table_id=table.id, montant_total=2500, type_commande="sur_place"
+        )).id
+        for _ in range(nombre)
+    ]
+
+
+def test_cycle_complet():
+    print("\n--- Test du cycle de vie complet par compare-and-swap ---")
+    with Session(engine) as session:
+        commande_id, = _creer_commandes(session, 1)
+        session.add(LigneCommande(commande_id=commande_id, quantite=1, prix_unitaire=2500))
+        session.commit()
+
+        assert valider_commande(session, commande_id, serveur_id=1).status == CommandeStatus.APPROUVEE
+        assert transmettre_cuisine(session, commande_id).status == CommandeStatus.EN_COURS
+        commande = marquer_prete(session, commande_id, cuisinier_id=2)
+        assert commande.status == CommandeStatus.PRETE and commande.cuisinier_id == 2
+        assert marquer_servie(session, commande_id).status == CommandeStatus.SERVIE
+        assert valider_reception(session, commande_id).status == CommandeStatus.RECEPTIONNEE
+        assert marquer_payee(session, commande_id, "carte").status == CommandeStatus.PAYEE
+        # Un second paiement est idempotent : aucun paiement en double
+        marquer_payee(session, commande_id, "carte")
+
+        paiements = session.exec(select(Paiement).where(Paiement.commande_id == commande_id)).all()
+        assert len(paiements) == 1 and paiements[0].montant == 2500
+        ligne = session.exec(select(LigneCommande).where(LigneCommande.commande_id == commande_id)).one()
+        assert ligne.statut == "payee"
+
+        assert marquer_prete(session, 999999999, cuisinier_id=2) is None
+    print("-> Chaque transition passe par une seule instruction UPDATE.")
+
+
+def test_conflit_entre_deux_sessions():
+    print("\n--- Test d'une course entre deux membres du personnel ---")
+    with Session(engine) as s1, Session(engine) as s2:
+        commande_id, = _creer_commandes(s1, 1)
+        # Les deux sessions voient la commande EN_ATTENTE
+        assert s2.get(Commande, commande_id).status == CommandeStatus.EN_ATTENTE
+
+        valider_commande(s1, commande_id, serveur_id=1)
+        try:
+            refuser_commande(s2, commande_id, serveur_id=3, raison="Rupture")
+            assert False, "Le refus aurait dû échouer"
+        except ValueError as e:
+            assert "approuvee" in str(e)
+
+    with Session(engine) as session:
+        commande = session.get(Commande, commande_id)
+        assert commande.status == CommandeStatus.APPROUVEE and commande.serveur_id == 1
+    print("-> Le second serveur est refusé au lieu d'écraser la validation.")
+
+
+def test_refus_et_reattribution():
+    print("\n--- Test du refus et de la réattribution ---")
+    with Session(engine) as session:
+        a, b = _creer_commandes(session, 2)
+        commande = refuser_commande(session, a, serveur_id=1, raison="Table fermée")
+        assert commande.status == CommandeStatus.ANNULEE
+        assert commande.notes == "[Refusée: Table fermée]"
+
+        async def scenario():
+            with bus.abonner(commande_id=b) as abonnement:
+                valider_commande(session, b, serveur_id=1)
+                valider_commande(session, b, serveur_id=1)
+                valider_commande(session, b, serveur_id=4)
+                await asyncio.sleep(0.01)
+                return abonnement.queue.qsize()
+
+        # Validation, puis répétition sans effet, puis réattribution à un autre serveur
+        assert asyncio.run(scenario()) == 2
+        assert session.get(Commande, b).serveur_id == 4
+    print("-> Les répétitions sont idempotentes, les réattributions publiées.")
+
+
+def test_transition_en_lot():
+    print("\n--- Test d'une transition appliquée à plusieurs commandes ---")
+    with Session(engine) as session:
+        ids = _creer_commandes(session, 3)
+        for commande_id in ids:
+            valider_commande(session, commande_id, serveur_id=1)
+        refuser_id, = _creer_commandes(session, 1)
+
+        updates = []
+        ecouteur = lambda conn, cursor, statement, *args: updates.append(statement) if statement.startswith("UPDATE commande") else None
+        event.listen(engine, "before_cursor_execute", ecouteur)
+        try:
+            commandes, echecs = transitionner_commandes(
+                session, ids + [refuser_id, 999999999], CommandeStatus.EN_COURS
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", ecouteur)
+
+        assert len(updates) == 1
+        assert [c.id for c in commandes] == ids
+        assert all(c.status == CommandeStatus.EN_COURS for c in commandes)
+        assert set(echecs) == {refuser_id, 999999999}
+        assert echecs[999999999] == "Commande non trouvée"
+    print("-> Une seule instruction pour tout le lot, échecs détaillés par commande.")
+
+
+def test_endpoint_transition_groupee():
+    print("\n--- Test de POST /commandes/transition ---")
+    uid = str(uuid.uuid4())[:8]
+    with Session(engine) as session:
+        cuisinier = create_cuisinier_full(session, CuisinierCreateFull(
+            nom="Lot", prenom="Cuisinier", email=f"lot-{uid}@test.com",
+            telephone=f"00{uid}", role="cuisinier", password="pass"
+        ))
+        cuisinier_id = cuisinier.id
+        ids = _creer_commandes(session, 3)
+        for commande_id in ids[:2]:
+            valider_commande(session, commande_id, serveur_id=1)
+            transmettre_cuisine(session, commande_id)
+
+    login = client.post("/auth/token", data={"username": f"lot-{uid}@test.com", "password": "pass"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    res = client.post("/commandes/transition", headers=headers, json={
+        "commande_ids": ids, "status": "prete"
+    })
+    assert res.status_code == 200, res.text
+    resultats = {r["commande_id"]: r for r in res.json()}
+    assert resultats[ids[0]]["succes"] and resultats[ids[1]]["status"] == "prete"
+    assert not resultats[ids[2]]["succes"]
+    assert "en_attente" in resultats[ids[2]]["erreur"]
+
+    with Session(engine) as session:
+        assert session.get(Commande, ids[0]).cuisinier_id == cuisinier_id
+
+    res = client.post("/commandes/transition", json={"commande_ids": ids, "status": "prete"})
+    assert res.status_code == 401
+    print("-> Plusieurs commandes terminées en un seul appel.")
+
+
+if __name__ == "__main__":
+    try:
+        test_cycle_complet()
+        test_conflit_entre_deux_sessions()
+        test_refus_et_reattribution()
+        test_transition_en_lot()
+        test_endpoint_transition_groupee()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,213 @@
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.main import app
+from app.core.database import engine, create_db_and_tables
+from app.models.commande import Commande, CommandeStatus
+from app.services.commande_service import _requete_commandes, decoder_curseur
+from app.services.reservation_service import _requete_chevauchement
+from app.services.commande_service import _requete_commandes, decoder_curseur, encoder_curseur
+from app.services.reservation_service import _requete_chevauchement
+from app.schemas.client_full import ClientCreateFull
+from app.schemas.personnel_full import ServeurCreateFull
+from app.schemas.table import TableCreate
+from app.services.client_service import create_client_full
+from app.services.personnel_service import create_serveur_full
+from app.services.table_service import create_table
+
+create_db_and_tables()
+client = TestClient(app)
+
+STATUTS = [CommandeStatus.EN_ATTENTE, CommandeStatus.APPROUVEE, CommandeStatus.EN_COURS, CommandeStatus.PRETE]
+DEBUT = datetime(2026, 3, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def _preparer():
+    """Créer un serveur connecté et 10 commandes datées sur une table dédiée."""
+    uid = str(uuid.uuid4())[:8]
+    with Session(engine) as session:
+        create_serveur_full(session, ServeurCreateFull(
+            nom="Pagination", prenom="Serveur", email=f"page-{uid}@test.com",
+            telephone=f"03{uid}", role="serveur", password="pass"
+        ))
+        c = create_client_full(session, ClientCreateFull(
+            nom="Pagination", prenom="Client", email=f"page-client-{uid}@test.com",
+            telephone=f"02{uid}", role="client", password="pass"
+        ))
+        table = create_table(session, TableCreate(numero_table=f"P-{uid}", capacite=4))
+        # Deux commandes partagent la même date pour vérifier le départage par id
+        dates = [DEBUT + timedelta(minutes=i) for i in range(9)] + [DEBUT + timedelta(minutes=4)]
+        commandes = [
+            Commande(client_id=c.id, table_id=table.id, montant_total=0, type_commande="sur_place",
+                     status=STATUTS[i % 4], date_commande=date)
+            for i, date in enumerate(dates)
+        ]
+        session.add_all(commandes)
+        session.commit()
+        attendu = sorted(((c.date_commande, c.id) for c in commandes))
+        table_id = table.id
+
+    login = client.post("/auth/token", data={"username": f"page-{uid}@test.com", "password": "pass"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    return headers, table_id, [commande_id for _, commande_id in attendu]
+
+
+def test_pagination_par_curseur():
+    print("\n--- Test de la pagination par curseur ---")
+    headers, table_id, attendu = _preparer()
+
+    vus, curseur, pages = [], None, 0
+    while True:
+        params = {"table_id": table_id, "limit": 3}
+        if curseur:
+            params["curseur"] = curseur
+        res = client.get("/commandes/", headers=headers, params=params)
+        assert res.status_code == 200, res.text
+        vus += [c["id"] for c in res.json()]
+        pages += 1
+        curseur = res.headers.get("X-Next-Cursor")
+        if not curseur:
+            break
+
+    assert vus == attendu
+    assert pages == 4
+    res = client.get("/commandes/", headers=headers, params={"curseur": "pas-un-curseur"})
+    assert res.status_code == 400
+    print("-> Toutes les commandes parcourues une seule fois, dans l'ordre.")
+
+
+def test_filtres_liste_commandes():
+    print("\n--- Test des filtres de la liste des commandes ---")
+    headers, table_id, _ = _preparer()
+
+    res = client.get("/commandes/", headers=headers, params={
+        "table_id": table_id, "status": ["approuvee", "en_cours"]
+    })
+    assert res.status_code == 200, res.text
+    assert len(res.json()) == 5
+    assert {c["status"] for c in res.json()} == {"approuvee", "en_cours"}
+
+    res = client.get("/commandes/", headers=headers, params={
+        "table_id": table_id,
+        "date_debut": (DEBUT + timedelta(minutes=2)).isoformat(),
+        "date_fin": (DEBUT + timedelta(minutes=5)).isoformat(),
+    })
+    assert len(res.json()) == 4
+    print("-> Filtres par statut et par plage de dates appliqués côté serveur.")
+
+
+def _parametres_dates(statement) -> list:
+    return [v for v in statement.compile().params.values() if isinstance(v, datetime)]
+
+
+def test_dates_avec_fuseau():
+    print("\n--- Test des dates avec fuseau (filtres et curseur) ---")
+    headers, table_id, attendu = _preparer()
+    paris = timezone(timedelta(hours=2))
+
+    # 14h02 à Paris = 12h02 UTC : mêmes commandes qu'avec les bornes en UTC
+    res = client.get("/commandes/", headers=headers, params={
+        "table_id": table_id,
+        "date_debut": (DEBUT + timedelta(minutes=2)).astimezone(paris).isoformat(),
+        "date_fin": (DEBUT + timedelta(minutes=5)).astimezone(paris).isoformat(),
+        "limit": 2,
+    })
+    assert res.status_code == 200, res.text
+    premiere_page = [c["id"] for c in res.json()]
+    res = client.get("/commandes/", headers=headers, params={
+        "table_id": table_id,
+        "date_debut": (DEBUT + timedelta(minutes=2)).astimezone(paris).isoformat(),
+        "date_fin": (DEBUT + timedelta(minutes=5)).astimezone(paris).isoformat(),
+        "curseur": res.headers["X-Next-Cursor"],
+    })
+    assert res.status_code == 200, res.text
+    assert len(premiere_page + [c["id"] for c in res.json()]) == 4
+
+    # Les valeurs liées sont sans fuseau, comme la colonne (asyncpg refuse le mélange)
+    curseur = encoder_curseur(Commande(id=1, date_commande=DEBUT.astimezone(paris),
+                                       client_id=1, table_id=1, montant_total=0, type_commande="sur_place"))
+    assert decoder_curseur(curseur)[0] == DEBUT.replace(tzinfo=None)
+    statement = _requete_commandes(date_debut=DEBUT.astimezone(paris), date_fin=DEBUT,
+                                   apres=decoder_curseur(curseur))
+    dates = _parametres_dates(statement)
+    assert dates and all(d.tzinfo is None for d in dates)
+    assert DEBUT.replace(tzinfo=None) in dates
+    dates = _parametres_dates(_requete_chevauchement(table_id, DEBUT.astimezone(paris)))
+    assert dates and all(d.tzinfo is None for d in dates)
+    assert min(dates) == DEBUT.replace(tzinfo=None) - timedelta(hours=2)
+    print("-> Dates ramenées en UTC sans fuseau avant d'atteindre la base.")
+
+
+def _dates_liees(statement) -> list:
+    return [v for v in statement.compile().params.values() if isinstance(v, datetime)]
+
+
+def test_dates_avec_fuseau():
+    print("\n--- Test des dates avec fuseau (filtres, curseur, disponibilité) ---")
+    headers, table_id, attendu = _preparer()
+    paris = timezone(timedelta(hours=2))
+    bornes = {
+        "table_id": table_id,
+        # 14h02 à Paris = 12h02 UTC : mêmes commandes qu'avec les bornes en UTC
+        "date_debut": (DEBUT + timedelta(minutes=2)).astimezone(paris).isoformat(),
+        "date_fin": (DEBUT + timedelta(minutes=5)).replace(tzinfo=None).isoformat(),
+    }
+    res = client.get("/commandes/", headers=headers, params={**bornes, "limit": 2})
+    assert res.status_code == 200, res.text
+    vus = [c["id"] for c in res.json()]
+    curseur = res.headers["X-Next-Cursor"]
+    res = client.get("/commandes/", headers=headers, params={**bornes, "curseur": curseur})
+    assert res.status_code == 200, res.text
+    vus += [c["id"] for c in res.json()]
+    assert vus == attendu[2:6]
+
+    # Toutes les valeurs liées sont en UTC avec fuseau, quel que soit l'envoi
+    statement = _requete_commandes(date_debut=DEBUT.astimezone(paris), date_fin=DEBUT.replace(tzinfo=None),
+                                   apres=decoder_curseur(curseur))
+    dates = _dates_liees(statement)
+    assert len(dates) == 3
+    assert all(d.utcoffset() == timedelta(0) for d in dates)
+    assert dates[0] == dates[1] == DEBUT
+    for date in [DEBUT.astimezone(paris), DEBUT.replace(tzinfo=None)]:
+        dates = _dates_liees(_requete_chevauchement(table_id, date))
+        assert all(d.utcoffset() == timedelta(0) for d in dates)
+        assert min(dates) == DEBUT - timedelta(hours=2)
+
+        res = client.get("/reservations/disponibilite/", params={"table_id": table_id, "date_reservation": date.isoformat()})
+        assert res.status_code == 200, res.text
+    print("-> Dates ramenées en UTC avant d'atteindre la base.")
+
+
+def test_index_statut_utilise():
+    print("\n--- Test de l'utilisation de l'index composite ---")
+    with Session(engine) as session:
+        plan = session.exec(text(
+            "EXPLAIN QUERY PLAN SELECT * FROM commande WHERE status IN ('EN_COURS') "
+            "ORDER BY date_commande, id LIMIT 100"
+        )).all()
+    details = " ".join(str(ligne[-1]) for ligne in plan)
+    assert "ix_commande_status_date_id" in details, details
+    print("-> Le filtre par statut lit uniquement l'index dédié.")
+
+
+if __name__ == "__main__":
+    try:
+        test_pagination_par_curseur()
+        test_filtres_liste_commandes()
+        test_dates_avec_fuseau()
+        test_dates_avec_fuseau()
+        test_index_statut_utilise()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
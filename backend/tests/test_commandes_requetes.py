@@ -0,0 +1,131 @@
+import sys
+import os
+import uuid
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contextlib import contextmanager
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.main import app
+from app.core.database import engine, async_engine, create_db_and_tables
+from app.models.categorie import Categorie
+from app.models.client import Client
+from app.models.commande import Commande
+from app.models.ligne_commande import LigneCommande
+from app.models.plat import Plat
+from app.models.table import RestaurantTable
+from app.models.utilisateur import Utilisateur
+from app.schemas.commande import CommandeRead
+from app.schemas.personnel_full import ServeurCreateFull
+from app.services.commande_service import list_commandes
+from app.services.personnel_service import create_serveur_full
+
+create_db_and_tables()
+client = TestClient(app)
+
+# Nombre maximal de requêtes SQL pour lister et sérialiser des commandes
+# (commandes, clients, utilisateurs, tables, lignes, plats),
+# indépendamment du nombre de commandes renvoyées
+MAX_REQUETES_LISTE = 6
+
+
+@contextmanager
+def compter_requetes():
+    requetes = []
+    ecouteur = lambda *args: requetes.append(args[2])
+    # Services synchrones et routes asynchrones n'utilisent pas le même moteur
+    moteurs = (engine, async_engine.sync_engine)
+    for moteur in moteurs:
+        event.listen(moteur, "before_cursor_execute", ecouteur)
+    try:
+        yield requetes
+    finally:
+        for moteur in moteurs:
+            event.remove(moteur, "before_cursor_execute", ecouteur)
+
+
+def _peupler_commandes(nombre: int):
+    """Insérer `nombre` commandes (10 clients, 10 tables, 2 lignes chacune)."""
+    uid = str(uuid.uuid4())[:8]
+    with Session(engine) as session:
+        categorie = Categorie(nom=f"Volume-{uid}")
+        session.add(categorie)
+        session.flush()
+        plats = [Plat(nom=f"Plat-{uid}-{i}", prix=1000 * (i + 1), categorie_id=categorie.id) for i in range(3)]
+        tables = [RestaurantTable(numero_table=f"V-{uid}-{i}", capacite=4) for i in range(10)]
+        utilisateurs = [
+            Utilisateur(nom="Volume", prenom=str(i), email=f"volume-{uid}-{i}@test.com",
+                        telephone=f"05{uid}{i}", role="client", hashed_password="x")
+            for i in range(10)
+        ]
+        session.add_all(plats + tables + utilisateurs)
+        session.flush()
+        clients = [Client(utilisateur_id=u.id) for u in utilisateurs]
+        session.add_all(clients)
+        session.flush()
+        commandes = [
+            Commande(client_id=clients[i % 10].id, table_id=tables[i % 10].id,
+                     montant_total=3000, type_commande="sur_place")
+            for i in range(nombre)
+        ]
+        session.add_all(commandes)
+        session.flush()
+        session.add_all([
+            LigneCommande(commande_id=c.id, plat_id=plats[j].id, quantite=1, prix_unitaire=plats[j].prix)
+            for c in commandes for j in (0, 1)
+        ])
+        session.commit()
+
+
+def test_liste_commandes_nombre_requetes_borne():
+    print("\n--- Test du nombre de requêtes pour la liste des commandes ---")
+    _peupler_commandes(1000)
+
+    with Session(engine) as session:
+        for taille in (100, 1000):
+            with compter_requetes() as requetes:
+                commandes = [CommandeRead.model_validate(c) for c in list_commandes(session, limit=taille)]
+            print(f"{taille} commandes sérialisées en {len(requetes)} requêtes")
+            assert len(commandes) == taille
+            assert all(c.client.utilisateur and c.table for c in commandes)
+            # selectinload découpe ses clauses IN par paquets de 500 clés
+            assert len(requetes) <= MAX_REQUETES_LISTE + taille // 500
+            session.expunge_all()
+    print("-> Nombre de requêtes constant quel que soit le volume.")
+
+
+def test_endpoint_liste_commandes_nombre_requetes_borne():
+    print("\n--- Test du nombre de requêtes de GET /commandes/ ---")
+    uid = str(uuid.uuid4())[:8]
+    with Session(engine) as session:
+        create_serveur_full(session, ServeurCreateFull(
+            nom="Liste", prenom="Serveur", email=f"liste-{uid}@test.com",
+            telephone=f"04{uid}", role="serveur", password="pass"
+        ))
+    login = client.post("/auth/token", data={"username": f"liste-{uid}@test.com", "password": "pass"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    _peupler_commandes(100)
+    with compter_requetes() as requetes:
+        res = client.get("/commandes/", headers=headers)
+    assert res.status_code == 200, res.text
+    print(f"GET /commandes/ : {len(res.json())} commandes en {len(requetes)} requêtes")
+    # + 1 requête pour charger l'utilisateur authentifié
+    assert len(requetes) <= MAX_REQUETES_LISTE + 1
+    print("-> Endpoint protégé contre les chargements N+1.")
+
+
+if __name__ == "__main__":
+    try:
+        test_liste_commandes_nombre_requetes_borne()
+        test_endpoint_liste_commandes_nombre_requetes_borne()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,163 @@
+import sys
+import os
+import asyncio
+import socket
+import uuid
+from datetime import datetime, timezone
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiosmtpd.controller import Controller
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.main import app
+from app.core.database import engine, async_engine, create_db_and_tables
+from app.models.email_sortant import EmailSortant, EmailStatut
+from app.services.email_service import mettre_en_file, etat_file
+from app.services.email_worker import ConnexionSMTP, traiter_lot
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+class BoiteStub:
+    """Serveur SMTP local : enregistre les messages et compte les connexions (EHLO)."""
+
+    def __init__(self):
+        self.messages = []
+        self.connexions = 0
+        self.codes_refus = {}
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connexions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.codes_refus:
+            return f"{self.codes_refus[address]} Destinataire refusé"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 Message accepted for delivery"
+
+
+def _port_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _vider_file(smtp: ConnexionSMTP, taille: int = 2):
+    """Traiter des lots jusqu'à ce qu'aucun email ne soit dû."""
+    async def scenario():
+        try:
+            while True:
+                async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                    if not (await traiter_lot(session, smtp, taille))["lus"]:
+                        return
+        finally:
+            await smtp.fermer()
+    asyncio.run(scenario())
+
+
+def _emails(destinataires):
+    with Session(engine) as session:
+        lignes = session.exec(select(EmailSortant).where(EmailSortant.destinataire.in_(destinataires))).all()
+        return {e.destinataire: e for e in lignes}
+
+
+def test_inscription_met_en_file():
+    print("\n--- Test de la mise en file à l'inscription ---")
+    uid = str(uuid.uuid4())[:8]
+    email = f"outbox-{uid}@test.com"
+    res = client.post("/clients/register", json={
+        "nom": "Outbox", "prenom": "Client", "email": email,
+        "telephone": f"0O{uid}", "role": "client", "password": "pass"
+    })
+    assert res.status_code == 200, res.text
+    ligne = _emails([email])[email]
+    assert ligne.statut == EmailStatut.EN_ATTENTE and ligne.tentatives == 0
+    assert "/auth/verify?token=" in ligne.corps_html
+    with Session(engine) as session:
+        assert etat_file(session)["en_attente"] >= 1
+    print("-> Email écrit dans la transaction de l'inscription.")
+
+
+def test_lots_sur_une_connexion():
+    print("\n--- Test de l'envoi par lots sur une connexion ---")
+    boite = BoiteStub()
+    controleur = Controller(boite, hostname="127.0.0.1", port=_port_libre())
+    controleur.start()
+    try:
+        destinataires = [f"lot-{uuid.uuid4().hex[:8]}@test.com" for _ in range(5)]
+        with Session(engine) as session:
+            for destinataire in destinataires:
+                mettre_en_file(session, destinataire, "Sujet", "<p>Bonjour</p>")
+            session.commit()
+
+        _vider_file(ConnexionSMTP("127.0.0.1", controleur.port), taille=2)
+    finally:
+        controleur.stop()
+
+    recus = {rcpt for env in boite.messages for rcpt in env.rcpt_tos}
+    assert set(destinataires) <= recus
+    # Plusieurs lots, une seule connexion SMTP
+    assert boite.connexions == 1
+    lignes = _emails(destinataires)
+    assert all(e.statut == EmailStatut.ENVOYE and e.date_envoi for e in lignes.values())
+    with Session(engine) as session:
+        assert etat_file(session)["dus"] == 0
+    print(f"-> {len(boite.messages)} emails envoyés en {boite.connexions} connexion.")
+
+
+def test_reprise_et_echec_definitif():
+    print("\n--- Test des reprises ---")
+    uid = uuid.uuid4().hex[:8]
+    temporaire, definitif, coupure = (f"{nom}-{uid}@test.com" for nom in ("temporaire", "definitif", "coupure"))
+    boite = BoiteStub()
+    boite.codes_refus = {temporaire: 450, definitif: 550}
+    controleur = Controller(boite, hostname="127.0.0.1", port=_port_libre())
+    controleur.start()
+    try:
+        with Session(engine) as session:
+            mettre_en_file(session, temporaire, "Sujet", "<p>1</p>")
+            mettre_en_file(session, definitif, "Sujet", "<p>2</p>")
+            session.commit()
+        _vider_file(ConnexionSMTP("127.0.0.1", controleur.port))
+    finally:
+        controleur.stop()
+
+    lignes = _emails([temporaire, definitif])
+    assert lignes[temporaire].statut == EmailStatut.EN_ATTENTE
+    assert lignes[temporaire].tentatives == 1
+    prochain = lignes[temporaire].prochain_essai
+    assert prochain.replace(tzinfo=prochain.tzinfo or timezone.utc) > datetime.now(timezone.utc)
+    assert "450" in lignes[temporaire].derniere_erreur
+    assert lignes[definitif].statut == EmailStatut.ECHEC
+
+    # Serveur injoignable : l'email est reprogrammé, pas perdu
+    with Session(engine) as session:
+        mettre_en_file(session, coupure, "Sujet", "<p>3</p>")
+        session.commit()
+    _vider_file(ConnexionSMTP("127.0.0.1", _port_libre(), delai=2))
+    ligne = _emails([coupure])[coupure]
+    assert ligne.statut == EmailStatut.EN_ATTENTE and ligne.tentatives == 1
+    print("-> 4xx et coupure reprogrammés, 5xx abandonné.")
+
+
+if __name__ == "__main__":
+    try:
+        test_inscription_met_en_file()
+        test_lots_sur_une_connexion()
+        test_reprise_et_echec_definitif()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,291 @@
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.main import app
+from app.core.database import engine, create_db_and_tables
+from app.models.categorie import Categorie
+from app.models.commande import Commande, CommandeStatus
+from app.models.paiement import PaymentMethod
+from app.models.plat import Plat
+from app.schemas.client_full import ClientCreateFull
+from app.schemas.commande import CommandeCreate, CommandeUpdate
+from app.schemas.ligne_commande import LigneCommandeItem, LigneCommandeUpdate
+from app.schemas.paiement import PaiementCreate
+from app.schemas.personnel_full import CuisinierCreateFull
+from app.schemas.table import TableCreate
+from app.services.client_service import create_client_full
+from app.services.personnel_service import create_cuisinier_full
+from app.services.table_service import create_table
+from app.services.commande_service import (
+    create_commande, valider_commande, transmettre_cuisine, marquer_prete,
+    transitionner_lot, update_commande, delete_commande,
+    add_lignes_commande, update_ligne_commande, delete_ligne_commande,
+)
+from app.services.cuisine_service import EntreeCuisine, FileCuisine, file_cuisine, lister_file_cuisine, tableau_production
+from app.services.paiement_service import process_payment
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+def test_ordre_de_priorite():
+    print("\n--- Test de l'ordre de la file de la cuisine ---")
+    t0 = datetime(2026, 5, 1, 19, 0, tzinfo=timezone.utc)
+    file = FileCuisine()
+    file.ajouter(EntreeCuisine(1, 1, t0, nombre_articles=1, temps_preparation_max=5))
+    file.ajouter(EntreeCuisine(2, 1, t0 + timedelta(minutes=2), nombre_articles=1, temps_preparation_max=5))
+    # Commande plus récente mais dont le plat le plus long demande 20 minutes
+    file.ajouter(EntreeCuisine(3, 2, t0 + timedelta(minutes=5), nombre_articles=2, temps_preparation_max=20))
+    assert [e.commande_id for e in file.lister()] == [3, 1, 2]
+
+    file.retirer(1)
+    file.ajouter(EntreeCuisine(2, 1, t0 + timedelta(minutes=2), nombre_articles=1, temps_preparation_max=5))
+    assert [e.commande_id for e in file.lister()] == [3, 2]
+    assert len(file) == 2
+    print("-> Attente, taille et temps de préparation combinés.")
+
+
+def test_file_suit_les_transitions():
+    print("\n--- Test de la file alimentée par les transitions ---")
+    uid = str(uuid.uuid4())[:8]
+    with Session(engine) as session:
+        create_cuisinier_full(session, CuisinierCreateFull(
+            nom="File", prenom="Cuisinier", email=f"file-{uid}@test.com",
+            telephone=f"0F{uid}", role="cuisinier", password="pass"
+        ))
+        c = create_client_full(session, ClientCreateFull(
+            nom="File", prenom="Client", email=f"file-client-{uid}@test.com",
+            telephone=f"0G{uid}", role="client", password="pass"
+        ))
+        table = create_table(session, TableCreate(numero_table=f"Q-{uid}", capacite=4))
+        categorie = Categorie(nom=f"File-{uid}")
+        session.add(categorie)
+        session.commit()
+        rapide = Plat(nom=f"Salade-{uid}", prix=2000, categorie_id=categorie.id, temps_preparation=5)
+        lent = Plat(nom=f"Braise-{uid}", prix=6000, categorie_id=categorie.id, temps_preparation=40)
+        session.add_all([rapide, lent])
+        session.commit()
+
+        ids = []
+        for plat in (rapide, lent):
+            commande = create_commande(session, CommandeCreate(
+                client_id=c.id, table_id=table.id, type_commande="sur_place",
+                lignes=[LigneCommandeItem(plat_id=plat.id, quantite=2)]
+            ))
+            valider_commande(session, commande.id, serveur_id=1)
+            ids.append(commande.id)
+
+    login = client.post("/auth/token", data={"username": f"file-{uid}@test.com", "password": "pass"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    # Première lecture : construction de la file depuis la base
+    assert client.get("/commandes/cuisine/queue", headers=headers).status_code == 200
+
+    with Session(engine) as session:
+        for commande_id in ids:
+            transmettre_cuisine(session, commande_id)
+
+    requetes = []
+    ecouteur = lambda *args: requetes.append(args[2])
+    event.listen(engine, "before_cursor_execute", ecouteur)
+    try:
+        res = client.get("/commandes/cuisine/queue", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", ecouteur)
+    assert res.status_code == 200, res.text
+    # Seul l'utilisateur authentifié est chargé : la file vient de la mémoire
+    assert not any("commande" in r.lower() for r in requetes)
+
+    file = [e["commande_id"] for e in res.json() if e["commande_id"] in ids]
+    assert file == [ids[1], ids[0]]
+    entree = next(e for e in res.json() if e["commande_id"] == ids[1])
+    assert entree["temps_preparation_max"] == 40 and entree["nombre_articles"] == 2
+
+    with Session(engine) as session:
+        marquer_prete(session, ids[1], cuisinier_id=1)
+    assert ids[1] not in [e.commande_id for e in file_cuisine.lister()]
+    print("-> Les commandes entrent et sortent de la file sans relecture.")
+
+
+def _commandes_validees(nombre: int):
+    uid = str(uuid.uuid4())[:8]
+    with Session(engine) as session:
+        c = create_client_full(session, ClientCreateFull(
+            nom="Lot", prenom="Client", email=f"lot-{uid}@test.com",
+            telephone=f"0L{uid}", role="client", password="pass"
+        ))
+        table = create_table(session, TableCreate(numero_table=f"L-{uid}", capacite=4))
+        categorie = Categorie(nom=f"Lot-{uid}")
+        session.add(categorie)
+        session.commit()
+        plat = Plat(nom=f"Garba-{uid}", prix=1500, categorie_id=categorie.id, temps_preparation=10)
+        session.add(plat)
+        session.commit()
+        ids = []
+        for _ in range(nombre):
+            commande = create_commande(session, CommandeCreate(
+                client_id=c.id, table_id=table.id, type_commande="sur_place",
+                lignes=[LigneCommandeItem(plat_id=plat.id, quantite=1)]
+            ))
+            valider_commande(session, commande.id, serveur_id=1)
+            ids.append(commande.id)
+        return ids, table.id, c.id
+
+
+def test_file_suit_paiements_modifications_suppressions():
+    print("\n--- Test de la file : lot, paiement, modification, suppression ---")
+    ids, _, _ = _commandes_validees(4)
+    with Session(engine) as session:
+        lister_file_cuisine(session)
+
+        # Un lot de transitions : un seul résumé des lignes, pas une relecture par commande
+        requetes = []
+        ecouteur = lambda *args: requetes.append(args[2])
+        event.listen(engine, "before_cursor_execute", ecouteur)
+        try:
+            transitionner_lot(session, ids, CommandeStatus.EN_COURS)
+        finally:
+            event.remove(engine, "before_cursor_execute", ecouteur)
+        # Résumé des commandes entrées en cuisine : une requête agrégée pour tout le lot
+        relectures = [r for r in requetes if "FROM lignecommande" in r]
+        assert len(relectures) == 1, relectures
+        en_file = {e.commande_id for e in file_cuisine.lister()}
+        assert set(ids) <= en_file
+
+        # Paiement direct, statut changé par PUT, suppression : la commande sort de la file
+        process_payment(session, PaiementCreate(commande_id=ids[0], montant=1500, methode_paiement=PaymentMethod.ESPECES))
+        update_commande(session, ids[1], CommandeUpdate(status=CommandeStatus.PRETE))
+        delete_commande(session, ids[2])
+        en_file = {e.commande_id for e in file_cuisine.lister()}
+        assert not en_file & set(ids[:3])
+        assert ids[3] in en_file
+    print("-> Toutes les écritures qui changent le statut mettent la file à jour.")
+
+
+def test_file_suit_les_lignes_sans_requete():
+    print("\n--- Test de la file : lignes ajoutées ou retirées en cuisine ---")
+    ids, _, _ = _commandes_validees(1)
+    commande_id = ids[0]
+    with Session(engine) as session:
+        lister_file_cuisine(session)
+        transmettre_cuisine(session, commande_id)
+        plat_id = session.get(Commande, commande_id).lignes[0].plat_id
+
+        def entree():
+            return next(e for e in file_cuisine.lister() if e.commande_id == commande_id)
+        assert entree().nombre_articles == 1
+
+        lignes = add_lignes_commande(session, commande_id, [LigneCommandeItem(plat_id=plat_id, quantite=3)])
+        assert entree().nombre_articles == 4
+        update_ligne_commande(session, commande_id, lignes[0].id, LigneCommandeUpdate(quantite=2))
+        assert entree().nombre_articles == 3
+        delete_ligne_commande(session, commande_id, lignes[0].id)
+        assert entree().nombre_articles == 1
+
+        # L'écouteur applique la charge utile : aucune requête dans la requête qui publie
+        evenement = {"event": "lignes_modifiees", "commande_id": commande_id, "status": CommandeStatus.EN_COURS,
+                     "table_id": entree().table_id, "date_commande": entree().date_commande.isoformat(),
+                     "nombre_articles": 7, "temps_preparation_max": 10}
+        requetes = []
+        ecouteur = lambda *args: requetes.append(args[2])
+        event.listen(engine, "before_cursor_execute", ecouteur)
+        try:
+            file_cuisine.sur_evenements([evenement])
+        finally:
+            event.remove(engine, "before_cursor_execute", ecouteur)
+        assert requetes == [] and entree().nombre_articles == 7
+    print("-> Les changements de lignes mettent à jour la priorité, sans relecture.")
+
+
+def test_file_reconstruite_apres_expiration():
+    print("\n--- Test de la reconstruction périodique de la file ---")
+    ids, table_id, client_id = _commandes_validees(1)
+    maintenant = [0.0]
+    file = FileCuisine(ttl=30, horloge=lambda: maintenant[0])
+    with Session(engine) as session:
+        file.assurer_a_jour(session)
+        # Écriture d'un autre processus : aucun événement dans celui-ci
+        session.get(Commande, ids[0]).status = CommandeStatus.EN_COURS
+        session.commit()
+
+        maintenant[0] = 29
+        file.assurer_a_jour(session)
+        assert ids[0] not in [e.commande_id for e in file.lister()]
+
+        maintenant[0] = 31
+        file.assurer_a_jour(session)
+        assert ids[0] in [e.commande_id for e in file.lister()]
+    print("-> Les écritures des autres processus apparaissent après expiration.")
+
+
+def test_tableau_production():
+    print("\n--- Test du tableau de production ---")
+    uid = str(uuid.uuid4())[:8]
+    with Session(engine) as session:
+        c = create_client_full(session, ClientCreateFull(
+            nom="Prod", prenom="Client", email=f"prod-{uid}@test.com",
+            telephone=f"0P{uid}", role="client", password="pass"
+        ))
+        table = create_table(session, TableCreate(numero_table=f"R-{uid}", capacite=4))
+        categorie = Categorie(nom=f"Prod-{uid}")
+        session.add(categorie)
+        session.commit()
+        poulet = Plat(nom=f"Poulet-{uid}", prix=3000, categorie_id=categorie.id)
+        alloco = Plat(nom=f"Alloco-{uid}", prix=1000, categorie_id=categorie.id)
+        session.add_all([poulet, alloco])
+        session.commit()
+
+        paniers = [
+            [LigneCommandeItem(plat_id=poulet.id, quantite=2), LigneCommandeItem(plat_id=alloco.id, quantite=1)],
+            [LigneCommandeItem(plat_id=poulet.id, quantite=1, notes_speciales="Sans piment")],
+            [LigneCommandeItem(plat_id=poulet.id, quantite=3, notes_speciales="Sans piment")],
+        ]
+        for panier in paniers:
+            commande = create_commande(session, CommandeCreate(
+                client_id=c.id, table_id=table.id, type_commande="sur_place", lignes=panier
+            ))
+            valider_commande(session, commande.id, serveur_id=1)
+            transmettre_cuisine(session, commande.id)
+        # Une commande seulement validée n'est pas encore en production
+        attente = create_commande(session, CommandeCreate(
+            client_id=c.id, table_id=table.id, type_commande="sur_place",
+            lignes=[LigneCommandeItem(plat_id=alloco.id, quantite=5)]
+        ))
+        valider_commande(session, attente.id, serveur_id=1)
+
+        requetes = []
+        ecouteur = lambda *args: requetes.append(args[2])
+        event.listen(engine, "before_cursor_execute", ecouteur)
+        try:
+            tableau = {p.plat_id: p for p in tableau_production(session)}
+        finally:
+            event.remove(engine, "before_cursor_execute", ecouteur)
+
+        assert len(requetes) == 1
+        assert tableau[poulet.id].quantite == 6
+        assert [(n.notes_speciales, n.quantite) for n in tableau[poulet.id].notes] == [("Sans piment", 4)]
+        assert tableau[alloco.id].quantite == 1
+    print("-> Totaux par plat calculés en une seule requête agrégée.")
+
+
+if __name__ == "__main__":
+    try:
+        test_ordre_de_priorite()
+        test_file_suit_les_transitions()
+        test_file_suit_paiements_modifications_suppressions()
+        test_file_suit_les_lignes_sans_requete()
+        test_file_reconstruite_apres_expiration()
+        test_tableau_production()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
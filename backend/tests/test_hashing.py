@@ -0,0 +1,96 @@
+import sys
+import os
+import asyncio
+import time
+import uuid
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from passlib.hash import argon2
+from sqlmodel import Session, select
+
+from app.main import app
+from app.core.database import engine, create_db_and_tables
+from app.models.utilisateur import Utilisateur
+from app.security.hashing import hash_password, verify_password, hash_password_async, verify_password_async, pwd_context
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+def test_hachage_async_compatible():
+    print("\n--- Test des variantes asynchrones du hachage ---")
+
+    async def scenario():
+        hache = await hash_password_async("secret")
+        assert await verify_password_async("secret", hache)
+        assert not await verify_password_async("autre", hache)
+        return hache
+
+    hache = asyncio.run(scenario())
+    assert verify_password("secret", hache)
+    assert asyncio.run(verify_password_async("secret", hash_password("secret")))
+    print("-> Hachages synchrones et asynchrones interchangeables.")
+
+
+def test_boucle_non_bloquee():
+    print("\n--- Test de la boucle pendant les vérifications ---")
+    hache = hash_password("secret")
+
+    async def scenario():
+        battements = []
+
+        async def metronome():
+            while True:
+                battements.append(time.perf_counter())
+                await asyncio.sleep(0.005)
+
+        tache = asyncio.create_task(metronome())
+        await asyncio.sleep(0)
+        await asyncio.gather(*(verify_password_async("secret", hache) for _ in range(8)))
+        tache.cancel()
+        return battements
+
+    battements = asyncio.run(scenario())
+    # Le métronome a continué de battre pendant les calculs Argon2
+    assert len(battements) > 2
+    print(f"-> {len(battements)} battements pendant 8 vérifications.")
+
+
+def test_rehash_a_la_connexion():
+    print("\n--- Test du re-hachage des anciens paramètres ---")
+    uid = str(uuid.uuid4())[:8]
+    email = f"rehash-{uid}@test.com"
+    client.post("/clients/register", json={
+        "nom": "Rehash", "prenom": "Client", "email": email,
+        "telephone": f"0R{uid}", "role": "client", "password": "pass"
+    })
+    # Hachage produit avec un coût plus faible que la configuration actuelle
+    ancien = argon2.using(time_cost=1, memory_cost=1024, parallelism=1).hash("pass")
+    with Session(engine) as session:
+        utilisateur = session.exec(select(Utilisateur).where(Utilisateur.email == email)).one()
+        utilisateur.hashed_password = ancien
+        session.add(utilisateur)
+        session.commit()
+    assert pwd_context.needs_update(ancien)
+
+    assert client.post("/auth/token", data={"username": email, "password": "pass"}).status_code == 200
+    with Session(engine) as session:
+        nouveau = session.exec(select(Utilisateur.hashed_password).where(Utilisateur.email == email)).one()
+    assert nouveau != ancien and not pwd_context.needs_update(nouveau)
+    assert client.post("/auth/token", data={"username": email, "password": "pass"}).status_code == 200
+    print("-> Hachage remplacé de façon transparente à la connexion.")
+
+
+if __name__ == "__main__":
+    try:
+        test_hachage_async_compatible()
+        test_boucle_non_bloquee()
+        test_rehash_a_la_connexion()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
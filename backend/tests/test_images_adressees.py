@@ -0,0 +1,165 @@
+import sys
+import os
+import io
+import uuid
+import random
+import threading
+import time
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlmodel import Session
+
+from app.main import app
+from app.core.database import engine, create_db_and_tables
+from app.schemas.categorie import CategorieCreate
+from app.schemas.personnel_full import GerantCreateFull
+from app.schemas.plat import PlatCreate, PlatUpdate
+from app.services.categorie_service import create_categorie
+from app.services.personnel_service import create_gerant_full
+from app.services.plat_service import _remplacer_image, create_plat, delete_plat, update_plat
+from app.services.storage_service import chemin_local, est_adressee, verrou_images
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+def _headers_gerant():
+    uid = str(uuid.uuid4())[:8]
+    email = f"adresse-{uid}@test.com"
+    with Session(engine) as session:
+        create_gerant_full(session, GerantCreateFull(
+            nom="Adresse", prenom="Admin", email=email, telephone=f"0A{uid}", role="gerant", password="pass"
+        ))
+    res = client.post("/auth/token", data={"username": email, "password": "pass"})
+    return {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+
+def _plat_ids(nombre: int) -> list[int]:
+    with Session(engine) as session:
+        categorie = create_categorie(session, CategorieCreate(nom=f"Adresse {uuid.uuid4().hex[:6]}"))
+        return [create_plat(session, PlatCreate(nom=f"Plat adresse {uuid.uuid4().hex[:6]}", prix=1000,
+                                                categorie_id=categorie.id)).id for _ in range(nombre)]
+
+
+def _png() -> bytes:
+    # Couleur aléatoire : contenu (donc nom de fichier) propre à chaque exécution
+    tampon = io.BytesIO()
+    couleur = tuple(random.randrange(256) for _ in range(3))
+    Image.new("RGB", (400, 300), couleur).save(tampon, "PNG")
+    return tampon.getvalue()
+
+
+def _envoyer(headers, plat_id: int, contenu: bytes) -> dict:
+    res = client.post(f"/plats/{plat_id}/image", headers=headers,
+                      files={"file": ("photo.png", contenu, "image/png")})
+    assert res.status_code == 200, res.text
+    return client.get(f"/plats/{plat_id}").json()
+
+
+def test_deduplication_et_references():
+    print("\n--- Test du stockage par contenu et du comptage des références ---")
+    headers = _headers_gerant()
+    plat_a, plat_b = _plat_ids(2)
+    contenu = _png()
+
+    # Même contenu pour deux plats : même URL, un seul fichier
+    a = _envoyer(headers, plat_a, contenu)
+    b = _envoyer(headers, plat_b, contenu)
+    image_url = a["image_url"]
+    assert est_adressee(image_url) and b["image_url"] == image_url
+    assert b["image_variantes"] == a["image_variantes"]
+    dossier = chemin_local(image_url).parent
+    assert len([f for f in os.listdir(dossier) if f.startswith(chemin_local(image_url).stem)]) == 6
+
+    # Le plat A change d'image : le fichier reste, le plat B le référence encore
+    nouveau = _envoyer(headers, plat_a, _png())
+    assert chemin_local(image_url).exists()
+    assert all(chemin_local(url).exists() for url in a["image_variantes"].values())
+
+    # Le plat B change aussi : plus aucune référence, fichier et variantes supprimés
+    _envoyer(headers, plat_b, _png())
+    assert not chemin_local(image_url).exists()
+    assert not any(chemin_local(url).exists() for url in a["image_variantes"].values())
+
+    # Suppression d'un plat : son image n'est plus référencée
+    res = client.delete(f"/plats/{plat_a}", headers=headers)
+    assert res.status_code in (200, 204), res.text
+    assert not chemin_local(nouveau["image_url"]).exists()
+    client.delete(f"/plats/{plat_b}", headers=headers)
+    print("-> Une image partagée n'est supprimée qu'avec sa dernière référence.")
+
+
+def test_liberation_sous_verrou():
+    print("\n--- Test de la suppression d'une image référencée entre-temps ---")
+    headers = _headers_gerant()
+    plat_a, plat_b = _plat_ids(2)
+    image_url = _envoyer(headers, plat_a, _png())["image_url"]
+
+    # Le plat A est supprimé pendant qu'un upload du même contenu référence le
+    # fichier pour le plat B : le compte des références attend ce commit
+    def supprimer():
+        with Session(engine) as session:
+            delete_plat(session, plat_a)
+
+    with verrou_images:
+        suppression = threading.Thread(target=supprimer)
+        suppression.start()
+        time.sleep(0.2)
+        assert suppression.is_alive()
+        with Session(engine) as session:
+            update_plat(session, plat_b, PlatUpdate(image_url=image_url))
+    suppression.join()
+    assert chemin_local(image_url).exists()
+
+    # Plat disparu avant l'enregistrement : le fichier reçu n'est pas mis en place
+    partiel = chemin_local(image_url).parent / f"{uuid.uuid4().hex}.part"
+    partiel.write_bytes(b"contenu")
+    autre_url = image_url.rsplit("/", 1)[0] + f"/{uuid.uuid4().hex}.png"
+    with Session(engine) as session:
+        assert _remplacer_image(session, 999999999, partiel, autre_url) is None
+    assert not chemin_local(autre_url).exists()
+    partiel.unlink()
+    client.delete(f"/plats/{plat_b}", headers=headers)
+    assert not chemin_local(image_url).exists()
+    print("-> Une image référencée pendant sa libération reste sur le disque.")
+
+
+def test_cache_immuable():
+    print("\n--- Test des en-têtes de cache des fichiers statiques ---")
+    headers = _headers_gerant()
+    (plat_id,) = _plat_ids(1)
+    plat = _envoyer(headers, plat_id, _png())
+
+    for url in [plat["image_url"], plat["image_variantes"]["miniature_webp"]]:
+        res = client.get(url)
+        assert res.status_code == 200
+        assert res.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+    # Ancien nom (non adressé) : revalidation classique par ETag
+    ancien = chemin_local(plat["image_url"]).with_name(f"ancien_{uuid.uuid4().hex}.png")
+    ancien.write_bytes(_png())
+    try:
+        res = client.get(f"/static/uploads/plats/{ancien.name}")
+        assert res.status_code == 200
+        assert "immutable" not in res.headers.get("cache-control", "")
+        res = client.get(f"/static/uploads/plats/{ancien.name}", headers={"If-None-Match": res.headers["etag"]})
+        assert res.status_code == 304
+    finally:
+        ancien.unlink()
+        client.delete(f"/plats/{plat_id}", headers=headers)
+    print("-> Fichiers adressés immuables, anciens noms revalidés.")
+
+
+if __name__ == "__main__":
+    try:
+        test_deduplication_et_references()
+        test_liberation_sous_verrou()
+        test_cache_immuable()
+        print("\n✅ TOUS LES TESTS D'IMAGES ADRESSÉES ONT RÉUSSI !")
+    except AssertionError as e:
+        print(f"\n❌ ÉCHEC DU TEST : {e}")
+        sys.exit(1)
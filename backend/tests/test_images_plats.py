@@ -0,0 +1,117 @@
+import sys
+import os
+import io
+import uuid
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlmodel import Session
+
+from app.main import app
+from app.core.config import settings
+from app.core.database import engine, create_db_and_tables
+from app.schemas.categorie import CategorieCreate
+from app.schemas.personnel_full import GerantCreateFull
+from app.schemas.plat import PlatCreate
+from app.services.categorie_service import create_categorie
+from app.services.personnel_service import create_gerant_full
+from app.services.plat_service import create_plat
+from app.services.storage_service import chemin_local, delete_old_image
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+def _headers_gerant():
+    uid = str(uuid.uuid4())[:8]
+    email = f"images-{uid}@test.com"
+    with Session(engine) as session:
+        create_gerant_full(session, GerantCreateFull(
+            nom="Images", prenom="Admin", email=email, telephone=f"0G{uid}", role="gerant", password="pass"
+        ))
+    res = client.post("/auth/token", data={"username": email, "password": "pass"})
+    return {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+
+def _plat_id() -> int:
+    with Session(engine) as session:
+        categorie = create_categorie(session, CategorieCreate(nom=f"Photos {uuid.uuid4().hex[:6]}"))
+        return create_plat(session, PlatCreate(nom=f"Plat photo {uuid.uuid4().hex[:6]}", prix=1000,
+                                               categorie_id=categorie.id)).id
+
+
+def _png(largeur: int, hauteur: int) -> bytes:
+    tampon = io.BytesIO()
+    Image.new("RGB", (largeur, hauteur), (200, 120, 40)).save(tampon, "PNG")
+    return tampon.getvalue()
+
+
+def test_upload_et_variantes():
+    print("\n--- Test de l'upload d'image et des variantes ---")
+    headers = _headers_gerant()
+    plat_id = _plat_id()
+    res = client.post(f"/plats/{plat_id}/image", headers=headers,
+                      files={"file": ("photo.jpeg", _png(1600, 1200), "image/png")})
+    assert res.status_code == 200, res.text
+    image_url = res.json()["image_url"]
+    # Extension d'après le contenu, pas d'après le nom envoyé
+    assert image_url.endswith(".png")
+
+    # La tâche de fond a tourné dans le pool de processus
+    plat = client.get(f"/plats/{plat_id}").json()
+    variantes = plat["image_variantes"]
+    assert set(variantes) == {"miniature", "miniature_webp", "moyenne", "moyenne_webp", "webp"}
+    with Image.open(chemin_local(variantes["miniature"])) as miniature:
+        assert miniature.size == (320, 240) and miniature.format == "JPEG"
+    with Image.open(chemin_local(variantes["moyenne_webp"])) as moyenne:
+        assert moyenne.size == (960, 720) and moyenne.format == "WEBP"
+    assert os.path.getsize(chemin_local(variantes["miniature_webp"])) < os.path.getsize(chemin_local(image_url))
+
+    # Nouvelle image : l'ancienne et ses variantes sont supprimées du disque
+    res = client.post(f"/plats/{plat_id}/image", headers=headers,
+                      files={"file": ("photo.png", _png(400, 300), "image/png")})
+    assert res.status_code == 200
+    assert not chemin_local(image_url).exists()
+    assert not any(chemin_local(url).exists() for url in variantes.values())
+    nouveau = client.get(f"/plats/{plat_id}").json()
+    delete_old_image(nouveau["image_url"], nouveau["image_variantes"])
+    print("-> Original enregistré, 5 variantes générées, anciennes images supprimées.")
+
+
+def test_upload_refuse():
+    print("\n--- Test des uploads refusés ---")
+    headers = _headers_gerant()
+    plat_id = _plat_id()
+    dossier = chemin_local("/static/uploads/plats/x").parent
+    avant = set(os.listdir(dossier)) if dossier.exists() else set()
+
+    res = client.post(f"/plats/{plat_id}/image", headers=headers,
+                      files={"file": ("notes.png", b"pas une image", "image/png")})
+    assert res.status_code == 400
+
+    taille_max = settings.IMAGE_TAILLE_MAX_OCTETS
+    settings.IMAGE_TAILLE_MAX_OCTETS = 100 * 1024
+    try:
+        res = client.post(f"/plats/{plat_id}/image", headers=headers,
+                          files={"file": ("grande.png", _png(10, 10) + os.urandom(200 * 1024), "image/png")})
+    finally:
+        settings.IMAGE_TAILLE_MAX_OCTETS = taille_max
+    assert res.status_code == 413
+    # Rien n'est resté sur le disque, pas même un fichier partiel
+    assert set(os.listdir(dossier)) == avant
+    assert client.get(f"/plats/{plat_id}").json()["image_url"] is None
+    print("-> Contenu invalide : 400 ; taille dépassée : 413.")
+
+
+if __name__ == "__main__":
+    try:
+        test_upload_et_variantes()
+        test_upload_refuse()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
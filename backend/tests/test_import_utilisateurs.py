@@ -0,0 +1,117 @@
+import sys
+import os
+import uuid
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.main import app
+from app.core.database import engine, create_db_and_tables
+from app.models.client import Client
+from app.models.cuisinier import Cuisinier
+from app.models.serveur import Serveur
+from app.models.utilisateur import Utilisateur
+from app.schemas.personnel_full import GerantCreateFull
+from app.services.personnel_service import create_gerant_full
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+def _headers_gerant():
+    uid = str(uuid.uuid4())[:8]
+    email = f"import-admin-{uid}@test.com"
+    with Session(engine) as session:
+        create_gerant_full(session, GerantCreateFull(
+            nom="Import", prenom="Admin", email=email, telephone=f"0I{uid}", role="gerant", password="pass"
+        ))
+    res = client.post("/auth/token", data={"username": email, "password": "pass"})
+    return {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+
+def _emails_en_base(emails):
+    with Session(engine) as session:
+        return set(session.exec(select(Utilisateur.email).where(Utilisateur.email.in_(emails))).all())
+
+
+def test_import_csv_plusieurs_roles():
+    print("\n--- Test de l'import CSV ---")
+    headers = _headers_gerant()
+    uid = uuid.uuid4().hex[:8]
+    csv = (
+        "nom;prenom;email;telephone;role;password\n"
+        f"Dupont;Ana;serveur-{uid}@test.com;1S{uid};serveur;pass\n"
+        f"Martin;Léo;cuisinier-{uid}@test.com;1C{uid};Cuisinier;pass\n"
+        f"Durand;Zoé;client-{uid}@test.com;1K{uid};client;pass\n"
+    )
+    res = client.post(
+        "/admin/import/utilisateurs/csv", headers=headers,
+        files={"fichier": ("equipe.csv", csv.encode("utf-8"), "text/csv")},
+    )
+    assert res.status_code == 200, res.text
+    data = res.json()
+    assert data["total"] == 3 and data["crees"] == 3 and data["erreurs"] == []
+    profils = {c["role"]: c["profil_id"] for c in data["comptes"]}
+    with Session(engine) as session:
+        assert session.get(Serveur, profils["serveur"]).personnel.utilisateur.email == f"serveur-{uid}@test.com"
+        assert session.get(Cuisinier, profils["cuisinier"]) is not None
+        assert session.get(Client, profils["client"]).utilisateur_id is not None
+
+    # Les comptes importés peuvent se connecter
+    login = client.post("/auth/token", data={"username": f"cuisinier-{uid}@test.com", "password": "pass"})
+    assert login.status_code == 200, login.text
+    print("-> 3 comptes créés (serveur, cuisinier, client).")
+
+
+def test_import_rejete_sans_rien_creer():
+    print("\n--- Test du rejet d'un import invalide ---")
+    headers = _headers_gerant()
+    uid = uuid.uuid4().hex[:8]
+    lignes = [
+        {"nom": "A", "prenom": "A", "email": f"ok-{uid}@test.com", "telephone": f"2A{uid}", "role": "serveur", "password": "pass"},
+        {"nom": "B", "prenom": "B", "email": f"ok-{uid}@test.com", "telephone": f"2B{uid}", "role": "serveur", "password": "pass"},
+        {"nom": "C", "prenom": "C", "email": f"c-{uid}@test.com", "telephone": f"2C{uid}", "role": "plongeur", "password": "pass"},
+        {"nom": "D", "email": f"d-{uid}@test.com", "telephone": f"2D{uid}", "role": "client", "password": "pass"},
+    ]
+    res = client.post("/admin/import/utilisateurs", json=lignes, headers=headers)
+    assert res.status_code == 422, res.text
+    detail = res.json()["detail"]
+    assert detail["crees"] == 0
+    erreurs = {e["ligne"]: e["erreurs"] for e in detail["erreurs"]}
+    assert set(erreurs) == {2, 3, 4}
+    assert any("ligne 1" in e for e in erreurs[2])
+    assert any("role" in e for e in erreurs[3])
+    assert any("prenom" in e for e in erreurs[4])
+    assert not _emails_en_base([f"ok-{uid}@test.com"])
+
+    # Mode tolérant : les lignes valides sont créées, les autres signalées
+    res = client.post("/admin/import/utilisateurs", json=lignes, params={"ignorer_erreurs": True}, headers=headers)
+    assert res.status_code == 200, res.text
+    assert res.json()["crees"] == 1 and len(res.json()["erreurs"]) == 3
+    assert _emails_en_base([f"ok-{uid}@test.com"]) == {f"ok-{uid}@test.com"}
+
+    # Les comptes existants sont détectés avant écriture
+    res = client.post("/admin/import/utilisateurs", json=lignes[:1], headers=headers)
+    assert res.status_code == 422
+    assert "email: déjà utilisé" in res.json()["detail"]["erreurs"][0]["erreurs"]
+    print("-> Erreurs par ligne, aucune écriture partielle.")
+
+
+def test_import_reserve_au_gerant():
+    res = client.post("/admin/import/utilisateurs", json=[])
+    assert res.status_code == 401
+
+
+if __name__ == "__main__":
+    try:
+        test_import_csv_plusieurs_roles()
+        test_import_rejete_sans_rien_creer()
+        test_import_reserve_au_gerant()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
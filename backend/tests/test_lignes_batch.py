@@ -0,0 +1,133 @@
+import sys
+import os
+import uuid
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.main import app
+from app.core.database import engine, create_db_and_tables
+from app.models.categorie import Categorie
+from app.models.menu import Menu
+from app.models.plat import Plat
+from app.schemas.client_full import ClientCreateFull
+from app.schemas.commande import CommandeCreate
+from app.schemas.ligne_commande import LigneCommandeItem
+from app.schemas.table import TableCreate
+from app.services.client_service import create_client_full
+from app.services.table_service import create_table
+from app.services.commande_service import create_commande, add_lignes_commande
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+def _preparer_commande(session: Session):
+    uid = str(uuid.uuid4())[:8]
+    c = create_client_full(session, ClientCreateFull(
+        nom="Batch", prenom="Client", email=f"batch-{uid}@test.com",
+        telephone=f"08{uid}", role="client", password="pass"
+    ))
+    table = create_table(session, TableCreate(numero_table=f"B-{uid}", capacite=4))
+    categorie = Categorie(nom=f"Cat-{uid}")
+    session.add(categorie)
+    session.commit()
+    plat_a = Plat(nom=f"Poulet-{uid}", prix=3000, categorie_id=categorie.id)
+    plat_b = Plat(nom=f"Attieke-{uid}", prix=1500, categorie_id=categorie.id)
+    menu = Menu(nom=f"Formule-{uid}", prix_fixe=5000)
+    session.add_all([plat_a, plat_b, menu])
+    session.commit()
+    commande = create_commande(session, CommandeCreate(
+        client_id=c.id, table_id=table.id, montant_total=0, type_commande="sur_place"
+    ))
+    return commande, plat_a, plat_b, menu
+
+
+def test_add_lignes_commande_une_transaction():
+    print("\n--- Test de l'ajout groupé de lignes ---")
+    with Session(engine) as session:
+        commande, plat_a, plat_b, menu = _preparer_commande(session)
+
+        commits = []
+        event.listen(session, "after_commit", lambda s: commits.append(1))
+        lignes = add_lignes_commande(session, commande.id, [
+            LigneCommandeItem(plat_id=plat_a.id, quantite=2),
+            LigneCommandeItem(plat_id=plat_b.id, quantite=1, notes_speciales="Sans piment"),
+            LigneCommandeItem(menu_id=menu.id, quantite=1),
+            LigneCommandeItem(plat_id=plat_b.id, quantite=1, prix_unitaire=1200),
+        ])
+
+        assert len(commits) == 1
+        assert [l.prix_unitaire for l in lignes] == [3000, 1500, 5000, 1200]
+        session.refresh(commande)
+        assert commande.montant_total == 2 * 3000 + 1500 + 5000 + 1200
+    print("-> Lignes insérées et total mis à jour en un seul commit.")
+
+
+def test_lignes_batch_endpoint():
+    print("\n--- Test de l'endpoint POST /commandes/{id}/lignes/batch ---")
+    with Session(engine) as session:
+        commande, plat_a, plat_b, _ = _preparer_commande(session)
+        commande_id, plat_a_id, plat_b_id = commande.id, plat_a.id, plat_b.id
+
+    res = client.post(f"/commandes/{commande_id}/lignes/batch", json=[
+        {"plat_id": plat_a_id, "quantite": 1},
+        {"plat_id": plat_b_id, "quantite": 3},
+    ])
+    assert res.status_code == 200, res.text
+    data = res.json()
+    assert len(data) == 2
+    assert data[1]["plat"]["id"] == plat_b_id
+
+    res = client.post("/commandes/999999999/lignes/batch", json=[{"plat_id": plat_a_id, "quantite": 1}])
+    assert res.status_code == 404
+    print("-> Endpoint opérationnel.")
+
+
+def test_create_commande_avec_lignes():
+    print("\n--- Test de la création d'une commande avec ses lignes ---")
+    uid = str(uuid.uuid4())[:8]
+    with Session(engine) as session:
+        _, plat_a, plat_b, menu = _preparer_commande(session)
+        table = create_table(session, TableCreate(numero_table=f"N-{uid}", capacite=2))
+        plat_a_id, plat_b_id, menu_id, table_id = plat_a.id, plat_b.id, menu.id, table.id
+
+    client.post("/clients/register", json={
+        "nom": "Nested", "prenom": "Client", "email": f"nested-{uid}@test.com",
+        "telephone": f"09{uid}", "role": "client", "password": "pass"
+    })
+    login = client.post("/auth/token", data={"username": f"nested-{uid}@test.com", "password": "pass"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    res = client.post("/commandes/", headers=headers, json={
+        "client_id": 0,
+        "table_id": table_id,
+        "type_commande": "sur_place",
+        "lignes": [
+            {"plat_id": plat_a_id, "quantite": 2},
+            {"plat_id": plat_b_id, "quantite": 1, "notes_speciales": "Bien cuit"},
+            {"menu_id": menu_id, "quantite": 1},
+        ]
+    })
+    assert res.status_code == 200, res.text
+    data = res.json()
+    assert data["status"] == "en_attente"
+    assert data["montant_total"] == 2 * 3000 + 1500 + 5000
+    assert len(data["lignes"]) == 3
+    print("-> Commande, lignes et total persistés en un seul appel.")
+
+
+if __name__ == "__main__":
+    try:
+        test_add_lignes_commande_une_transaction()
+        test_lignes_batch_endpoint()
+        test_create_commande_avec_lignes()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
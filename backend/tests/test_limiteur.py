@@ -0,0 +1,88 @@
+import sys
+import os
+import asyncio
+import uuid
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.database import create_db_and_tables
+from app.security import hashing
+from app.security.limiteur import SeauxMemoire, limiteur_connexions
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+def test_seau_a_jetons():
+    print("\n--- Test du seau à jetons ---")
+    maintenant = [0.0]
+    seaux = SeauxMemoire(taille_max=10, horloge=lambda: maintenant[0])
+
+    async def consommer():
+        return await seaux.consommer("cle", capacite=2, debit=0.5)
+
+    assert asyncio.run(consommer()) == 0
+    assert asyncio.run(consommer()) == 0
+    assert asyncio.run(consommer()) == 2.0   # un jeton toutes les 2 secondes
+    maintenant[0] = 2.0
+    assert asyncio.run(consommer()) == 0
+    print("-> Rafale consommée, puis un jeton par période.")
+
+
+def test_limite_par_email():
+    print("\n--- Test de la limite par email ---")
+    uid = str(uuid.uuid4())[:8]
+    email = f"limite-{uid}@test.com"
+    client.post("/clients/register", json={
+        "nom": "Limite", "prenom": "Client", "email": email,
+        "telephone": f"0L{uid}", "role": "client", "password": "pass"
+    })
+    # Une adresse dédiée : le seau de l'IP du TestClient n'est pas entamé
+    attaquant = TestClient(app, client=("10.1.0.1", 50000))
+
+    for _ in range(limiteur_connexions.capacite_email):
+        res = attaquant.post("/auth/token", data={"username": email, "password": "mauvais"})
+        assert res.status_code == 401
+
+    verifications = hashing._mesures["verifications"]
+    evitees = limiteur_connexions.statistiques()["verifications_evitees"]
+    res = attaquant.post("/auth/token", data={"username": email.upper(), "password": "pass"})
+    assert res.status_code == 429, res.text
+    assert int(res.headers["Retry-After"]) >= 1
+    # Refus avant le calcul Argon2
+    assert hashing._mesures["verifications"] == verifications
+    assert limiteur_connexions.statistiques()["verifications_evitees"] == evitees + 1
+    print(f"-> 429, Retry-After={res.headers['Retry-After']}s, aucune vérification Argon2.")
+
+
+def test_limite_par_ip():
+    print("\n--- Test de la limite par adresse IP ---")
+    attaquant = TestClient(app, client=("10.2.0.1", 50000))
+    refus = limiteur_connexions.refus_ip
+    for i in range(limiteur_connexions.capacite_ip):
+        email = f"inconnu-{i}-{uuid.uuid4().hex[:6]}@test.com"
+        assert attaquant.post("/auth/token", data={"username": email, "password": "x"}).status_code == 401
+
+    res = attaquant.post("/auth/token", data={"username": "autre@test.com", "password": "x"})
+    assert res.status_code == 429
+    assert "Retry-After" in res.headers
+    assert limiteur_connexions.refus_ip == refus + 1
+    # Les autres adresses ne sont pas concernées
+    assert client.post("/auth/token", data={"username": "autre@test.com", "password": "x"}).status_code == 401
+    print("-> Emails variés depuis une même IP : limités par le seau de l'IP.")
+
+
+if __name__ == "__main__":
+    try:
+        test_seau_a_jetons()
+        test_limite_par_email()
+        test_limite_par_ip()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,138 @@
+import sys
+import os
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.main import app
+from app.core.database import engine, create_db_and_tables
+from app.models.commande import Commande
+from app.schemas.ligne_commande import LigneCommandeCreate, LigneCommandeItem
+from app.services.commande_service import add_ligne_commande, add_lignes_commande, update_montant_total
+from app.services.paiement_service import get_addition
+
+from test_lignes_batch import _preparer_commande
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+def _montant(commande_id: int) -> int:
+    with Session(engine) as session:
+        return session.get(Commande, commande_id).montant_total
+
+
+def test_ajouts_concurrents_cumules():
+    print("\n--- Test des ajouts de lignes depuis deux sessions ---")
+    with Session(engine) as session:
+        commande, plat_a, plat_b, _ = _preparer_commande(session)
+        commande_id, plat_a_id, plat_b_id = commande.id, plat_a.id, plat_b.id
+
+    # Deux sessions qui ont chacune chargé la commande avant l'ajout de l'autre
+    with Session(engine) as s1, Session(engine) as s2:
+        s1.get(Commande, commande_id)
+        s2.get(Commande, commande_id)
+        add_ligne_commande(s1, LigneCommandeCreate(commande_id=commande_id, plat_id=plat_a_id, quantite=1, prix_unitaire=0))
+        add_lignes_commande(s2, commande_id, [LigneCommandeItem(plat_id=plat_b_id, quantite=2)])
+
+    assert _montant(commande_id) == 3000 + 2 * 1500
+    print("-> Aucun ajout n'écrase le total de l'autre.")
+
+
+def test_modification_et_suppression_ligne():
+    print("\n--- Test de la modification et de la suppression d'une ligne ---")
+    with Session(engine) as session:
+        commande, plat_a, plat_b, _ = _preparer_commande(session)
+        lignes = add_lignes_commande(session, commande.id, [
+            LigneCommandeItem(plat_id=plat_a.id, quantite=1),
+            LigneCommandeItem(plat_id=plat_b.id, quantite=1),
+        ])
+        commande_id, ligne_a_id, ligne_b_id = commande.id, lignes[0].id, lignes[1].id
+
+    res = client.put(f"/commandes/{commande_id}/lignes/{ligne_a_id}", json={"quantite": 3})
+    assert res.status_code == 200, res.text
+    assert _montant(commande_id) == 3 * 3000 + 1500
+
+    res = client.delete(f"/commandes/{commande_id}/lignes/{ligne_b_id}")
+    assert res.status_code == 200, res.text
+    assert _montant(commande_id) == 3 * 3000
+
+    res = client.delete(f"/commandes/{commande_id + 1}/lignes/{ligne_a_id}")
+    assert res.status_code == 404
+    print("-> Le total suit chaque variation de ligne.")
+
+
+def test_addition_une_requete():
+    print("\n--- Test du calcul de l'addition ---")
+    with Session(engine) as session:
+        commande, plat_a, _, menu = _preparer_commande(session)
+        add_lignes_commande(session, commande.id, [
+            LigneCommandeItem(plat_id=plat_a.id, quantite=2),
+            LigneCommandeItem(menu_id=menu.id, quantite=1),
+        ])
+        commande_id = commande.id
+
+        requetes = []
+        ecouteur = lambda *args: requetes.append(args[2])
+        event.listen(engine, "before_cursor_execute", ecouteur)
+        try:
+            total = get_addition(session, commande_id)
+        finally:
+            event.remove(engine, "before_cursor_execute", ecouteur)
+
+        assert total == 2 * 3000 + 5000
+        assert len(requetes) == 1
+
+        # Le recalcul complet reste disponible et retombe sur la même valeur
+        update_montant_total(session, commande_id)
+    assert _montant(commande_id) == 2 * 3000 + 5000
+    print("-> Addition lue en une seule requête.")
+
+
+def test_prix_fractionnaire():
+    print("\n--- Test des modifications d'une ligne à prix fractionnaire ---")
+    with Session(engine) as session:
+        commande, plat_a, _, _ = _preparer_commande(session)
+        ligne = add_ligne_commande(session, LigneCommandeCreate(
+            commande_id=commande.id, plat_id=plat_a.id, quantite=1, prix_unitaire=12.5))
+        commande_id, ligne_id = commande.id, ligne.id
+
+    # 12,5 -> 13 ; 3 x 12,5 = 37,5 -> 38 ; 2 x 12,5 = 25
+    attendus = {1: 13, 3: 38, 2: 25, 5: 63}
+    for quantite in [3, 2, 5]:
+        res = client.put(f"/commandes/{commande_id}/lignes/{ligne_id}", json={"quantite": quantite})
+        assert res.status_code == 200, res.text
+        assert _montant(commande_id) == attendus[quantite]
+
+    # Le recalcul complet retombe exactement sur le total incrémental
+    with Session(engine) as session:
+        update_montant_total(session, commande_id)
+    assert _montant(commande_id) == attendus[5]
+    # L'addition est celle du total stocké, pas la somme brute 5 x 12,5 = 62,5
+    with Session(engine) as session:
+        assert get_addition(session, commande_id) == attendus[5]
+
+    # Quantité explicitement nulle : refusée, le total est inchangé
+    res = client.put(f"/commandes/{commande_id}/lignes/{ligne_id}", json={"quantite": None})
+    assert res.status_code == 422
+    res = client.put(f"/commandes/{commande_id}/lignes/{ligne_id}", json={"notes_speciales": "sans piment"})
+    assert res.status_code == 200 and res.json()["quantite"] == 5
+    assert _montant(commande_id) == attendus[5]
+    print("-> Le total incrémental ne dérive pas de la somme des lignes.")
+
+
+if __name__ == "__main__":
+    try:
+        test_ajouts_concurrents_cumules()
+        test_modification_et_suppression_ligne()
+        test_addition_une_requete()
+        test_prix_fractionnaire()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
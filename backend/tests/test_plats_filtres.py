@@ -0,0 +1,103 @@
+import sys
+import os
+import uuid
+from contextlib import contextmanager
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session, text
+
+from app.main import app
+from app.routers.chat import _contexte_plats
+from app.core.database import engine, create_db_and_tables
+from app.schemas.categorie import CategorieCreate
+from app.schemas.plat import PlatCreate
+from app.services.categorie_service import create_categorie
+from app.services.plat_service import create_plat, list_plats
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+@contextmanager
+def compter_requetes():
+    requetes = []
+    ecouteur = lambda *args: requetes.append(args[2])
+    event.listen(engine, "before_cursor_execute", ecouteur)
+    try:
+        yield requetes
+    finally:
+        event.remove(engine, "before_cursor_execute", ecouteur)
+
+
+def _peupler():
+    uid = uuid.uuid4().hex[:6]
+    with Session(engine) as session:
+        categorie = create_categorie(session, CategorieCreate(nom=f"Desserts {uid}"))
+        for nom, prix, disponible in [("Flan", 1500, True), ("Crêpe", 1000, True),
+                                      ("Gâteau", 2500, False), ("Tarte", 2000, True)]:
+            create_plat(session, PlatCreate(nom=f"{nom} {uid}", prix=prix, categorie_id=categorie.id,
+                                            disponible=disponible))
+        return uid, categorie.id
+
+
+def test_filtres_liste_plats():
+    print("\n--- Test des filtres de GET /plats/ ---")
+    uid, categorie_id = _peupler()
+
+    def noms(**params):
+        res = client.get("/plats/", params={"categorie_id": categorie_id, **params})
+        assert res.status_code == 200, res.text
+        return [p["nom"].split()[0] for p in res.json()]
+
+    assert noms(tri="nom") == ["Crêpe", "Flan", "Gâteau", "Tarte"]
+    assert noms(disponible=True, tri="prix") == ["Crêpe", "Flan", "Tarte"]
+    assert noms(prix_min=1500, prix_max=2000, tri="-prix") == ["Tarte", "Flan"]
+    assert noms(tri="prix", skip=1, limit=2) == ["Flan", "Tarte"]
+    assert client.get("/plats/", params={"prix_min": 3000, "prix_max": 1000}).status_code == 400
+    assert client.get("/plats/", params={"tri": "calories"}).status_code == 422
+    print("-> Filtres, tri et pagination appliqués en SQL.")
+
+
+def test_categorie_chargee_dans_la_meme_requete():
+    print("\n--- Test du chargement de la catégorie ---")
+    uid, categorie_id = _peupler()
+    with Session(engine) as session:
+        with compter_requetes() as requetes:
+            plats = list_plats(session, categorie_id=categorie_id)
+        # La liste ne joint pas la catégorie, que PlatRead n'expose pas
+        assert len(plats) == 4
+        assert len(requetes) == 1 and "categorie." not in requetes[0], requetes
+
+        with compter_requetes() as requetes:
+            contexte = _contexte_plats(session)
+    # Le contexte du chat est limité aux premiers plats : nos plats n'y sont pas forcément
+    assert contexte and all(p["categorie"] for p in contexte)
+    assert {p["categorie"] for p in contexte if p["nom"].endswith(uid)} <= {f"Desserts {uid}"}
+    assert len(requetes) == 2, requetes
+    print("-> Liste sans jointure ; le chat lit les catégories en une requête (pas de N+1).")
+
+
+def test_index_categorie_utilise():
+    with Session(engine) as session:
+        plan = session.exec(text(
+            "EXPLAIN QUERY PLAN SELECT * FROM plat WHERE categorie_id = 1 AND disponible = 1 "
+            "ORDER BY prix, id LIMIT 100"
+        )).all()
+    details = " ".join(str(ligne[-1]) for ligne in plan)
+    assert "ix_plat_categorie_disponible_prix" in details, details
+
+
+if __name__ == "__main__":
+    try:
+        test_filtres_liste_plats()
+        test_categorie_chargee_dans_la_meme_requete()
+        test_index_categorie_utilise()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,156 @@
+import sys
+import os
+import uuid
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.main import app
+from app.core.config import settings
+from app.core.database import engine, async_engine, create_db_and_tables
+from app.schemas.client import ClientCreate
+from app.schemas.cuisinier import cuisinierCreate
+from app.schemas.personnel_full import ServeurCreateFull
+from app.schemas.table import TableCreate
+from app.schemas.utilisateur import UtilisateurUpdate
+from app.services.admin_service import toggle_user_active_status
+from app.services.client_service import create_client, get_client_by_utilisateur_id
+from app.services.personnel_service import create_cuisinier, create_serveur_full, get_serveur_by_utilisateur_id
+from app.services.table_service import create_table
+from app.services.utilisateur_service import update_utilisateur
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+def _connexion(email: str, password: str = "pass"):
+    login = client.post("/auth/token", data={"username": email, "password": password})
+    assert login.status_code == 200, login.text
+    return login.json()["access_token"]
+
+
+def _client_inscrit(prefixe: str):
+    uid = str(uuid.uuid4())[:8]
+    email = f"{prefixe}-{uid}@test.com"
+    client.post("/clients/register", json={
+        "nom": "Principal", "prenom": "Client", "email": email,
+        "telephone": f"0P{uid}", "role": "client", "password": "pass"
+    })
+    return email
+
+
+def test_claims_du_jeton():
+    print("\n--- Test des claims du jeton ---")
+    email = _client_inscrit("claims")
+    claims = jwt.decode(_connexion(email), settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+    uid = str(uuid.uuid4())[:8]
+    with Session(engine) as session:
+        serveur = create_serveur_full(session, ServeurCreateFull(
+            nom="Principal", prenom="Serveur", email=f"serveur-{uid}@test.com",
+            telephone=f"0Q{uid}", role="serveur", password="pass"
+        ))
+        serveur_id = get_serveur_by_utilisateur_id(session, serveur.personnel.utilisateur_id).id
+        client_id = get_client_by_utilisateur_id(session, claims["uid"]).id
+    claims_serveur = jwt.decode(_connexion(f"serveur-{uid}@test.com"), settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+    assert claims["role"] == "client"
+    assert claims["client_id"] == client_id
+    assert claims["serveur_id"] is None and claims["cuisinier_id"] is None
+    assert claims_serveur["role"] == "serveur"
+    assert claims_serveur["serveur_id"] == serveur_id
+    assert claims_serveur["client_id"] is None
+    print("-> Identifiant, rôle et profils présents dans le jeton.")
+
+
+def test_requete_sans_lecture_du_profil():
+    print("\n--- Test des requêtes d'un appel authentifié ---")
+    headers = {"Authorization": f"Bearer {_connexion(_client_inscrit('requetes'))}"}
+    with Session(engine) as session:
+        table_id = create_table(session, TableCreate(numero_table=f"P-{uuid.uuid4().hex[:8]}", capacite=2)).id
+    commande_id = client.post("/commandes/", headers=headers, json={
+        "client_id": 0, "table_id": table_id, "type_commande": "sur_place"
+    }).json()["id"]
+
+    requetes = []
+    def compter(conn, cursor, statement, parameters, context, executemany):
+        requetes.append(statement)
+    # La route de statut passe par le moteur asynchrone
+    event.listen(async_engine.sync_engine, "before_cursor_execute", compter)
+    try:
+        res = client.get(f"/commandes/{commande_id}/status", headers=headers)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", compter)
+
+    assert res.status_code == 200, res.text
+    # Seule la lecture du statut touche la base
+    assert len(requetes) == 1, requetes
+    print("-> Ni l'utilisateur ni le profil client ne sont relus.")
+
+
+def test_revocation_des_jetons():
+    print("\n--- Test de la révocation des jetons ---")
+    email = _client_inscrit("revocation")
+    ancien = _connexion(email)
+    uid = jwt.decode(ancien, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])["uid"]
+    assert client.get("/commandes/", headers={"Authorization": f"Bearer {ancien}"}).status_code == 200
+
+    with Session(engine) as session:
+        update_utilisateur(session, uid, UtilisateurUpdate(password="nouveau"))
+    assert client.get("/commandes/", headers={"Authorization": f"Bearer {ancien}"}).status_code == 401
+
+    nouveau = _connexion(email, "nouveau")
+    assert client.get("/commandes/", headers={"Authorization": f"Bearer {nouveau}"}).status_code == 200
+    with Session(engine) as session:
+        toggle_user_active_status(session, uid, False)
+    res = client.get("/commandes/", headers={"Authorization": f"Bearer {nouveau}"})
+    assert res.status_code == 403
+    assert "désactivé" in res.json()["detail"]
+    print("-> Changement de mot de passe et désactivation invalident les jetons émis.")
+
+
+def test_nouveau_profil_revoque_les_jetons():
+    print("\n--- Test de l'ajout d'un profil à un compte connecté ---")
+    uid = str(uuid.uuid4())[:8]
+    email = f"profil-{uid}@test.com"
+    with Session(engine) as session:
+        serveur = create_serveur_full(session, ServeurCreateFull(
+            nom="Profil", prenom="Serveur", email=email,
+            telephone=f"0R{uid}", role="serveur", password="pass"
+        ))
+        personnel_id, utilisateur_id = serveur.personnel_id, serveur.personnel.utilisateur_id
+    ancien = _connexion(email)
+    assert jwt.decode(ancien, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])["client_id"] is None
+    assert client.get("/commandes/", headers={"Authorization": f"Bearer {ancien}"}).status_code == 200
+
+    # Le jeton ne porte pas le nouveau client_id : il est révoqué plutôt que de donner des 403
+    with Session(engine) as session:
+        client_id = create_client(session, ClientCreate(utilisateur_id=utilisateur_id)).id
+    assert client.get("/commandes/", headers={"Authorization": f"Bearer {ancien}"}).status_code == 401
+    nouveau = _connexion(email)
+    assert jwt.decode(nouveau, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])["client_id"] == client_id
+
+    with Session(engine) as session:
+        cuisinier_id = create_cuisinier(session, cuisinierCreate(personnel_id=personnel_id)).id
+    assert client.get("/commandes/", headers={"Authorization": f"Bearer {nouveau}"}).status_code == 401
+    claims = jwt.decode(_connexion(email), settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    assert claims["cuisinier_id"] == cuisinier_id and claims["client_id"] == client_id
+    print("-> Les jetons émis avant la création d'un profil sont révoqués.")
+
+
+if __name__ == "__main__":
+    try:
+        test_claims_du_jeton()
+        test_requete_sans_lecture_du_profil()
+        test_revocation_des_jetons()
+        test_nouveau_profil_revoque_les_jetons()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,114 @@
+import sys
+import os
+import uuid
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.main import app
+from app.core.config import settings
+from app.core.database import engine, async_engine, create_db_and_tables
+from app.schemas.token import Principal
+from app.schemas.utilisateur import UtilisateurUpdate
+from app.security.principal_cache import CachePrincipaux, cache_principaux
+from app.services.admin_service import toggle_user_active_status
+from app.services.utilisateur_service import update_utilisateur
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+def _principal(i: int) -> Principal:
+    return Principal(id=i, email=f"p{i}@test.com", role="client")
+
+
+def test_cache_ttl_et_lru():
+    print("\n--- Test de l'expiration et de l'éviction ---")
+    maintenant = [0.0]
+    cache = CachePrincipaux(taille_max=2, ttl=60, horloge=lambda: maintenant[0])
+
+    cache.enregistrer("a", _principal(1))
+    cache.enregistrer("b", _principal(2))
+    assert cache.lire("a").id == 1          # "a" devient le plus récent
+    cache.enregistrer("c", _principal(3))   # évince "b"
+    assert cache.lire("b") is None
+    assert cache.lire("c").id == 3
+
+    maintenant[0] = 61
+    assert cache.lire("a") is None
+
+    stats = cache.statistiques()
+    assert (stats["succes"], stats["echecs"]) == (2, 2)
+    assert stats["evictions"] == 1 and stats["expirations"] == 1
+    assert stats["taux_succes"] == 0.5
+    print("-> Entrées expirées après le TTL, la moins récente évincée.")
+
+
+def test_requetes_servies_par_le_cache():
+    print("\n--- Test du cache sur les requêtes authentifiées ---")
+    uid = str(uuid.uuid4())[:8]
+    email = f"cache-{uid}@test.com"
+    client.post("/clients/register", json={
+        "nom": "Cache", "prenom": "Client", "email": email,
+        "telephone": f"0C{uid}", "role": "client", "password": "pass"
+    })
+    token = client.post("/auth/token", data={"username": email, "password": "pass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    requetes = []
+    def compter(conn, cursor, statement, parameters, context, executemany):
+        requetes.append(statement)
+    avant = cache_principaux.statistiques()["succes"]
+    event.listen(async_engine.sync_engine, "before_cursor_execute", compter)
+    try:
+        for _ in range(3):
+            assert client.get("/reservations/", headers=headers).status_code == 200
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", compter)
+
+    # La connexion amorce le cache : le compte n'est jamais relu
+    assert not [r for r in requetes if "FROM utilisateur" in r], requetes
+    assert cache_principaux.statistiques()["succes"] - avant == 3
+    print("-> Aucune lecture de l'utilisateur pour les requêtes suivant la connexion.")
+
+
+def test_invalidation_explicite():
+    print("\n--- Test de l'invalidation par les services ---")
+    uid = str(uuid.uuid4())[:8]
+    email = f"invalide-{uid}@test.com"
+    client.post("/clients/register", json={
+        "nom": "Cache", "prenom": "Client", "email": email,
+        "telephone": f"0I{uid}", "role": "client", "password": "pass"
+    })
+    token = client.post("/auth/token", data={"username": email, "password": "pass"}).json()["access_token"]
+    utilisateur_id = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])["uid"]
+    assert cache_principaux.lire(email) is not None
+
+    with Session(engine) as session:
+        update_utilisateur(session, utilisateur_id, UtilisateurUpdate(nom="Renommé"))
+    assert cache_principaux.lire(email) is None
+    # Le nom ne figure pas dans le jeton : il reste valide
+    assert client.get("/reservations/", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+    with Session(engine) as session:
+        toggle_user_active_status(session, utilisateur_id, False)
+    assert cache_principaux.lire(email) is None
+    assert client.get("/reservations/", headers={"Authorization": f"Bearer {token}"}).status_code in (401, 403)
+    print("-> Le compte est relu en base après chaque modification.")
+
+
+if __name__ == "__main__":
+    try:
+        test_cache_ttl_et_lru()
+        test_requetes_servies_par_le_cache()
+        test_invalidation_explicite()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
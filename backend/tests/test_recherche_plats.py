@@ -0,0 +1,111 @@
+import sys
+import os
+import random
+import string
+import time
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.main import app
+from app.core.database import engine, create_db_and_tables
+from app.models.categorie import Categorie
+from app.models.plat import Plat
+from app.schemas.categorie import CategorieCreate, CategorieUpdate
+from app.schemas.plat import PlatCreate, PlatUpdate
+from app.services.categorie_service import create_categorie, update_categorie
+from app.services.plat_service import create_plat, delete_plat, update_plat
+from app.services.recherche_service import IndexPlats, normaliser
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+def _mot() -> str:
+    """Mot unique (lettres seulement) pour isoler les données du test."""
+    return "".join(random.choices(string.ascii_lowercase, k=10))
+
+
+def _noms(q: str, **params):
+    res = client.get("/plats/recherche", params={"q": q, **params})
+    assert res.status_code == 200, res.text
+    return [p["nom"] for p in res.json()]
+
+
+def test_normalisation():
+    assert normaliser("Attiéké au Poulet") == ["attieke", "poulet"]
+    assert normaliser("VÉGÉTARIEN, crème-brûlée") == ["vegetarien", "creme", "brulee"]
+
+
+def test_recherche_plats():
+    print("\n--- Test de la recherche de plats ---")
+    mot = _mot()
+    with Session(engine) as session:
+        vege = create_categorie(session, CategorieCreate(nom=f"Végétarien {mot}"))
+        grillades = create_categorie(session, CategorieCreate(nom=f"Grillades {mot}"))
+        create_plat(session, PlatCreate(nom=f"Attiéké poisson {mot}", prix=3000, categorie_id=grillades.id,
+                                        description="Semoule de manioc et poisson braisé"))
+        create_plat(session, PlatCreate(nom=f"Poulet braisé {mot}", prix=4000, categorie_id=grillades.id))
+        salade = create_plat(session, PlatCreate(nom=f"Salade composée {mot}", prix=2500, categorie_id=vege.id,
+                                                 disponible=False))
+        vege_id, salade_id = vege.id, salade.id
+
+    assert _noms(f"attieke {mot}") == [f"Attiéké poisson {mot}"]          # accents ignorés
+    assert _noms(f"ATTIÉ {mot}") == [f"Attiéké poisson {mot}"]            # préfixe
+    assert _noms(f"pouelt {mot}") == [f"Poulet braisé {mot}"]             # faute de frappe
+    assert _noms(f"vegetarien {mot}") == [f"Salade composée {mot}"]       # catégorie
+    assert _noms(f"vegetarien {mot}", disponible=True) == []
+    # Le nom l'emporte sur la description
+    assert _noms(f"braise {mot}") == [f"Poulet braisé {mot}", f"Attiéké poisson {mot}"]
+    assert _noms(f"pizza {mot}") == []
+
+    # Mises à jour incrémentales par les services
+    with Session(engine) as session:
+        update_plat(session, salade_id, PlatUpdate(nom=f"Taboulé {mot}"))
+        update_categorie(session, vege_id, CategorieUpdate(nom=f"Veggie {mot}"))
+    assert _noms(f"salade {mot}") == []
+    assert _noms(f"taboule {mot}") == [f"Taboulé {mot}"]
+    assert _noms(f"veggie {mot}") == [f"Taboulé {mot}"] and _noms(f"vegetarien {mot}") == []
+    with Session(engine) as session:
+        delete_plat(session, salade_id)
+    assert _noms(f"taboule {mot}") == []
+    print("-> Accents, préfixes, fautes et catégories ; index à jour après écriture.")
+
+
+def test_latence_index():
+    categories = [Categorie(id=i, nom=f"Catégorie {_mot()}") for i in range(1, 21)]
+    plats = [
+        Plat(id=i, nom=f"{_mot()} {_mot()} {mot}", description=f"{_mot()} {_mot()} {_mot()}",
+             prix=1000, categorie_id=1 + i % 20)
+        for i, mot in enumerate([_mot() for _ in range(5000)], start=1)
+    ]
+    index = IndexPlats(ttl=300)
+    index.remplir(categories, plats)
+    cible = plats[1234].nom.split()[-1]
+    requetes = [cible, cible[:4], cible[:3] + cible[4:], plats[42].description.split()[0]]
+    debut = time.perf_counter()
+    for _ in range(100):
+        for requete in requetes:
+            index.rechercher(requete)
+    moyenne_ms = (time.perf_counter() - debut) * 1000 / (100 * len(requetes))
+    assert index.rechercher(cible)[0].id == plats[1234].id
+    assert index.rechercher(cible[:3] + cible[4:])[0].id == plats[1234].id
+    # Requête large (tous les plats) : seuls les `limite` meilleurs sont renvoyés
+    assert len(index.rechercher("categorie", limite=20)) == 20
+    print(f"-> {moyenne_ms:.3f} ms par recherche sur {len(plats)} plats.")
+    assert moyenne_ms < 1
+
+
+if __name__ == "__main__":
+    try:
+        test_normalisation()
+        test_recherche_plats()
+        test_latence_index()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,131 @@
+import sys
+import os
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import engine, async_engine, create_db_and_tables, _url_async
+from app.schemas.client_full import ClientCreateFull
+from app.schemas.categorie import CategorieCreate
+from app.schemas.commande import CommandeCreate
+from app.schemas.plat import PlatCreate
+from app.schemas.reservation import ReservationCreate
+from app.schemas.table import TableCreate
+from app.services.commande_service import (
+    create_commande,
+    read_commande,
+    read_commande_async,
+    list_commandes,
+    list_commandes_async,
+    lire_statut_commande,
+    lire_statut_commande_async,
+)
+from app.services.categorie_service import create_categorie
+from app.services.client_service import create_client_full
+from app.services.plat_service import (
+    create_plat,
+    read_plat,
+    read_plat_async,
+    get_plat_by_nom,
+    get_plat_by_nom_async,
+)
+from app.services.reservation_service import (
+    create_reservation,
+    read_reservation,
+    read_reservation_async,
+    list_reservations_by_client,
+    list_reservations_by_client_async,
+)
+from app.services.table_service import create_table
+
+create_db_and_tables()
+
+
+def test_url_async():
+    print("\n--- Test de la traduction des URL vers les pilotes asynchrones ---")
+    url = _url_async("postgresql://user:secret@db:5432/restaurant?sslmode=require")
+    assert url.drivername == "postgresql+asyncpg"
+    assert url.query == {"ssl": "require"}
+    assert _url_async("sqlite:////tmp/restaurant.db").drivername == "sqlite+aiosqlite"
+    print("-> postgresql -> asyncpg, sqlite -> aiosqlite.")
+
+
+def test_lectures_async_identiques():
+    print("\n--- Test des lectures via AsyncSession ---")
+    uid = uuid.uuid4().hex[:8]
+    with Session(engine) as session:
+        client = create_client_full(session, ClientCreateFull(
+            nom="Async", prenom="Client", email=f"async-{uid}@test.com",
+            telephone=f"0A{uid}", role="client", password="pass"
+        ))
+        table = create_table(session, TableCreate(numero_table=f"A-{uid}", capacite=2))
+        commande = create_commande(session, CommandeCreate(
+            client_id=client.id, table_id=table.id, type_commande="sur_place"
+        ))
+        attendu = read_commande(session, commande.id)
+        liste = list_commandes(session, table_id=table.id)
+        statut = lire_statut_commande(session, commande.id)
+
+    async def scenario():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            commande_async = await read_commande_async(session, commande.id)
+            liste_async = await list_commandes_async(session, table_id=table.id)
+            statut_async = await lire_statut_commande_async(session, commande.id)
+            # Relations chargées d'avance : sérialisables sans chargement implicite
+            return commande_async, [c.id for c in liste_async], statut_async, len(liste_async[0].lignes)
+
+    commande_async, ids, statut_async, nb_lignes = asyncio.run(scenario())
+    assert commande_async == attendu
+    assert ids == [c.id for c in liste]
+    assert tuple(statut_async) == tuple(statut)
+    assert nb_lignes == 0
+    print("-> Mêmes résultats qu'avec la session synchrone.")
+
+
+def test_plats_et_reservations_async_identiques():
+    print("\n--- Test des lectures de plats et réservations via AsyncSession ---")
+    uid = uuid.uuid4().hex[:8]
+    with Session(engine) as session:
+        client = create_client_full(session, ClientCreateFull(
+            nom="Async", prenom="Resa", email=f"async-resa-{uid}@test.com",
+            telephone=f"0B{uid}", role="client", password="pass"
+        ))
+        table = create_table(session, TableCreate(numero_table=f"AR-{uid}", capacite=4))
+        categorie = create_categorie(session, CategorieCreate(nom=f"Async {uid}"))
+        plat = create_plat(session, PlatCreate(nom=f"Plat async {uid}", prix=1200, categorie_id=categorie.id))
+        reservation = create_reservation(session, ReservationCreate(
+            client_id=client.id, table_id=table.id, nombre_personnes=2,
+            date_reservation=datetime.now(timezone.utc) + timedelta(days=3)
+        ))
+        attendu = (read_plat(session, plat.id), get_plat_by_nom(session, plat.nom),
+                   read_reservation(session, reservation.id),
+                   [r.id for r in list_reservations_by_client(session, client.id)])
+
+    async def scenario():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            return (await read_plat_async(session, plat.id), await get_plat_by_nom_async(session, plat.nom),
+                    await read_reservation_async(session, reservation.id),
+                    [r.id for r in await list_reservations_by_client_async(session, client.id)])
+
+    obtenu = asyncio.run(scenario())
+    assert obtenu == attendu
+    assert obtenu[3] == [reservation.id]
+    print("-> Une seule requête par lecture, mêmes résultats dans les deux sessions.")
+
+
+if __name__ == "__main__":
+    try:
+        test_url_async()
+        test_lectures_async_identiques()
+        test_plats_et_reservations_async_identiques()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,122 @@
+import sys
+import os
+import uuid
+import time
+import threading
+
+# Ajout du dossier parent au path pour pouvoir importer 'app'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.main import app
+from app.core.database import engine, create_db_and_tables
+from app.schemas.table import TableCreate
+from app.services.table_service import create_table
+from app.services.commande_service import valider_commande
+
+create_db_and_tables()
+client = TestClient(app)
+
+
+def _client_connecte(prefixe: str):
+    uid = str(uuid.uuid4())[:8]
+    client.post("/clients/register", json={
+        "nom": "Suivi", "prenom": "Client", "email": f"{prefixe}-{uid}@test.com",
+        "telephone": f"0S{uid}", "role": "client", "password": "pass"
+    })
+    login = client.post("/auth/token", data={"username": f"{prefixe}-{uid}@test.com", "password": "pass"})
+    return {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+
+def _commande(headers):
+    with Session(engine) as session:
+        table = create_table(session, TableCreate(numero_table=f"S-{uuid.uuid4().hex[:8]}", capacite=2))
+        table_id = table.id
+    res = client.post("/commandes/", headers=headers, json={
+        "client_id": 0, "table_id": table_id, "type_commande": "sur_place"
+    })
+    return res.json()["id"]
+
+
+def test_statut_etag_et_304():
+    print("\n--- Test du statut conditionnel ---")
+    headers = _client_connecte("suivi")
+    commande_id = _commande(headers)
+
+    res = client.get(f"/commandes/{commande_id}/status", headers=headers)
+    assert res.status_code == 200, res.text
+    assert res.json() == {"commande_id": commande_id, "status": "en_attente"}
+    etag = res.headers["ETag"]
+
+    res = client.get(f"/commandes/{commande_id}/status", headers={**headers, "If-None-Match": etag})
+    assert res.status_code == 304
+
+    autre = _client_connecte("curieux")
+    assert client.get(f"/commandes/{commande_id}/status", headers=autre).status_code == 403
+    assert client.get("/commandes/999999999/status", headers=headers).status_code == 404
+    print("-> 304 tant que le statut ne change pas.")
+
+
+def test_statut_attente_longue():
+    print("\n--- Test de l'attente d'un changement de statut ---")
+    headers = _client_connecte("attente")
+    commande_id = _commande(headers)
+    etag = client.get(f"/commandes/{commande_id}/status", headers=headers).headers["ETag"]
+    conditionnel = {**headers, "If-None-Match": etag}
+
+    # Sans changement, la requête rend 304 à l'échéance
+    debut = time.monotonic()
+    res = client.get(f"/commandes/{commande_id}/status", headers=conditionnel, params={"wait": 0.5})
+    assert res.status_code == 304
+    assert time.monotonic() - debut >= 0.5
+
+    def valider_plus_tard():
+        time.sleep(0.5)
+        with Session(engine) as session:
+            valider_commande(session, commande_id, serveur_id=1)
+
+    threading.Thread(target=valider_plus_tard).start()
+    debut = time.monotonic()
+    res = client.get(f"/commandes/{commande_id}/status", headers=conditionnel, params={"wait": 10})
+    assert res.status_code == 200, res.text
+    assert res.json()["status"] == "approuvee"
+    assert res.headers["ETag"] != etag
+    assert time.monotonic() - debut < 5
+    print("-> La requête retenue répond dès que le statut change.")
+
+
+def test_statut_ne_revient_pas_en_arriere():
+    print("\n--- Test des changements de statut par PUT ---")
+    headers = _client_connecte("suivi-put")
+    commande_id = _commande(headers)
+    with Session(engine) as session:
+        valider_commande(session, commande_id, serveur_id=1)
+    etag = client.get(f"/commandes/{commande_id}/status", headers=headers).headers["ETag"]
+
+    # Retour à un statut antérieur refusé : un ETag ne peut pas redevenir valable
+    res = client.put(f"/commandes/{commande_id}", headers=headers, json={"status": "en_attente"})
+    assert res.status_code == 400, res.text
+    res = client.put(f"/commandes/{commande_id}", headers=headers, json={"status": "prete"})
+    assert res.status_code == 400, res.text
+
+    # Transition autorisée : l'ETag change ; les autres champs restent modifiables
+    res = client.put(f"/commandes/{commande_id}", headers=headers, json={"status": "en_cours", "notes": "Sans sel"})
+    assert res.status_code == 200, res.text
+    assert res.json()["status"] == "en_cours" and res.json()["notes"] == "Sans sel"
+    res = client.get(f"/commandes/{commande_id}/status", headers={**headers, "If-None-Match": etag})
+    assert res.status_code == 200 and res.headers["ETag"] != etag
+    print("-> PUT suit la machine à états : les statuts ne font qu'avancer.")
+
+
+if __name__ == "__main__":
+    try:
+        test_statut_etag_et_304()
+        test_statut_attente_longue()
+        test_statut_ne_revient_pas_en_arriere()
+    except Exception as e:
+        print(f"\nERREUR: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)